@@ -0,0 +1,45 @@
+"""Render performance benchmarks
+
+Terminal-dependent utilities are replaced, such that the benchmarks run with a fixed
+window size, cell size and colors, without a terminal.
+"""
+
+import warnings
+
+warnings.filterwarnings(
+    "ignore", "It seems this process is not running within a terminal"
+)
+
+import term_image  # noqa: E402
+
+WINDOW_SIZE = (400, 200)  # columns, lines
+CELL_SIZE = (9, 18)  # pixels
+FG_BG_COLORS = ((255, 255, 255), (0, 0, 0))
+
+
+def get_cell_size():
+    return CELL_SIZE
+
+
+def get_fg_bg_colors(*, hex=False):
+    return (
+        tuple("#" + "".join(f"{x:02x}" for x in rgb) for rgb in FG_BG_COLORS)
+        if hex
+        else FG_BG_COLORS
+    )
+
+
+def get_terminal_size():
+    return WINDOW_SIZE
+
+
+term_image.utils.get_terminal_size = get_terminal_size
+term_image.get_cell_size = get_cell_size
+term_image.utils.get_cell_size = get_cell_size
+term_image.utils.get_fg_bg_colors = get_fg_bg_colors
+term_image.AutoCellRatio.is_supported = None
+
+import term_image.image  # noqa: E402
+
+term_image.image.GraphicsImage._supported = True
+term_image.image.TextImage._is_on_kitty = staticmethod(lambda: False)
@@ -0,0 +1,227 @@
+"""Benchmarks of image rendering
+
+Times ``_get_render_data()``, ``_render_image()``, ``_format_render()`` and
+``ImageIterator`` frame rates across render styles, sizes, alpha modes, render
+methods and compression levels.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.render [-o FILE] [-k PATTERN] [-r N] [--compare FILE]
+
+Results are emitted as JSON, for comparison between revisions or releases.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import re
+import sys
+import timeit
+from datetime import datetime, timezone
+from itertools import product
+from statistics import median
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import PIL
+
+import term_image
+from term_image import set_cell_ratio
+from term_image.image import BlockImage, ImageIterator, ITerm2Image, KittyImage
+from term_image.image.common import _ALPHA_THRESHOLD
+
+from . import CELL_SIZE, WINDOW_SIZE
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+IMAGES = ("tests/images/python.png", "tests/images/vert.jpg")
+ANIMATED_IMAGES = ("tests/images/lion.gif", "tests/images/anim.webp")
+STYLES = {"block": BlockImage, "kitty": KittyImage, "iterm2": ITerm2Image}
+WIDTHS = (20, 60, 150)  # columns
+ALPHAS = (_ALPHA_THRESHOLD, "#", "#ff0000", None)
+METHODS = ("lines", "whole")
+COMPRESSION_LEVELS = (0, 4, 9)
+
+
+def bench(func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Times *func*.
+
+    Returns:
+        The number of calls per run and the time (in seconds) per call, for each run.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = [time / number for time in timer.repeat(repeat, number)]
+
+    return {
+        "number": number,
+        "times": times,
+        "best": min(times),
+        "median": median(times),
+    }
+
+
+def get_image(style: str, path: str, width: int):
+    image = STYLES[style].from_file(path)
+    image.set_size(width=width)
+
+    return image
+
+
+def cases() -> Iterator[Tuple[str, Dict[str, Any], Callable[[int], Dict[str, Any]]]]:
+    """Yields the name, parameters and runner of each benchmark case"""
+
+    def case(benchmark: str, **params: Any):
+        return (
+            f"{benchmark}["
+            + "-".join(
+                f"{name}={value.rpartition('/')[2] if name == 'image' else value}"
+                for name, value in params.items()
+            )
+            + "]",
+            {"benchmark": benchmark, **params},
+        )
+
+    def get_render_data(image, alpha, compact):
+        return lambda repeat: bench(
+            lambda: image._get_render_data(image._get_image(), alpha, compact=compact),
+            repeat,
+        )
+
+    def render_image(image, alpha, style_args):
+        return lambda repeat: bench(
+            lambda: image._render_image(image._get_image(), alpha, **style_args),
+            repeat,
+        )
+
+    def format_render(image):
+        render = image._renderer(image._render_image, _ALPHA_THRESHOLD)
+        width, height = WINDOW_SIZE
+
+        return lambda repeat: bench(
+            lambda: image._format_render(render, None, width, None, height), repeat
+        )
+
+    def iterate(image, cached):
+        def run(repeat):
+            result = bench(
+                lambda: sum(1 for _ in ImageIterator(image, 1, "1.1", cached)), repeat
+            )
+            result["fps"] = image.n_frames / result["median"]
+            return result
+
+        return run
+
+    for style, path, width, alpha in product(STYLES, IMAGES, WIDTHS, ALPHAS):
+        image = get_image(style, path, width)
+        params = dict(style=style, image=path, width=width, alpha=alpha)
+        for compact in (False, True):
+            yield (
+                *case("get_render_data", **params, compact=compact),
+                get_render_data(image, alpha, compact),
+            )
+        if style == "block":
+            yield (*case("render_image", **params), render_image(image, alpha, {}))
+        else:
+            for method, compress in product(METHODS, COMPRESSION_LEVELS):
+                style_args = dict(method=method, compress=compress)
+                yield (
+                    *case("render_image", **params, **style_args),
+                    render_image(image, alpha, style_args),
+                )
+
+    for style, path, width in product(STYLES, IMAGES, WIDTHS):
+        yield (
+            *case("format_render", style=style, image=path, width=width),
+            format_render(get_image(style, path, width)),
+        )
+
+    for style, path, cached in product(STYLES, ANIMATED_IMAGES, (False, True)):
+        yield (
+            *case("image_iterator", style=style, image=path, width=60, cached=cached),
+            iterate(get_image(style, path, 60), cached),
+        )
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any]) -> None:
+    """Prints the ratio of the median time of each case to that of *baseline*"""
+    baseline = {result["name"]: result for result in baseline["results"]}
+    for result in results:
+        if result["name"] in baseline:
+            ratio = result["median"] / baseline[result["name"]]["median"]
+            print(f"{ratio:6.2f}x  {result['name']}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.render",
+        description="Benchmarks of image rendering",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        metavar="FILE",
+        help="File to which the results are written (default: stdout)",
+    )
+    parser.add_argument(
+        "-k",
+        metavar="PATTERN",
+        help="Only run cases whose names match the given regular expression",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=5,
+        metavar="N",
+        help="Number of timed runs per case (default: 5)",
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="FILE",
+        help="Results of a previous run, to which these are compared",
+    )
+    args = parser.parse_args(argv)
+
+    set_cell_ratio(CELL_SIZE[0] / CELL_SIZE[1])
+    pattern = args.k and re.compile(args.k)
+
+    results = []
+    for name, params, run in cases():
+        if pattern and not pattern.search(name):
+            continue
+        print(name, file=sys.stderr)
+        results.append({"name": name, **params, **run(args.repeat)})
+
+    output = {
+        "metadata": {
+            "term_image": term_image.__version__,
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "numpy": numpy and numpy.__version__,
+            "platform": platform.platform(),
+            "window_size": WINDOW_SIZE,
+            "cell_size": CELL_SIZE,
+            "date": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(output, file, indent=4)
+    else:
+        json.dump(output, sys.stdout, indent=4)
+        print()
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
@@ -19,11 +19,20 @@ from urllib.parse import urlparse
 import PIL
 import requests
 
-from . import AutoCellRatio, logging, notify, set_cell_ratio, tui, utils
+from . import AutoCellRatio, logging, notify, render_cache, set_cell_ratio, tui, utils
 from .config import config_options, init_config
 from .exceptions import StyleError, TermImageError, TermImageWarning, URLNotFoundError
 from .exit_codes import FAILURE, INVALID_ARG, NO_VALID_SOURCE, SUCCESS
-from .image import BlockImage, ITerm2Image, KittyImage, Size, _best_style
+from .image import (
+    BaseImage,
+    BlockImage,
+    GraphicsImage,
+    ImageIterator,
+    ITerm2Image,
+    KittyImage,
+    Size,
+    _best_style,
+)
 from .image.common import _ALPHA_BG_FORMAT
 from .logging import Thread, init_log, log, log_exception
 from .logging_multi import Process
@@ -665,6 +674,27 @@ def main() -> None:
 
     set_query_timeout(args.query_timeout)
     utils.SWAP_WIN_SIZE = args.swap_win_size
+    utils.monitor_terminal_resizes()
+    utils.init_capability_cache(args.capability_cache * 3600)
+    if sys.stdout.isatty():
+        # The queries required by the render style (or its detection) in a single
+        # round-trip; the responses are reused hereafter. Any other is sent only if
+        # and when required.
+        queries = ["name_version"]  # Style support checks and kitty-specific colours
+        if args.style in {"auto", "block"}:
+            queries.append("fg_bg_colors")  # Blending of transparent pixels
+        if args.style != "block" or args.auto_cell_ratio or not args.cell_ratio:
+            queries.append("window_size")  # Cell size
+        if args.style in {"auto", "kitty"}:
+            queries.append("kitty_graphics")
+        utils.query_capabilities(*queries)
+    render_cache.init(args.render_cache * 2**20)
+    GraphicsImage.ENCODER_THREADS = args.encoder_threads
+    ImageIterator.CACHE_MAXSIZE = (
+        None if args.cache_all_anim else args.anim_cache_size * 2**20
+    )
+    ImageIterator.LOOKAHEAD = args.anim_lookahead
+    BaseImage.SYNC_POLICY = args.anim_sync
 
     if args.auto_cell_ratio:
         args.cell_ratio = None
@@ -720,7 +750,9 @@ def main() -> None:
     style_parser = style_parsers.get(ImageClass.style)
     style_args = vars(style_parser.parse_known_args()[0]) if style_parser else {}
 
-    if ImageClass.style == "iterm2":
+    if ImageClass.style == "kitty":
+        KittyImage.READ_FROM_FILE = style_args.pop("read_from_file")
+    elif ImageClass.style == "iterm2":
         ITerm2Image.JPEG_QUALITY = style_args.pop("jpeg_quality")
         ITerm2Image.NATIVE_ANIM_MAXSIZE = style_args.pop("native_maxsize")
         ITerm2Image.READ_FROM_FILE = style_args.pop("read_from_file")
@@ -913,7 +945,19 @@ def main() -> None:
                 if args.frame_duration:
                     image.frame_duration = args.frame_duration
 
-                if ImageClass.style == "kitty":
+                alpha = (
+                    None
+                    if args.no_alpha
+                    else (args.alpha if args.alpha_bg is None else "#" + args.alpha_bg)
+                )
+                tuned_args = {}
+                if (
+                    args.auto_tune
+                    and isinstance(image, GraphicsImage)
+                    and not (image._is_animated and style_args.get("native"))
+                ):
+                    tuned_args = image.auto_tune(alpha, animate=not args.no_anim)
+                elif ImageClass.style == "kitty":
                     image.set_render_method(
                         "lines"
                         if (
@@ -934,6 +978,8 @@ def main() -> None:
                         else "lines"
                     )
 
+                if not image._is_animated or args.no_anim:
+                    render_cache.cache_renders(image)
                 image.draw(
                     *(
                         (None, 1, None, 1)
@@ -945,22 +991,13 @@ def main() -> None:
                             args.pad_height or 1,
                         )
                     ),
-                    (
-                        None
-                        if args.no_alpha
-                        else (
-                            args.alpha if args.alpha_bg is None else "#" + args.alpha_bg
-                        )
-                    ),
+                    alpha,
                     scroll=args.scroll,
                     animate=not args.no_anim,
                     repeat=args.repeat,
-                    cached=(
-                        not args.cache_no_anim
-                        and (args.cache_all_anim or args.anim_cache)
-                    ),
+                    cached=not args.cache_no_anim,
                     check_size=not args.oversize,
-                    **style_args,
+                    **{**style_args, **tuned_args},
                 )
 
             # Handles `ValueError` and `.exceptions.InvalidSizeError`
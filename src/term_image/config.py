@@ -121,7 +121,13 @@ def load_config(config_file: str) -> None:
         try:
             option = config_options[name]
         except KeyError:
-            warn(f"Unknown option {name!r} (in {config_file!r}).")
+            if name in replaced_options:
+                warn(
+                    f"Option {name!r} (in {config_file!r}) has been replaced by "
+                    f"{replaced_options[name]}; ignored."
+                )
+            else:
+                warn(f"Unknown option {name!r} (in {config_file!r}).")
         else:
             if option.is_valid(value):
                 option.value = value
@@ -515,11 +521,31 @@ for key in ("page up", "page down"):
 valid_keys.extend(("page up", "ctrl page up", "page down", "ctrl page down"))
 
 config_options = {
-    "anim cache": Option(
+    "anim cache size": Option(
         100,
         lambda x: isinstance(x, int) and x > 0,
         "must be an integer greater than zero",
     ),
+    "anim index": Option(
+        0,
+        lambda x: isinstance(x, int) and x >= 0,
+        "must be a non-negative integer",
+    ),
+    "anim lookahead": Option(
+        0,
+        lambda x: isinstance(x, int) and x >= 0,
+        "must be a non-negative integer",
+    ),
+    "anim sync": Option(
+        "drop",
+        lambda x: x in {"drop", "catch-up", "stretch"},
+        "must be one of 'drop', 'catch-up', 'stretch'",
+    ),
+    "capability cache": Option(
+        0,
+        lambda x: isinstance(x, int) and x >= 0,
+        "must be a non-negative integer",
+    ),
     "cell ratio": Option(
         None,
         lambda x: x is None or isinstance(x, float) and x > 0.0,
@@ -535,11 +561,21 @@ config_options = {
         lambda x: x is None or isinstance(x, int) and x >= 0,
         "must be `null` or a non-negative integer",
     ),
+    "encoder threads": Option(
+        None,
+        lambda x: x is None or isinstance(x, int) and x >= 0,
+        "must be `null` or a non-negative integer",
+    ),
     "getters": Option(
         4,
         lambda x: isinstance(x, int) and x > 0,
         "must be an integer greater than zero",
     ),
+    "grid cache": Option(
+        16,
+        lambda x: isinstance(x, int) and x >= 0,
+        "must be a non-negative integer",
+    ),
     "grid renderers": Option(
         1,
         lambda x: isinstance(x, int) and x >= 0,
@@ -565,11 +601,21 @@ config_options = {
         lambda x: isinstance(x, bool),
         "must be a boolean",
     ),
+    "prefetch": Option(
+        1,
+        lambda x: isinstance(x, int) and x >= 0,
+        "must be a non-negative integer",
+    ),
     "query timeout": Option(
         QUERY_TIMEOUT,
         lambda x: isinstance(x, float) and x > 0.0,
         "must be a float greater than zero",
     ),
+    "render cache": Option(
+        0,
+        lambda x: isinstance(x, int) and x >= 0,
+        "must be a non-negative integer",
+    ),
     "style": Option(
         "auto",
         lambda x: x in {"auto", "block", "iterm2", "kitty"},
@@ -580,8 +626,17 @@ config_options = {
         lambda x: isinstance(x, bool),
         "must be a boolean",
     ),
+    "thumbnail cache": Option(
+        64,
+        lambda x: isinstance(x, int) and x >= 0,
+        "must be a non-negative integer",
+    ),
 }
 config_options = ConfigOptions(config_options)
+# Former options whose values are not valid for their replacements
+replaced_options = {
+    "anim cache": "'anim cache size' (a size in MiB, rather than a frame count)",
+}
 
 _nav = {
     "Left": ["left", "\u25c0"],
@@ -7,10 +7,15 @@ import os
 import warnings
 from math import ceil
 from operator import mul
-from typing import Optional, Tuple, Union
+from typing import Iterator, Optional, Tuple, Union
 
 import PIL
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from ..utils import BG_FMT, COLOR_RESET, FG_FMT, get_fg_bg_colors
 from .common import TextImage
 
@@ -100,19 +105,39 @@ class BlockImage(TextImage):
 
         width, height = self._get_render_size()
         frame_img = img if frame else None
-        img, rgb, a = self._get_render_data(img, alpha, round_alpha=True, frame=frame)
-        alpha = img.mode == "RGBA"
+        img, rgb, a = self._get_render_data(
+            img, alpha, round_alpha=True, frame=frame, compact=True
+        )
+        alpha = a is not None
 
         # clean up (ImageIterator uses one PIL image throughout)
         if frame_img is not img is not self._source:
             img.close()
 
+        if numpy:
+            return _render_runs(
+                numpy.frombuffer(rgb, numpy.uint8).reshape(height, width, 3),
+                numpy.frombuffer(a, numpy.uint8) if alpha else None,
+                is_on_kitty and bg_color,
+            )
+
+        def pixels(start: int, stop: int) -> Iterator[Tuple[int, int, int]]:
+            """Returns an iterator of ``(r, g, b)`` tuples for the given pixel range"""
+            start *= 3
+            stop *= 3
+            return zip(
+                rgb[start:stop:3], rgb[start + 1 : stop : 3], rgb[start + 2 : stop : 3]
+            )
+
+        if not alpha:
+            a = b"\xff" * (width * height)
+
         rgb_pairs = (
             (
-                zip(rgb[x : x + width], rgb[x + width : x + width * 2]),
-                (rgb[x], rgb[x + width]),
+                zip(pixels(x, x + width), pixels(x + width, x + width * 2)),
+                (next(pixels(x, x + 1)), next(pixels(x + width, x + width + 1))),
             )
-            for x in range(0, len(rgb), width * 2)
+            for x in range(0, width * height, width * 2)
         )
         a_pairs = (
             (
@@ -163,3 +188,119 @@ class BlockImage(TextImage):
 
         with buffer:
             return buffer.getvalue()
+
+
+def _render_runs(
+    rgb: numpy.ndarray,
+    a: Optional[numpy.ndarray],
+    kitty_bg: Optional[Tuple[int, int, int]],
+) -> str:
+    """Array-backed equivalent of the pixel loop in ``BlockImage._render_image()``.
+
+    Args:
+        rgb: Colour channels of the image's pixels, of shape ``(height, width, 3)``.
+        a: Flattened bi-level alpha channel of the image's pixels, if transparency
+          is enabled. Otherwise, ``None``.
+        kitty_bg: The terminal's default BG colour, if rendering on Kitty.
+          Otherwise, a false value.
+
+    Returns:
+        The render output, identical to that of the pixel loop.
+
+    Runs of identical upper/lower pixel pairs are detected for all lines at once.
+    Each run is then described by a fixed row of tokens (see ``_TOKENS``), which
+    are expanded into the UTF-8 encoded output in bulk.
+    """
+    height, width, _ = rgb.shape
+    rows = height // 2
+    pixels = rgb.reshape(rows, 2, width, 3)
+    colors = pixels.astype(numpy.int64)
+    colors = colors[..., 0] << 16 | colors[..., 1] << 8 | colors[..., 2]
+
+    # A pair's key changes with either pixel's colour or transparency.
+    # Fully transparent pairs share one key since their colours are never used.
+    keys = colors[:, 0] << 24 | colors[:, 1]
+    if a is not None:
+        transparent = a.reshape(rows, 2, width) == 0
+        upper_trans, lower_trans = transparent[:, 0], transparent[:, 1]
+        keys |= upper_trans.astype(numpy.int64) << 48
+        keys |= lower_trans.astype(numpy.int64) << 49
+        keys[upper_trans & lower_trans] = 3 << 48
+
+    run_starts = numpy.ones((rows, width), bool)
+    numpy.not_equal(keys[:, 1:], keys[:, :-1], out=run_starts[:, 1:])
+    row_index, col_index = run_starts.nonzero()
+    lengths = numpy.diff(row_index * width + col_index, append=rows * width)
+    upper = pixels[row_index, 0, col_index].astype(numpy.int16)
+    lower = pixels[row_index, 1, col_index].astype(numpy.int16)
+
+    # Kitty does not render BG colors equal to the default BG color
+    bg = lower.copy()
+    if kitty_bg:
+        nudge = (lower == kitty_bg).all(axis=1)
+        bg[nudge, 0] += numpy.where(bg[nudge, 0] < 255, 1, -1).astype(numpy.int16)
+
+    # Token row of a run:
+    #   0 -> reset, 1-4 -> BG colour, 5-8 -> FG colour, 9 -> block (repeated),
+    #   10-11 -> line break
+    tokens = numpy.full((len(lengths), 12), _EMPTY, numpy.int16)
+    tokens[:, 1] = _BG_START
+    tokens[:, 2:5] = bg + _COLOR_OFFSETS
+    tokens[:, 5] = _FG_START
+    tokens[:, 6:9] = upper + _COLOR_OFFSETS
+    tokens[:, 9] = _UPPER
+    same = (upper == lower).all(axis=1)
+    tokens[same, 5:10] = (*(_EMPTY,) * 4, _SPACE)
+
+    if a is not None:
+        upper_trans = upper_trans[row_index, col_index]
+        lower_trans = lower_trans[row_index, col_index]
+        upper_only = lower_trans & ~upper_trans
+        lower_only = upper_trans & ~lower_trans
+        tokens[upper_trans | lower_trans, :5] = (_RESET, *(_EMPTY,) * 4)
+        tokens[upper_only, 5:10:4] = (_FG_START, _UPPER)
+        tokens[upper_only, 6:9] = upper[upper_only] + _COLOR_OFFSETS
+        tokens[lower_only, 5:10:4] = (_FG_START, _LOWER)
+        tokens[lower_only, 6:9] = lower[lower_only] + _COLOR_OFFSETS
+        tokens[upper_trans & lower_trans, 5:10] = (*(_EMPTY,) * 4, _SPACE)
+
+    # Line breaks after all but the last line
+    line_ends = numpy.cumsum(run_starts.sum(axis=1))[:-1] - 1
+    tokens[line_ends, 10:] = (_RESET, _NEWLINE)
+
+    counts = (tokens != _EMPTY).astype(numpy.int64)
+    counts[:, 9] = lengths
+    tokens = numpy.repeat(tokens.ravel(), counts.ravel())
+
+    # Index of each output byte into `_TOKEN_BYTES`
+    token_lengths = _TOKEN_LENGTHS[tokens]
+    token_ends = numpy.cumsum(token_lengths)
+    indices = numpy.repeat(
+        _TOKEN_OFFSETS[tokens] - (token_ends - token_lengths), token_lengths
+    )
+    indices += numpy.arange(len(indices))
+
+    return _TOKEN_BYTES[indices].tobytes().decode() + COLOR_RESET
+
+
+# Tokens for `_render_runs()`
+_TOKENS = (
+    *(f"{n};" for n in range(256)),
+    *(f"{n}m" for n in range(256)),
+    "",
+    FG_FMT.partition("%")[0],
+    BG_FMT.partition("%")[0],
+    COLOR_RESET,
+    UPPER_PIXEL,
+    LOWER_PIXEL,
+    " ",
+    "\n",
+)
+_COLOR_OFFSETS = (0, 0, 256)  # "<r>;<g>;<b>m"
+_EMPTY, _FG_START, _BG_START, _RESET, _UPPER, _LOWER, _SPACE, _NEWLINE = range(512, 520)
+
+if numpy:
+    _TOKEN_BYTES = [token.encode() for token in _TOKENS]
+    _TOKEN_LENGTHS = numpy.array([len(token) for token in _TOKEN_BYTES])
+    _TOKEN_OFFSETS = numpy.cumsum(_TOKEN_LENGTHS) - _TOKEN_LENGTHS
+    _TOKEN_BYTES = numpy.frombuffer(b"".join(_TOKEN_BYTES), numpy.uint8)
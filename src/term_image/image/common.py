@@ -15,23 +15,42 @@ __all__ = (
 )
 
 import io
+import json
 import os
 import re
 import sys
 import time
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from copy import copy
 from enum import Enum
 from functools import wraps
 from math import ceil
-from operator import gt, mul, sub
+from operator import floordiv, gt, mul, sub
 from random import randint
+from tempfile import TemporaryFile
+from threading import Lock, current_thread
 from types import FunctionType, TracebackType
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 from urllib.parse import urlparse
+from zlib import compress, decompress
 
 import PIL
 import requests
-from PIL import Image, UnidentifiedImageError
+from PIL import Image, ImageChops, UnidentifiedImageError
 
 from .. import get_cell_ratio
 from ..exceptions import (
@@ -44,12 +63,18 @@ from ..utils import (
     COLOR_RESET,
     CSI,
     ClassInstanceMethod,
+    _capabilities,
+    _store_capabilities,
     cached,
     get_cell_size,
     get_fg_bg_colors,
     get_terminal_name_version,
+    get_terminal_resize_count,
     get_terminal_size,
+    mute_tty,
     no_redecorate,
+    query_terminal,
+    read_tty,
 )
 
 _ALPHA_THRESHOLD = 40 / 255  # Default alpha threshold
@@ -241,6 +266,46 @@ class BaseImage(metaclass=ImageMeta):
     _style_args: Dict[
         str, Tuple[Tuple[FunctionType, str], Tuple[FunctionType, str]]
     ] = {}
+    _anim_stats: Optional[Dict[str, Union[int, float]]] = None
+    _geometry: Tuple[Any, Any] = (None, None)
+
+    #: Policy for keeping drawn animations in sync with the (monotonic) clock, when
+    #: frames are rendered or written slower than the frame duration.
+    #:
+    #: * ``"drop"``: Frames whose display time has passed are skipped i.e neither
+    #:   written nor (where possible) rendered.
+    #: * ``"catch-up"``: Every frame is displayed. Late frames are displayed
+    #:   immediately, one after another, until the animation is back in sync.
+    #: * ``"stretch"``: Every frame is displayed for at least the frame duration.
+    #:   The animation slows down instead.
+    SYNC_POLICY: str = "drop"
+
+    #: The maximum time (in seconds) by which the terminal may lag behind the frames
+    #: of a drawn animation (beyond the round-trip time), before rendering of new
+    #: frames is paused, or ``None`` to never pause.
+    #:
+    #: Keeps animations over slow links (e.g remote sessions) responsive, as frames
+    #: don't pile up in buffers along the way. Frames fall behind schedule while
+    #: paused, hence the frame rate adapts to the throughput of the terminal, according
+    #: to :py:attr:`SYNC_POLICY`.
+    #:
+    #: The throughput of the terminal, as measured during drawn animations (and
+    #: non-animated images, see :py:attr:`MEASURE_STILLS`), is also used by
+    #: :py:meth:`GraphicsImage.auto_tune`. If ``None``, it's never measured.
+    #:
+    #: .. note:: Applies only when the output is the :term:`active terminal` and the
+    #:   terminal responds to device status report requests.
+    OUTPUT_LAG: Optional[float] = 0.1
+
+    #: Whether the throughput of the terminal is measured after drawing large
+    #: non-animated renders.
+    #:
+    #: The terminal's response is awaited for a short while after the render is
+    #: written, hence each such draw takes slightly longer.
+    #:
+    #: NOTE:
+    #:     Set on the instance by :py:meth:`GraphicsImage.auto_tune`.
+    MEASURE_STILLS: bool = False
 
     # Special Methods
 
@@ -275,6 +340,7 @@ class BaseImage(metaclass=ImageMeta):
             self._frame_duration = (image.info.get("duration") or 100) / 1000
             self._seek_position = image.tell()
             self._n_frames = None
+            self._frame_index = None
 
     def __del__(self) -> None:
         self.close()
@@ -328,6 +394,25 @@ class BaseImage(metaclass=ImageMeta):
         """,
     )
 
+    anim_stats = property(
+        lambda self: self._anim_stats and self._anim_stats.copy(),
+        doc="""Playback statistics of the last animation drawn, or ``None``
+
+        A dictionary with the following items:
+
+        * ``rendered``: The number of frames displayed.
+        * ``dropped``: The number of frames skipped to keep in sync (see
+          :py:attr:`SYNC_POLICY`).
+        * ``late``: The number of frames displayed after their display time.
+        * ``write_latency``: The mean time (in seconds) taken to write a frame.
+        * ``max_write_latency``: The longest time (in seconds) taken to write a frame.
+        * ``bandwidth``: The measured throughput (in bytes per second) of the
+          terminal, or ``None`` if not measured (see :py:attr:`OUTPUT_LAG`).
+
+        :rtype: Optional[Dict[str, Union[int, float]]]
+        """,
+    )
+
     frame_duration = property(
         lambda self: self._frame_duration if self._is_animated else None,
         doc="""Duration (in seconds) of a single frame for :term:`animated` images
@@ -401,14 +486,7 @@ class BaseImage(metaclass=ImageMeta):
         return self._n_frames
 
     rendered_height = property(
-        lambda self: round(
-            (
-                self._valid_size(None, self._size)
-                if isinstance(self._size, Size)
-                else self._size
-            )[1]
-            * self._scale[1]
-        ),
+        lambda self: self._get_geometry()[1][1],
         doc="""
         The **scaled** height of the image.
 
@@ -419,20 +497,7 @@ class BaseImage(metaclass=ImageMeta):
     )
 
     rendered_size = property(
-        lambda self: tuple(
-            map(
-                round,
-                map(
-                    mul,
-                    (
-                        self._valid_size(self._size, None)
-                        if isinstance(self._size, Size)
-                        else self._size
-                    ),
-                    self._scale,
-                ),
-            )
-        ),
+        lambda self: self._get_geometry()[1],
         doc="""
         The **scaled** size of the image.
 
@@ -444,14 +509,7 @@ class BaseImage(metaclass=ImageMeta):
     )
 
     rendered_width = property(
-        lambda self: round(
-            (
-                self._valid_size(self._size, None)
-                if isinstance(self._size, Size)
-                else self._size
-            )[0]
-            * self._scale[0]
-        ),
+        lambda self: self._get_geometry()[1][0],
         doc="""
         The **scaled** width of the image.
 
@@ -633,6 +691,8 @@ class BaseImage(metaclass=ImageMeta):
                         pass
                     del self._url
                 del self._source
+                if self._is_animated:
+                    self._frame_index = None
         except AttributeError:
             pass  # Instance creation or initialization was unsuccessful
         finally:
@@ -785,13 +845,11 @@ class BaseImage(metaclass=ImageMeta):
                     )
                 else:
                     try:
-                        print(
+                        self._display_image(
                             self._format_render(
                                 self._render_image(image, alpha, **style_args),
                                 *fmt,
-                            ),
-                            end="",
-                            flush=True,
+                            )
                         )
                     except (KeyboardInterrupt, Exception):
                         self._handle_interrupted_draw()
@@ -934,6 +992,51 @@ class BaseImage(metaclass=ImageMeta):
         """
         raise NotImplementedError
 
+    @_close_validated
+    def index_frames(self, interval: int = 16, *, disk: bool = False) -> None:
+        """Indexes the frames of an animated image, for fast random seek.
+
+        Args:
+            interval: The keyframe interval. Every *interval*-th frame is stored whole
+              while every other frame is stored as only the region which differs from
+              the previous frame.
+            disk: If ``True``, the index is stored in a temporary file. Otherwise, in
+              memory.
+
+        Raises:
+            TypeError: An argument is of an inappropriate type.
+            ValueError: An argument is of an appropriate type but has an
+              unexpected/invalid value.
+
+        All frames are decoded once, in order, and the frame count is determined in
+        the same pass. Afterwards, frames are reconstructed from the index instead of
+        being decoded from the source, such that rendering any frame (e.g after a
+        seek or when an animation restarts) costs at most ``interval - 1`` region
+        pastes, rather than decoding every preceding frame.
+
+        * Has no effect on non-animated images.
+        * Calling this method again rebuilds the index.
+        """
+        if not isinstance(interval, int):
+            raise TypeError(
+                f"Invalid type for keyframe interval (got: {type(interval).__name__})"
+            )
+        if interval < 1:
+            raise ValueError(f"Keyframe interval must be positive (got: {interval})")
+
+        if not self._is_animated:
+            return
+
+        img = self._get_image()
+        try:
+            self._frame_index = _FrameIndex(img, interval, disk)
+        finally:
+            if img is not self._source:
+                img.close()
+            else:
+                img.seek(0)  # Same as after an animation
+        self._n_frames = self._frame_index.n_frames
+
     def seek(self, pos: int) -> None:
         """Changes current image frame.
 
@@ -1124,6 +1227,22 @@ class BaseImage(metaclass=ImageMeta):
 
     # Private Methods
 
+    def _get_frame(self, img: PIL.Image.Image, n: int) -> PIL.Image.Image:
+        """Returns frame *n* of an animated image.
+
+        Returns:
+            A new PIL image, if the frames are indexed. Otherwise, *img*, seeked to
+            frame *n*.
+
+        Raises:
+            EOFError: *n* is out of range.
+        """
+        if self._frame_index:
+            return self._frame_index.get(n)
+
+        img.seek(n)
+        return img
+
     @classmethod
     def _check_format_spec(
         cls, spec: str
@@ -1388,6 +1507,9 @@ class BaseImage(metaclass=ImageMeta):
     ) -> None:
         """Displays an animated GIF image in the terminal.
 
+        Frames are paced by a :py:class:`_FrameScheduler`, according to
+        :py:attr:`SYNC_POLICY`.
+
         NOTE:
             This is done indefinitely but can be terminated with ``Ctrl-C``
             (``SIGINT``), raising ``KeyboardInterrupt``.
@@ -1398,37 +1520,122 @@ class BaseImage(metaclass=ImageMeta):
         )
         prev_seek_pos = self._seek_position
         duration = self._frame_duration
+        delta = isinstance(self, TextImage) and self.DELTA_FRAMES
         image_it = ImageIterator(self, repeat, "", cached)
         image_it._animator = image_it._animate(img, alpha, fmt, style_args)
+        scheduler = _FrameScheduler(self.SYNC_POLICY)
+        monitor = (
+            _OutputMonitor(self.OUTPUT_LAG)
+            if self.OUTPUT_LAG is not None and sys.stdout.isatty()
+            else None
+        )
 
-        try:
-            print(next(image_it._animator), end="", flush=True)  # First frame
-
-            # Render next frame during current frame's duration
-            start = time.time()
-            for frame in image_it._animator:  # Renders next frame
-                # Left-over of current frame's duration
-                time.sleep(max(0, duration - (time.time() - start)))
-
-                # Clear the current frame, if necessary,
-                # move cursor up to the begining of the first line of the image
-                # and print the new current frame.
-                self._clear_frame()
-                print(f"\r{CSI}{lines - 1}A", frame, sep="", end="", flush=True)
-
-                # Render next frame during current frame's duration
-                start = time.time()
-        except (KeyboardInterrupt, Exception):
-            self._handle_interrupted_draw()
-            raise
-        finally:
-            if img is not self._source:
-                img.close()
-            image_it.close()
-            self._seek_position = prev_seek_pos
-            # Move the cursor to the last line of the image to prevent "overlayed"
-            # output in the terminal
-            print(f"{CSI}{lines}B", end="")
+        with monitor or nullcontext():
+            if monitor and not monitor.supported:
+                monitor = None
+            try:
+                frame = next(image_it._animator)
+                start = time.monotonic()
+                with scheduler.write():
+                    print(frame, end="", flush=True)  # First frame
+                if monitor:
+                    monitor.written(frame, start)
+                prev_frame_lines = delta and frame.split("\n")
+                scheduler.start()
+
+                while True:
+                    if monitor:
+                        # Pause while the terminal lags behind
+                        monitor.drain()
+
+                    dropped = scheduler.next(duration)
+                    if dropped:
+                        # Skip the frames behind schedule, within the current loop.
+                        # The frame count isn't computed here, since that requires
+                        # decoding all frames (if not indexed). Rather, when unknown,
+                        # seeking past the last frame moves on to the next loop.
+                        n = self._seek_position + 1
+                        next_n = n + dropped
+                        if self._n_frames:
+                            next_n = min(next_n, max(n, self._n_frames - 1))
+                        if next_n > n:
+                            # Bypasses the range check of `ImageIterator.seek()`
+                            image_it._animator.send(next_n)
+                        scheduler.undrop(dropped - (next_n - n))
+
+                    # Render next frame during current frame's duration
+                    try:
+                        frame = next(image_it._animator)
+                    except StopIteration:
+                        break
+
+                    # Left-over of current frame's duration
+                    scheduler.wait()
+
+                    # Clear the current frame, if necessary,
+                    # move cursor up to the begining of the first line of the image
+                    # and print the new current frame.
+                    start = time.monotonic()
+                    with scheduler.write():
+                        if self._clear_frame() or not delta:
+                            output = f"\r{CSI}{lines - 1}A{frame}"
+                        else:
+                            # Only the lines that differ from those of the current
+                            # frame
+                            frame_lines = frame.split("\n")
+                            output = self._get_frame_delta(
+                                prev_frame_lines, frame_lines
+                            )
+                            prev_frame_lines = frame_lines
+                        print(output, end="", flush=True)
+                    if monitor:
+                        monitor.written(output, start)
+            except (KeyboardInterrupt, Exception):
+                self._handle_interrupted_draw()
+                raise
+            finally:
+                if img is not self._source:
+                    img.close()
+                image_it.close()
+                self._seek_position = prev_seek_pos
+                self._anim_stats = {
+                    **scheduler.stats,
+                    "bandwidth": monitor and monitor.bandwidth,
+                }
+                if monitor and monitor.bandwidth:
+                    _store_terminal_bandwidth(monitor.bandwidth)
+                # Move the cursor to the last line of the image to prevent
+                # "overlayed" output in the terminal
+                print(f"{CSI}{lines}B", end="")
+
+    def _display_image(self, render: str) -> None:
+        """Writes a formatted render of a non-animated image (or a single frame of an
+        animated image) to standard output.
+
+        The throughput of the terminal is measured for large renders, if enabled (see
+        :py:attr:`MEASURE_STILLS`).
+        """
+        if not (
+            self.MEASURE_STILLS
+            and len(render) >= _MIN_MEASURED_SIZE
+            and self.OUTPUT_LAG is not None
+            and sys.stdout.isatty()
+        ):
+            print(render, end="", flush=True)
+            return
+
+        # Awaits the terminal's response after the render, on exit, for only a little
+        # longer than the render should take to be transmitted
+        with _OutputMonitor(
+            self.OUTPUT_LAG,
+            self.OUTPUT_LAG + 2 * len(render) / _get_terminal_bandwidth(),
+        ) as monitor:
+            start = time.monotonic()
+            print(render, end="", flush=True)
+            if monitor.supported:
+                monitor.written(render, start)
+        if monitor.bandwidth:
+            _store_terminal_bandwidth(monitor.bandwidth)
 
     def _format_render(
         self,
@@ -1482,6 +1689,29 @@ class BaseImage(metaclass=ImageMeta):
             else render
         )
 
+    def _get_geometry(self) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        """Returns the unscaled and the scaled (rendered) sizes of the image.
+
+        For a :term:`dynamic size`, both are computed for the current terminal size and
+        memoized until the size, the scale, the pixel ratio or the terminal size (see
+        :py:func:`~term_image.utils.get_terminal_resize_count`) changes.
+        """
+        size = self._size
+        key = None
+        if isinstance(size, Size):
+            resize_count = get_terminal_resize_count()
+            if resize_count is not None:
+                key = (size, *self._scale, self._pixel_ratio, resize_count)
+                if key == self._geometry[0]:
+                    return self._geometry[1]
+            size = self._valid_size(size, None)
+
+        geometry = (size, tuple(map(round, map(mul, size, self._scale))))
+        if key:
+            self._geometry = (key, geometry)
+
+        return geometry
+
     @_close_validated
     def _get_image(self) -> PIL.Image.Image:
         """Returns the PIL image instance corresponding to the image source as-is"""
@@ -1498,8 +1728,11 @@ class BaseImage(metaclass=ImageMeta):
         pixel_data: bool = True,
         round_alpha: bool = False,
         frame: bool = False,
+        compact: bool = False,
     ) -> Tuple[
-        PIL.Image.Image, Optional[List[Tuple[int, int, int]]], Optional[List[int]]
+        PIL.Image.Image,
+        Union[None, List[Tuple[int, int, int]], memoryview],
+        Union[None, List[int], memoryview],
     ]:
         """Returns the PIL image instance and pixel data required to render an image.
 
@@ -1516,9 +1749,13 @@ class BaseImage(metaclass=ImageMeta):
 
             frame: If ``True``, implies *img* is being used by ``ImageIterator``,
               hence, *img* is not closed.
+            compact: If ``True``, the pixel data are returned as byte buffers instead
+              of lists (see below).
 
         The returned image is appropriately converted, resized and composited
-        (if need be).
+        (if need be). JPEG images loaded from file are decoded at a reduced scale and
+        other opaque images are reduced by an integer factor before resizing, when
+        *size* is small enough.
 
         The pixel data are the last two items of the returned tuple ``(rgb, a)``, where:
           * ``rgb`` is a list of ``(r, g, b)`` tuples containing the colour channels of
@@ -1526,6 +1763,12 @@ class BaseImage(metaclass=ImageMeta):
             are integers in the range [0, 255].
           * ``a`` is a list of integers in the range [0, 255] representing the alpha
             channel of the image's pixels in a flattened row-major order.
+
+        If *compact* is ``True``:
+          * ``rgb`` is a memoryview of the interleaved colour channels of the image's
+            pixels (i.e three bytes per pixel) in row-major order.
+          * ``a`` is a memoryview of the alpha channel of the image's pixels (one byte
+            per pixel) in row-major order or ``None``, if the image is opaque.
         """
 
         def convert_resize_img(mode: str):
@@ -1541,6 +1784,17 @@ class BaseImage(metaclass=ImageMeta):
                     if frame_img is not prev_img is not self._source:
                         prev_img.close()
 
+            # Images much larger than *size* are first reduced by an integer factor,
+            # which is cheaper than resampling, leaving at least twice *size* for
+            # the final resize. RGBA images are resized with premultiplied alpha,
+            # which `reduce()` doesn't do, hence they're left as-is.
+            factor = 0 not in size and min(map(floordiv, img.size, size)) // 2
+            if mode == "RGB" and factor > 1:
+                prev_img = img
+                img = img.reduce(factor)
+                if frame_img is not prev_img is not self._source:
+                    prev_img.close()
+
             if img.size != size:
                 prev_img = img
                 try:
@@ -1553,15 +1807,28 @@ class BaseImage(metaclass=ImageMeta):
 
         frame_img = img if frame else None
         if self._is_animated:
-            img.seek(self._seek_position)
+            prev_img = img
+            img = self._get_frame(img, self._seek_position)
+            if frame_img is not prev_img is not img and prev_img is not self._source:
+                prev_img.close()
         if not size:
             size = self._get_render_size()
 
+        # Reduced-size decoding (in the DCT domain) of JPEG images, only effective if
+        # *img* is yet to be loaded and *size* is at most half of the original size.
+        # User-provided PIL images are left untouched.
+        if img.format == "JPEG" and self._source_type is not ImageSource.PIL_IMAGE:
+            img.draft(None, size)
+
         if alpha is None or img.mode in {"1", "L", "RGB", "HSV", "CMYK"}:
             convert_resize_img("RGB")
             if pixel_data:
-                rgb = list(img.getdata())
-                a = [255] * mul(*size)
+                if compact:
+                    rgb = memoryview(img.tobytes())
+                    a = None
+                else:
+                    rgb = list(img.getdata())
+                    a = [255] * mul(*size)
         else:
             convert_resize_img("RGBA")
             if isinstance(alpha, str):
@@ -1573,13 +1840,24 @@ class BaseImage(metaclass=ImageMeta):
                     img.close()
                 img = bg.convert("RGB")
                 if pixel_data:
-                    a = [255] * mul(*size)
+                    a = None if compact else [255] * mul(*size)
             else:
                 if pixel_data:
-                    a = list(img.getdata(3))
-                    if round_alpha:
-                        alpha = round(alpha * 255)
-                        a = [0 if val < alpha else 255 for val in a]
+                    if compact:
+                        a_img = img.getchannel("A")
+                        if round_alpha:
+                            alpha = round(alpha * 255)
+                            a_img = a_img.point([0] * alpha + [255] * (256 - alpha))
+                        a = (
+                            None
+                            if a_img.getextrema()[0] == 255
+                            else memoryview(a_img.tobytes())
+                        )
+                    else:
+                        a = list(img.getdata(3))
+                        if round_alpha:
+                            alpha = round(alpha * 255)
+                            a = [0 if val < alpha else 255 for val in a]
                 if round_alpha:
                     bg = Image.new(
                         "RGBA", img.size, get_fg_bg_colors(hex=True)[1] or "#000000"
@@ -1591,7 +1869,14 @@ class BaseImage(metaclass=ImageMeta):
                     img = bg
 
             if pixel_data:
-                rgb = list((img if img.mode == "RGB" else img.convert("RGB")).getdata())
+                rgb_img = img if img.mode == "RGB" else img.convert("RGB")
+                rgb = (
+                    memoryview(rgb_img.tobytes())
+                    if compact
+                    else list(rgb_img.getdata())
+                )
+                if rgb_img is not img:
+                    rgb_img.close()
 
         return (img, *(pixel_data and (rgb, a) or (None, None)))
 
@@ -1753,7 +2038,9 @@ class BaseImage(metaclass=ImageMeta):
         _size = self._size
         try:
             if isinstance(_size, Size):
-                self.set_size(_size)
+                # Same as `self.set_size(_size)`, with the memoized size
+                self._size = self._get_geometry()[0]
+                self._v_allow *= not self._fit_to_width
             elif check_size or animated:
                 # NOTE: If the set size is larger than the available terminal size but
                 # the scale makes it fit in, then it's all good.
@@ -1946,6 +2233,16 @@ class GraphicsImage(BaseImage):
         from its subclasses.
     """
 
+    #: Maximum number of threads with which the lines of an image are encoded
+    #: (compressed or re-encoded) in parallel, with the ``lines`` render method.
+    #:
+    #: If ``None``, it's determined by the number of logical processors available
+    #: (up to 8). If less than ``2``, lines are encoded sequentially.
+    #:
+    #: NOTE:
+    #:     A single thread pool is shared by all render styles.
+    ENCODER_THREADS: Optional[int] = None
+
     # Size unit conversion already involves cell size calculation
     _pixel_ratio: float = 1.0
 
@@ -1956,6 +2253,175 @@ class GraphicsImage(BaseImage):
             )
         super().__init__(image, **kwargs)
 
+    @_close_validated
+    def auto_tune(
+        self,
+        alpha: Union[None, float, str] = _ALPHA_THRESHOLD,
+        *,
+        animate: bool = True,
+    ) -> Dict[str, Any]:
+        """Selects the encoding parameters with which the image is displayed fastest
+        in the :term:`active terminal`.
+
+        Args:
+            alpha: Transparency setting, as would be passed to :py:meth:`draw`.
+            animate: Whether an animated image is to be displayed as an animation,
+              as would be passed to :py:meth:`draw`.
+
+        Returns:
+            Style-specific render parameters, to be passed to :py:meth:`draw`.
+
+        Candidate combinations of render method and style-specific encoding
+        parameters (e.g compression level) are timed by rendering the image once and
+        the output size is noted. The cost of a candidate is then estimated against
+        the throughput of the terminal, as measured during previously drawn
+        animations and large non-animated images (see :py:attr:`MEASURE_STILLS`):
+
+        * for non-animated images, the time to display (encoding plus transmission);
+        * for animated images, the time per frame (the greater of both, since frames
+          are rendered ahead while the previous is being written).
+
+        Encoding parameters are tried in order of increasing effort, using the first
+        render method, until the cost stops decreasing. Other render methods are
+        measured only with the best encoding parameters. Hence, a few renders are
+        required.
+
+        The render method (and any style-specific class attribute, such as
+        :py:attr:`ITerm2Image.JPEG_QUALITY`) of the cheapest candidate is set on the
+        instance and the others are returned. :py:attr:`MEASURE_STILLS` is also
+        enabled on the instance.
+
+        The selection is cached per terminal (as reported by
+        :py:func:`~term_image.utils.get_terminal_name_version`), render style and
+        animation status, and re-used by other images (for which it is also a
+        candidate) until the measured terminal throughput changes significantly.
+        The selection and the throughput are stored in the capability cache and
+        thus, persist across processes if the on-disk cache is enabled (see
+        :py:func:`~term_image.utils.init_capability_cache`).
+
+        NOTE:
+            The image's size (or the terminal size, for a dynamic size) should be
+            final, as candidates are measured at the current :term:`rendered size`.
+        """
+        animated = self._is_animated and animate
+        series = self._get_tuning_candidates(animated)
+        bandwidth = _get_terminal_bandwidth()
+        key = _get_tuning_key(type(self).style, animated)
+        candidate, tuned_bandwidth = None, 0.0
+        if key in _capabilities:
+            style_args, attrs, tuned_bandwidth = json.loads(_capabilities[key])
+            candidate = (style_args, attrs)
+
+        if (
+            not any(candidate in candidates for candidates in series)
+            or not 0.5 <= tuned_bandwidth / bandwidth <= 2
+        ):
+
+            def get_cost(candidate):
+                style_args, attrs = candidate
+                duration, size = self._renderer(
+                    self._measure_render, alpha, attrs, frame=animated, **style_args
+                )
+                transmission = size / bandwidth
+                return (
+                    max(duration, transmission) if animated else duration + transmission
+                )
+
+            # The cost is assumed to be unimodal along each series, hence the first
+            # series is walked only until the cost stops decreasing
+            index, cost = 0, get_cost(series[0][0])
+            for n, candidate in enumerate(series[0][1:], 1):
+                new_cost = get_cost(candidate)
+                if new_cost >= cost:
+                    break
+                index, cost = n, new_cost
+
+            # The other series are measured only at the best encoding effort
+            candidate = series[0][index]
+            for candidates in series[1:]:
+                if index < len(candidates):
+                    new_cost = get_cost(candidates[index])
+                    if new_cost < cost:
+                        candidate, cost = candidates[index], new_cost
+            _store_capabilities({key: json.dumps([*candidate, bandwidth]).encode()})
+
+        style_args, attrs = candidate
+        style_args = style_args.copy()
+        self.set_render_method(style_args.pop("method", None))
+        for name, value in attrs.items():
+            setattr(self, name, value)
+        # Keeps the throughput up to date for subsequent selections
+        self.MEASURE_STILLS = True
+
+        return style_args
+
+    def _get_tuning_candidates(
+        self, animated: bool
+    ) -> List[List[Tuple[Dict[str, Any], Dict[str, Any]]]]:
+        """Returns the candidate encoding parameters for :py:meth:`auto_tune`.
+
+        Args:
+            animated: Whether the candidates are for an animation.
+
+        Returns:
+            A list of series of candidates, one series per render method. Each
+            candidate is a ``(style_args, attrs)`` tuple, where *style_args* are
+            style-specific render parameters (including ``method``, the render method)
+            and *attrs* are instance attributes to be set.
+
+        Each series is ordered by increasing encoding effort and the candidates at
+        the same position in all series differ only in render method.
+        """
+        return [[({}, {})]]
+
+    def _measure_render(
+        self,
+        img: PIL.Image.Image,
+        alpha: Union[None, float, str],
+        attrs: Dict[str, Any],
+        *,
+        frame: bool,
+        **style_args,
+    ) -> Tuple[float, int]:
+        """Returns the time taken to render *img* and the size of the render output.
+
+        *attrs* are set on the instance for the duration of the render.
+        """
+        saved = {name: self.__dict__[name] for name in attrs if name in self.__dict__}
+        self.__dict__.update(attrs)
+        try:
+            start = time.perf_counter()
+            output = self._render_image(img, alpha, frame=frame, **style_args)
+            return time.perf_counter() - start, len(output)
+        finally:
+            for name in attrs:
+                self.__dict__.pop(name, None)
+            self.__dict__.update(saved)
+            if img is not self._source:
+                img.close()
+
+    @staticmethod
+    def _encode_lines(encode: Callable[[Any], Any], lines: Sequence[Any]) -> List[Any]:
+        """Encodes the lines of an image, in parallel if enabled.
+
+        Args:
+            encode: The function that encodes a single line.
+            lines: The data of each line, passed to *encode*.
+
+        Returns:
+            The result of *encode* for each line, in the same order as *lines*.
+
+        See :py:attr:`ENCODER_THREADS`.
+        """
+        # Not within an encoder thread; would block with a saturated pool
+        pool = (
+            len(lines) > 1
+            and not current_thread().name.startswith(_ENCODER_THREAD_NAME)
+            and _get_encoder_pool()
+        )
+
+        return list((pool.map if pool else map)(encode, lines))
+
     def _get_minimal_render_size(self, *, adjust: bool) -> Tuple[int, int]:
         render_size = self._get_render_size()
         r_height = self.rendered_height
@@ -2022,6 +2488,52 @@ class TextImage(BaseImage):
     # pixel-ratio == width / (height/2) == 2 * (width / height) == 2 * cell-ratio
     _pixel_ratio = property(lambda _: get_cell_ratio() * 2)
 
+    #: If ``True``, only the lines of an animation frame that differ from those of
+    #: the previous frame are written to the terminal, when drawing animations.
+    #:
+    #: Otherwise, every line of every frame is written.
+    DELTA_FRAMES: bool = True
+
+    @staticmethod
+    def _get_frame_delta(prev_frame_lines: List[str], frame_lines: List[str]) -> str:
+        """Returns the output required to update an animation frame on-screen.
+
+        Args:
+            prev_frame_lines: The lines of the frame currently on-screen.
+            frame_lines: The lines of the new frame.
+
+        Returns:
+            The lines of the new frame that differ from those of the current frame,
+            along with the cursor movements to skip the unchanged lines.
+
+        The cursor is assumed to be on the last line of the current frame and is left
+        on the last line of the new frame.
+
+        If both frames differ in height, the entire new frame is returned.
+        """
+        last_row = len(frame_lines) - 1
+        if len(prev_frame_lines) != len(frame_lines):
+            # A zero count moves the cursor by one line
+            up = len(prev_frame_lines) - 1
+            return "\r" + f"{CSI}{up}A" * bool(up) + "\n".join(frame_lines)
+
+        output = []
+        row = last_row
+        for line_no, (prev_line, line) in enumerate(zip(prev_frame_lines, frame_lines)):
+            if line != prev_line:
+                if line_no < row:
+                    output.append(f"\r{CSI}{row - line_no}A")
+                elif line_no > row:
+                    output.append(f"\r{CSI}{line_no - row}B")
+                else:
+                    output.append("\r")
+                output.append(line)
+                row = line_no
+        if row < last_row:
+            output.append(f"{CSI}{last_row - row}B")
+
+        return "".join(output)
+
     @staticmethod
     @cached
     def _is_on_kitty() -> bool:
@@ -2058,8 +2570,42 @@ class ImageIterator:
     * Directly adjusting the seek position of the image doesn't affect iteration.
       Use :py:meth:`ImageIterator.seek` instead.
     * After the iterator is exhausted, the underlying image is set to frame ``0``.
+    * The frame cache is bounded by :py:attr:`CACHE_MAXSIZE`. When the limit is
+      exceeded, frames are evicted according to :py:attr:`CACHE_POLICY` and evicted
+      frames are re-rendered when next required.
     """
 
+    #: Maximum total size (in bytes) of the frames cached by an iterator, or ``None``
+    #: for no limit.
+    CACHE_MAXSIZE: Optional[int] = None
+
+    #: ZLIB compression level of cached frames.
+    #:
+    #: 1 -> best speed, 9 -> best compression, 0 -> no compression.
+    #: Frames of text-based render styles are highly repetitive and compress well,
+    #: such that more frames fit within :py:attr:`CACHE_MAXSIZE`, at the cost of
+    #: (de)compression time.
+    CACHE_COMPRESS: int = 0
+
+    #: Frame cache eviction policy, when :py:attr:`CACHE_MAXSIZE` is exceeded.
+    #:
+    #: * ``"loop"``: The frame which will be required furthest in the future,
+    #:   with respect to the loop position, is evicted (or not cached). A fixed
+    #:   portion of the animation stays cached across loops.
+    #: * ``"lru"``: The least recently used frame is evicted. Better suited when the
+    #:   iterator is seeked frequently.
+    CACHE_POLICY: str = "loop"
+
+    #: The number of frames rendered ahead of the current frame, in parallel, on as
+    #: many worker threads. ``0`` (zero) disables look-ahead rendering.
+    #:
+    #: Useful when rendering a frame takes a significant part of (or longer than) its
+    #: duration e.g large renders. Frames are still decoded in order, only once.
+    #:
+    #: .. note:: Not applicable to :py:class:`~term_image.image.KittyImage` frames
+    #:   transmitted via a local medium.
+    LOOKAHEAD: int = 0
+
     def __init__(
         self,
         image: BaseImage,
@@ -2147,6 +2693,12 @@ class ImageIterator:
             This method is automatically called when the iterator is exhausted or
             garbage-collected.
         """
+        try:
+            self._lookahead.close()
+            del self._lookahead
+        except AttributeError:
+            pass
+
         try:
             self._animator.close()
             del self._animator
@@ -2202,7 +2754,35 @@ class ImageIterator:
         cached = self._cached
         self._loop_no = repeat = self._repeat
         if cached:
-            cache = [(None,) * 2] * image.n_frames
+            cache = _FrameCache(
+                image.n_frames,
+                self.CACHE_MAXSIZE,
+                self.CACHE_COMPRESS,
+                self.CACHE_POLICY,
+            )
+            skip = cache.has
+        else:
+            skip = None
+
+        # Frames transmitted via a local medium (kitty) are written out when rendered
+        self._lookahead = lookahead = (
+            _Lookahead(
+                image, img, self._render_ahead(alpha, fmt, style_args), self.LOOKAHEAD
+            )
+            if self.LOOKAHEAD > 0 and not style_args.get("local")
+            else None
+        )
+
+        def render(n: int, size_hash: int) -> str:
+            future = lookahead and lookahead.pop(n, size_hash)
+            if not future:
+                frame = image._format_render(
+                    image._render_image(img, alpha, frame=True, **style_args), *fmt
+                )
+            if lookahead:
+                lookahead.schedule(n, size_hash, skip)
+
+            return future.result() if future else frame
 
         sent = None
         n = 0
@@ -2210,9 +2790,7 @@ class ImageIterator:
             if sent is None:
                 image._seek_position = n
                 try:
-                    frame = image._format_render(
-                        image._render_image(img, alpha, frame=True, **style_args), *fmt
-                    )
+                    frame = render(n, hash(image.rendered_size))
                 except EOFError:
                     image._seek_position = n = 0
                     if repeat > 0:  # Avoid infinitely large negative numbers
@@ -2222,24 +2800,24 @@ class ImageIterator:
                     continue
                 else:
                     if cached:
-                        cache[n] = (frame, hash(image.rendered_size))
+                        cache.put(n, frame, hash(image.rendered_size))
 
             sent = yield frame
             n = n + 1 if sent is None else sent - 1
 
         if cached:
-            n_frames = len(cache)
+            n_frames = cache.n_frames
         while repeat:
             while n < n_frames:
                 if sent is None:
                     image._seek_position = n
-                    frame, size_hash = cache[n]
-                    if hash(image.rendered_size) != size_hash:
-                        frame = image._format_render(
-                            image._render_image(img, alpha, frame=True, **style_args),
-                            *fmt,
-                        )
-                        cache[n] = (frame, hash(image.rendered_size))
+                    size_hash = hash(image.rendered_size)
+                    frame = cache.get(n, size_hash)
+                    if frame is None:
+                        frame = render(n, size_hash)
+                        cache.put(n, frame, size_hash)
+                    elif lookahead:
+                        lookahead.schedule(n, size_hash, skip)
 
                 sent = yield frame
                 n = n + 1 if sent is None else sent - 1
@@ -2251,3 +2829,653 @@ class ImageIterator:
         # For consistency in behaviour
         if img is image._source:
             img.seek(0)
+
+    @staticmethod
+    def _render_ahead(
+        alpha: Union[None, float, str],
+        fmt: Tuple[Union[None, str, int]],
+        style_args: Dict[str, Any],
+    ) -> Callable[[BaseImage, PIL.Image.Image], str]:
+        """Returns a function that renders and formats a single frame, on a worker
+        thread.
+        """
+
+        def render(image: BaseImage, frame_img: PIL.Image.Image) -> str:
+            try:
+                return image._format_render(
+                    image._render_image(frame_img, alpha, frame=True, **style_args),
+                    *fmt,
+                )
+            finally:
+                frame_img.close()
+
+        return render
+
+
+class _FrameCache:
+    """A cache of rendered and formatted frames of an animation, bounded by the total
+    size of the frames.
+
+    Args:
+        n_frames: The number of frames of the animation.
+        maxsize: The maximum total size (in bytes) of the cached frames, or ``None``
+          for no limit.
+        level: The ZLIB compression level of cached frames.
+        policy: The eviction policy. See :py:attr:`ImageIterator.CACHE_POLICY`.
+    """
+
+    def __init__(
+        self, n_frames: int, maxsize: Optional[int], level: int, policy: str
+    ) -> None:
+        self.n_frames = n_frames
+        self._maxsize = maxsize
+        self._level = level
+        self._lru = policy == "lru"
+        self._frames = OrderedDict()  # frame number -> (frame, size hash, size)
+        self._size = 0
+
+    def has(self, n: int, size_hash: int) -> bool:
+        """Checks if frame *n* is cached, rendered at the size with the given hash."""
+        return n in self._frames and self._frames[n][1] == size_hash
+
+    def get(self, n: int, size_hash: int) -> Optional[str]:
+        """Returns the cached frame *n*, if rendered at the size with the given hash."""
+        try:
+            frame, frame_size_hash, _ = self._frames[n]
+        except KeyError:
+            return None
+        if frame_size_hash != size_hash:
+            return None
+
+        if self._lru:
+            self._frames.move_to_end(n)
+
+        return decompress(frame).decode() if self._level else frame
+
+    def put(self, n: int, frame: str, size_hash: int) -> None:
+        """Caches frame *n*, the frame at the current loop position."""
+        if self._level:
+            frame = compress(frame.encode(), self._level)
+        size = sys.getsizeof(frame)
+        frames = self._frames
+        maxsize = self._maxsize
+        if maxsize is not None and size > maxsize:
+            return
+
+        old = frames.pop(n, None)
+        if old:
+            self._size -= old[2]
+
+        if maxsize is not None and self._size + size > maxsize:
+            # Frames rendered at a different size are useless
+            for k in [k for k, (_, hash_, _) in frames.items() if hash_ != size_hash]:
+                self._size -= frames.pop(k)[2]
+
+            if self._lru:
+                while self._size + size > maxsize:
+                    self._size -= frames.popitem(last=False)[1][2]
+            elif self._size + size > maxsize:
+                # Every other frame is required before frame *n*, on the next loop
+                return
+
+        frames[n] = (frame, size_hash, size)
+        self._size += size
+
+
+class _Lookahead:
+    """Renders the frames following the current frame of an animation ahead of time,
+    in parallel.
+
+    Args:
+        image: The animated image.
+        img: The PIL image from which frames are decoded.
+        render: Renders and formats a frame, given a copy of *image* and the frame.
+        depth: The number of frames rendered ahead; also, the number of worker
+          threads.
+
+    Frames are decoded in order, in the calling thread, as the frames of animated
+    image formats generally build upon previous frames i.e seeking backwards decodes
+    all frames from the first. Only the conversion, resizing, rendering and formatting
+    of frames are performed on the worker threads.
+    """
+
+    def __init__(
+        self,
+        image: BaseImage,
+        img: PIL.Image.Image,
+        render: Callable[[BaseImage, PIL.Image.Image], str],
+        depth: int,
+    ) -> None:
+        self._image = image
+        self._img = img
+        self._render = render
+        self._depth = depth
+        self._pool = ThreadPoolExecutor(depth, _LOOKAHEAD_THREAD_NAME)
+        self._pending = {}  # frame number -> (future, size hash)
+
+    def close(self) -> None:
+        for future, _ in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        self._pool.shutdown(wait=False)
+
+    def pop(self, n: int, size_hash: int) -> Optional[Future]:
+        """Returns the future of frame *n*, if rendered (or being rendered) ahead at
+        the size with the given hash.
+        """
+        future, frame_size_hash = self._pending.pop(n, (None, None))
+        if future and frame_size_hash != size_hash:
+            future.cancel()
+            return None
+
+        return future
+
+    def schedule(
+        self,
+        n: int,
+        size_hash: int,
+        skip: Optional[Callable[[int, int], bool]] = None,
+    ) -> None:
+        """Schedules frames following frame *n* to be rendered ahead.
+
+        Args:
+            n: The current frame number.
+            size_hash: The hash of the current rendered size.
+            skip: Determines if a frame (given the frame number and *size_hash*) needs
+              not be rendered e.g if it's cached.
+        """
+        image = self._image
+        pending = self._pending
+        n_frames = image.n_frames
+        depth = min(self._depth, n_frames - 1)
+        window = [(n + i) % n_frames for i in range(1, depth + 1)]
+
+        # Frames outside the window (e.g after a seek) or rendered at a stale size
+        for m in [
+            m
+            for m, (_, hash_) in pending.items()
+            if hash_ != size_hash or m not in window
+        ]:
+            pending.pop(m)[0].cancel()
+
+        for m in window:
+            if m in pending or skip and skip(m, size_hash):
+                continue
+            frame_img = image._get_frame(self._img, m)
+            if frame_img is self._img:
+                frame_img = frame_img.copy()
+            frame_image = copy(image)
+            frame_image._closed = True  # Must not release the resources of *image*
+            frame_image._seek_position = 0  # *frame_img* is a single frame
+            frame_image._frame_index = None
+            pending[m] = (
+                self._pool.submit(self._render, frame_image, frame_img),
+                size_hash,
+            )
+
+
+class _FrameScheduler:
+    """Paces the frames of an animation against a monotonic clock.
+
+    Args:
+        policy: The policy applied when frames are behind schedule. See
+          :py:attr:`BaseImage.SYNC_POLICY`.
+
+    Usage:
+        #. :py:meth:`start` just after the first frame is displayed.
+        #. :py:meth:`next` just after a frame is displayed, to schedule the next
+           frame. With the ``"drop"`` policy, the frames behind schedule should be
+           skipped; :py:meth:`undrop` those which can not be.
+        #. :py:meth:`wait` (or wait for :py:meth:`remaining`), then display the next
+           frame.
+
+    The display time of every frame is derived from that of the first frame, rather
+    than the previous frame, such that delays do not accumulate.
+    """
+
+    def __init__(self, policy: str) -> None:
+        self._policy = policy
+        self._due = None  # Display time of the last scheduled frame
+        self._checked = False  # Whether the lateness of the due frame is counted
+        self.rendered = self.dropped = self.late = 0
+        self.write_time = self.max_write_time = 0.0
+
+    stats = property(
+        lambda self: {
+            "rendered": self.rendered,
+            "dropped": self.dropped,
+            "late": self.late,
+            "write_latency": self.write_time / self.rendered if self.rendered else 0.0,
+            "max_write_latency": self.max_write_time,
+        },
+        doc="Playback statistics. See :py:attr:`BaseImage.anim_stats`.",
+    )
+
+    def next(self, duration: float) -> int:
+        """Schedules the next frame.
+
+        Args:
+            duration: The duration (in seconds) of the frame currently displayed.
+
+        Returns:
+            The number of frames (starting from the next) to be skipped, to keep in
+            sync. Always zero, except with the ``"drop"`` policy.
+        """
+        now = time.monotonic()
+        if self._policy == "stretch":
+            self._due = max(self._due, now) + duration
+        else:
+            self._due += duration
+            lag = now - self._due
+            if self._policy == "drop" and lag >= duration:
+                dropped = int(lag // duration)
+                self._due += dropped * duration
+                self.dropped += dropped
+                self._checked = False
+                return dropped
+        self._checked = False
+
+        return 0
+
+    def undrop(self, n: int) -> None:
+        """Records that *n* of the frames to be skipped, as returned by the last call
+        to :py:meth:`next`, were not skipped (e.g the animation ended or they were
+        not yet rendered).
+        """
+        self.dropped -= n
+
+    def remaining(self) -> float:
+        """Returns the time (in seconds) left until the next frame is due"""
+        remaining = self._due - time.monotonic()
+        if remaining < 0 and not self._checked:
+            self.late += 1
+            self._checked = True
+
+        return max(0.0, remaining)
+
+    def start(self) -> None:
+        """Sets the display time of the first frame to the current time"""
+        self._due = time.monotonic()
+
+    def wait(self) -> None:
+        """Sleeps until the next frame is due"""
+        time.sleep(self.remaining())
+
+    @contextmanager
+    def write(self) -> Generator[None, None, None]:
+        """Times the display of a frame"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            write_time = time.monotonic() - start
+            self.rendered += 1
+            self.write_time += write_time
+            self.max_write_time = max(self.max_write_time, write_time)
+
+
+class _OutputMonitor:
+    """Applies backpressure to animation frames written to the active terminal.
+
+    Args:
+        max_lag: The maximum time (in seconds) by which the terminal may lag behind
+          the frames written, beyond the round-trip time.
+        timeout: The maximum time (in seconds) for which pending responses are
+          awaited on exit, beyond the round-trip time. If ``None``, it's determined
+          by the amount of pending output, for the slowest expected terminal.
+
+    A device status report request is written after every frame. As the terminal
+    processes its input in order, each response marks the moment the terminal is
+    done with a frame, from which its throughput is measured.
+
+    Writing frames faster than they can be transmitted (e.g over a slow remote
+    session) only fills up buffers along the way, hence :py:meth:`drain` should be
+    called before a new frame is rendered.
+
+    Should be used as a context manager, within which input from the terminal is
+    neither echoed nor available to others.
+    """
+
+    _REQUEST = f"{CSI}5n"
+    _RESPONSE = f"{CSI}0n".encode()
+
+    def __init__(self, max_lag: float, timeout: Optional[float] = None) -> None:
+        self._max_lag = max_lag
+        self._timeout = timeout
+        self._pending = deque()  # (size, write time) of frames not yet processed
+        self._input = b""  # Incomplete response
+        self._acked_at = 0.0  # Time the last response was received
+        self._rtt = None  # The shortest round-trip time
+        self.bandwidth = None  # bytes/second
+
+    def __enter__(self) -> _OutputMonitor:
+        self._muted = mute_tty()
+        self._muted.__enter__()
+        # Terminals lacking support would stall the animation
+        start = time.monotonic()
+        response = query_terminal(
+            self._REQUEST.encode(), lambda s: not s.endswith(b"n")
+        )
+        if response and self._RESPONSE in response:
+            self._rtt = time.monotonic() - start
+        else:
+            self._muted.__exit__(None, None, None)
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        if self._rtt is None:
+            return
+        try:
+            # Responses arriving after the terminal is restored would be echoed
+            self._wait(
+                lambda: not self._pending,
+                self._rtt
+                + (
+                    self._max_lag
+                    + 1.0
+                    + sum(size for size, _ in self._pending) / _MIN_BANDWIDTH
+                    if self._timeout is None
+                    else self._timeout
+                ),
+            )
+        finally:
+            self._muted.__exit__(None, None, None)
+
+    supported = property(lambda self: self._rtt is not None)
+
+    def drain(self) -> None:
+        """Waits until the terminal lags behind the frames written by at most the
+        maximum lag.
+        """
+        self._wait(
+            lambda: (
+                not self._pending
+                or time.monotonic() - self._pending[0][1] <= self._rtt + self._max_lag
+            ),
+            self._rtt + self._max_lag + 1.0,
+        )
+
+    def written(self, frame: str, start: Optional[float] = None) -> None:
+        """Requests a response from the terminal, after the given frame.
+
+        Args:
+            frame: The frame (or render) written.
+            start: The time the write started. Defaults to the current time.
+        """
+        print(self._REQUEST, end="", flush=True)
+        self._pending.append((len(frame.encode()), start or time.monotonic()))
+
+    def _read(self, timeout: Optional[float]) -> None:
+        """Reads responses and updates the measurements"""
+        input = self._input + read_tty(
+            lambda s: self._RESPONSE not in s,
+            timeout if timeout is None else max(0.0, timeout),
+        )
+        n_responses = input.count(self._RESPONSE)
+        end = input.rfind(self._RESPONSE)
+        if end != -1:
+            input = input[end + len(self._RESPONSE) :]
+        self._input = input[-len(self._RESPONSE) + 1 :]  # At most, a partial response
+        if not n_responses:
+            return
+
+        now = time.monotonic()
+        size = 0
+        start = None
+        for _ in range(min(n_responses, len(self._pending))):
+            frame_size, written_at = self._pending.popleft()
+            size += frame_size
+            if start is None:
+                # The terminal was busy since the previous response or, if idle when
+                # the frame was written, from half a round-trip after the write until
+                # half a round-trip before the response
+                start = (
+                    written_at + self._rtt
+                    if written_at > self._acked_at
+                    else self._acked_at
+                )
+            self._rtt = min(self._rtt, now - written_at)
+        self._acked_at = now
+
+        if start is not None and now > start:
+            bandwidth = size / (now - start)
+            self.bandwidth = (
+                bandwidth
+                if self.bandwidth is None
+                else 0.75 * self.bandwidth + 0.25 * bandwidth
+            )
+
+    def _wait(self, done: Callable[[], bool], timeout: float) -> None:
+        """Reads responses until *done* returns ``True`` or *timeout* is up"""
+        self._read(None)
+        deadline = time.monotonic() + timeout
+        while not done() and time.monotonic() < deadline:
+            self._read(min(deadline - time.monotonic(), 0.05))
+
+
+class _FrameIndex:
+    """An index of the frames of an animated image, for fast random seek.
+
+    Args:
+        img: The PIL image, whose frames are indexed.
+        interval: The keyframe interval.
+        disk: If ``True``, frame data is stored in a temporary file. Otherwise, in
+          memory.
+
+    All frames are decoded once, in order. Every *interval*-th frame (a keyframe) is
+    stored whole while every other frame is stored as only the region which differs
+    from the previous frame. Hence, a frame is reconstructed from the nearest
+    preceding keyframe with at most ``interval - 1`` region pastes.
+
+    The frame count and durations are determined in the same pass.
+    """
+
+    def __init__(self, img: PIL.Image.Image, interval: int, disk: bool) -> None:
+        self._file = TemporaryFile() if disk else None
+        self._blobs = []  # frame data or (offset, length) of the data in *_file*
+        self._frames = []  # (keyframe, mode, size, box, palette, info)
+        self._lock = Lock()
+        self._last = None  # (frame number, frame) of the last reconstructed frame
+        self.durations = []
+
+        prev_frame = None
+        n = 0
+        try:
+            while True:
+                try:
+                    img.seek(n)
+                except EOFError:
+                    break
+                frame = img.copy()
+                self.durations.append((frame.info.get("duration") or 100) / 1000)
+
+                keyframe = not (
+                    n % interval
+                    and frame.mode == prev_frame.mode in {"L", "RGB", "RGBA"}
+                    and frame.size == prev_frame.size
+                )
+                if keyframe:
+                    box = None
+                    data = frame.tobytes()
+                else:
+                    with ImageChops.difference(prev_frame, frame) as diff:
+                        box = _get_bbox(diff)
+                    if box:
+                        with frame.crop(box) as region:
+                            data = region.tobytes()
+                    else:
+                        data = b""
+                self._store(compress(data, 1))
+                self._frames.append(
+                    (
+                        keyframe,
+                        frame.mode,
+                        frame.size,
+                        box,
+                        frame.palette and frame.getpalette(frame.palette.mode),
+                        frame.info,
+                    )
+                )
+
+                if prev_frame:
+                    prev_frame.close()
+                prev_frame = frame
+                n += 1
+        finally:
+            if prev_frame:
+                prev_frame.close()
+
+        self.n_frames = n
+
+    def get(self, n: int) -> PIL.Image.Image:
+        """Returns a new PIL image of frame *n*.
+
+        Raises:
+            EOFError: *n* is out of range.
+        """
+        if not 0 <= n < self.n_frames:
+            raise EOFError(f"Frame number out of range (got: {n})")
+
+        with self._lock:
+            start = n
+            while not self._frames[start][0]:
+                start -= 1
+
+            # Sequential access builds upon the last reconstructed frame
+            if self._last and start <= self._last[0] <= n:
+                m, frame = self._last
+            else:
+                if self._last:
+                    self._last[1].close()
+                _, mode, size, _, palette, _ = self._frames[start]
+                frame = Image.frombytes(mode, size, self._load(start))
+                if palette:
+                    frame.putpalette(palette)
+                m = start
+
+            for m in range(m + 1, n + 1):
+                _, mode, _, box, _, _ = self._frames[m]
+                if box:
+                    frame.paste(
+                        Image.frombytes(
+                            mode, (box[2] - box[0], box[3] - box[1]), self._load(m)
+                        ),
+                        box[:2],
+                    )
+            frame.info = self._frames[n][5].copy()
+            self._last = (n, frame)
+
+            return frame.copy()
+
+    def _load(self, n: int) -> bytes:
+        """Returns the data of frame *n*"""
+        if self._file:
+            offset, length = self._blobs[n]
+            self._file.seek(offset)
+            data = self._file.read(length)
+        else:
+            data = self._blobs[n]
+
+        return decompress(data)
+
+    def _store(self, data: bytes) -> None:
+        """Stores the data of the next frame"""
+        if self._file:
+            self._blobs.append((self._file.tell(), len(data)))
+            self._file.write(data)
+        else:
+            self._blobs.append(data)
+
+
+def _get_bbox(img: PIL.Image.Image) -> Optional[Tuple[int, int, int, int]]:
+    """Returns the bounding box of the non-zero regions of all bands of an image"""
+    # `getbbox()` considers only the alpha band of RGBA images
+    boxes = [box for box in map(Image.Image.getbbox, img.split()) if box]
+    if not boxes:
+        return None
+    lefts, tops, rights, bottoms = zip(*boxes)
+
+    return min(lefts), min(tops), max(rights), max(bottoms)
+
+
+def _get_terminal_bandwidth() -> float:
+    """Returns the last measured throughput (in bytes/second) of the
+    :term:`active terminal`, or the default if never measured.
+    """
+    key = "bandwidth %s %s" % get_terminal_name_version()
+    return float(_capabilities.get(key, _DEFAULT_BANDWIDTH))
+
+
+def _store_terminal_bandwidth(bandwidth: float) -> None:
+    """Updates the throughput of the :term:`active terminal` with a new measurement.
+
+    The stored value is smoothed across measurements and persisted in the capability
+    cache (see :py:func:`~term_image.utils.init_capability_cache`).
+    """
+    key = "bandwidth %s %s" % get_terminal_name_version()
+    if key in _capabilities:
+        bandwidth = 0.75 * float(_capabilities[key]) + 0.25 * bandwidth
+    _store_capabilities({key: repr(bandwidth).encode()})
+
+
+def _get_tuning_key(style: str, animated: bool) -> str:
+    """Returns the capability cache key of an :py:meth:`~GraphicsImage.auto_tune`
+    selection for the :term:`active terminal`.
+    """
+    return "tuning %s %s %s %d" % (*get_terminal_name_version(), style, animated)
+
+
+def _get_encoder_pool() -> Optional[ThreadPoolExecutor]:
+    """Returns the thread pool for encoding image lines.
+
+    The pool is (re-)created when :py:attr:`GraphicsImage.ENCODER_THREADS` changes.
+    ``None`` is returned if parallel encoding is disabled.
+    """
+    global _encoder_pool, _encoder_pool_size
+
+    size = GraphicsImage.ENCODER_THREADS
+    if size is None:
+        size = min(
+            (
+                len(os.sched_getaffinity(0))
+                if hasattr(os, "sched_getaffinity")
+                else os.cpu_count() or 1
+            ),
+            8,
+        )
+    if size < 2:
+        return None
+
+    with _encoder_pool_lock:
+        if size != _encoder_pool_size:
+            if _encoder_pool:
+                _encoder_pool.shutdown(wait=False)
+            _encoder_pool = ThreadPoolExecutor(size, _ENCODER_THREAD_NAME)
+            _encoder_pool_size = size
+
+        return _encoder_pool
+
+
+def _reset_encoder_pool() -> None:
+    """Discards the encoder thread pool inherited by a forked process, whose
+    threads don't exist in the child.
+    """
+    global _encoder_pool, _encoder_pool_lock, _encoder_pool_size
+
+    _encoder_pool = None
+    _encoder_pool_lock = Lock()
+    _encoder_pool_size = 0
+
+
+_ENCODER_THREAD_NAME = "term_image-encoder"
+_LOOKAHEAD_THREAD_NAME = "term_image-lookahead"
+_encoder_pool: Optional[ThreadPoolExecutor] = None
+_encoder_pool_lock = Lock()
+_encoder_pool_size = 0
+_DEFAULT_BANDWIDTH = 100 * 2**20  # bytes/second, assumed until measured
+_MIN_BANDWIDTH = 2**17  # bytes/second, assumed when awaiting the terminal
+# Smaller renders of non-animated images are written without measurement, as the
+# time to process them is dominated by latency
+_MIN_MEASURED_SIZE = 2**16
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_encoder_pool)
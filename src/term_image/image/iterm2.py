@@ -9,7 +9,7 @@ import warnings
 from base64 import standard_b64encode
 from operator import mul
 from threading import Event
-from typing import Any, Dict, Optional, Set, Tuple, Union
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 import PIL
 
@@ -396,6 +396,30 @@ class ITerm2Image(GraphicsImage):
         # Konsole sometimes requires ST to be written twice.
         print(f"{ST * 2}", end="", flush=True)
 
+    def _get_tuning_candidates(
+        self, animated: bool
+    ) -> List[List[Tuple[Dict[str, Any], Dict[str, Any]]]]:
+        if self._TERM == "konsole" or animated:
+            methods = (WHOLE,)
+        elif self.rendered_height > get_terminal_size()[1]:
+            methods = (LINES,)
+        else:
+            methods = (LINES, WHOLE)
+
+        # JPEG re-encoding is more costly than any compression level but yields
+        # smaller output
+        return [
+            [
+                ({"method": method, "compress": compress}, {"JPEG_QUALITY": -1})
+                for compress in (0, 1, 4, 9)
+            ]
+            + [
+                ({"method": method, "compress": 4}, {"JPEG_QUALITY": quality})
+                for quality in (90, 75)
+            ]
+            for method in methods
+        ]
+
     def _render_image(
         self,
         img: PIL.Image.Image,
@@ -512,8 +536,8 @@ class ITerm2Image(GraphicsImage):
                 jpeg_quality = None
 
             if render_method == LINES:
-                raw_image = io.BytesIO(img.tobytes())
-                compressed_image = io.BytesIO()
+                raw_image = memoryview(img.tobytes())
+                mode = img.mode
             else:
                 compressed_image = io.BytesIO()
                 img.save(
@@ -532,32 +556,42 @@ class ITerm2Image(GraphicsImage):
             # separately than concatenate and write together.
 
             cell_height = height // r_height
-            bytes_per_line = width * cell_height * (len(img.mode))
+            bytes_per_line = width * cell_height * len(mode)
             control_data = (
                 f";width={r_width};height=1;preserveAspectRatio=0;inline=1"
                 f"{';doNotMoveCursor=1' * is_on_konsole}:"
             )
 
-            with io.StringIO() as buffer, raw_image, compressed_image:
-                for line in range(1, r_height + 1):
-                    compressed_image.seek(0)
-                    with PIL.Image.frombytes(
-                        img.mode, (width, cell_height), raw_image.read(bytes_per_line)
-                    ) as img:
-                        img.save(
-                            compressed_image,
-                            format,
-                            compress_level=compress,  # PNG
-                            quality=jpeg_quality,
-                        )
-                    compressed_image.truncate()
+            def encode(data: memoryview) -> Tuple[int, str]:
+                with io.BytesIO() as compressed_image, PIL.Image.frombytes(
+                    mode, (width, cell_height), data
+                ) as img:
+                    img.save(
+                        compressed_image,
+                        format,
+                        compress_level=compress,  # PNG
+                        quality=jpeg_quality,
+                    )
+                    return (
+                        compressed_image.tell(),
+                        standard_b64encode(compressed_image.getvalue()).decode(),
+                    )
+
+            # Encoding is the bulk of the work
+            lines = self._encode_lines(
+                encode,
+                [
+                    raw_image[n * bytes_per_line : (n + 1) * bytes_per_line]
+                    for n in range(r_height)
+                ],
+            )
 
+            with io.StringIO() as buffer:
+                for line, (size, payload) in enumerate(lines, 1):
                     buffer.write(erase)
-                    buffer.write(f"{START}size={compressed_image.tell()}")
+                    buffer.write(f"{START}size={size}")
                     buffer.write(control_data)
-                    buffer.write(
-                        standard_b64encode(compressed_image.getvalue()).decode()
-                    )
+                    buffer.write(payload)
                     buffer.write(ST)
                     is_on_konsole and buffer.write(jump_right)
                     line < r_height and buffer.write("\n")
@@ -3,17 +3,48 @@ from __future__ import annotations
 __all__ = ("KittyImage",)
 
 import io
+import os
 import re
 import sys
-from base64 import standard_b64encode
-from dataclasses import asdict, dataclass
-from typing import Any, Dict, Generator, Optional, Set, Tuple, Union
-from zlib import compress, decompress
+import tempfile
+from base64 import standard_b64decode, standard_b64encode
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, replace
+from operator import mul
+from struct import unpack
+from threading import Event
+from typing import Any, AnyStr, Dict, Generator, List, Optional, Set, Tuple, Union
+from zlib import (
+    DEFLATED,
+    MAX_WBITS,
+    Z_FINISH,
+    Z_SYNC_FLUSH,
+    adler32,
+    compress,
+    compressobj,
+    crc32,
+    decompress,
+)
 
 import PIL
-
-from ..utils import CSI, ESC, ST, get_terminal_name_version, query_terminal
-from .common import GraphicsImage
+from PIL import ImageChops
+
+from ..exceptions import _style_error
+from ..utils import (
+    CSI,
+    ESC,
+    ST,
+    _query_capability,
+    _register_capability_query,
+    get_terminal_name_version,
+    query_terminal,
+)
+from .common import GraphicsImage, _get_bbox
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
 
 # Constants for render methods
 LINES = "lines"
@@ -33,6 +64,10 @@ class KittyImage(GraphicsImage):
        Renders an image line-by-line i.e the image is evenly split across the number
        of lines it should occupy.
 
+       The image data is transmitted once (on the first line) and every line is a
+       placement of the corresponding region of the image. On Konsole, every line is
+       a separate image.
+
        Pros:
 
          * Good for use cases where it might be required to trim some lines of the
@@ -59,7 +94,7 @@ class KittyImage(GraphicsImage):
 
     ::
 
-        [method] [ z [index] ] [ m {0 | 1} ] [ c {0-9} ]
+        [method] [ z [index] ] [ m {0 | 1} ] [ c {0-9} ] [ i {0 | 1} ]
 
     * ``method``: Render method override.
 
@@ -67,6 +102,8 @@ class KittyImage(GraphicsImage):
 
         * ``L``: **LINES** render method (current frame only, for animated images).
         * ``W``: **WHOLE** render method (current frame only, for animated images).
+        * ``N``: Native animation. Ignored when used with non-animated images or
+          :py:class:`ImageIterator`.
 
       Default: Current effective render method of the image.
 
@@ -104,6 +141,17 @@ class KittyImage(GraphicsImage):
       * If *absent*, defaults to ``c4``.
       * e.g ``c0``, ``c9``.
 
+    * ``i``: Image reuse policy.
+
+      * If the character after ``i`` is:
+
+        * ``0``, images are transmitted on every draw.
+        * ``1``, images are transmitted under an ID, only if not already held by
+          the terminal, and displayed by placement.
+
+      * If *absent*, defaults to ``i0``.
+      * e.g ``i0``, ``i1``.
+
 
     ATTENTION:
         Currently supported terminal emulators include:
@@ -112,8 +160,24 @@ class KittyImage(GraphicsImage):
           * `Konsole <https://konsole.kde.org>`_ >= 22.04.0.
     """
 
+    #: Maximum total size (in bytes) of the pixel data of images held by the terminal,
+    #: as a result of renders with image reuse.
+    #:
+    #: When exceeded, the least recently used images are deleted from the terminal.
+    REUSE_MAXSIZE: int = 128 * 2**20  # 128 MiB
+
+    #: * ``True``, the data of PNG image files is transmitted as-is (in the PNG
+    #:   format) when possible and no image manipulation is required. Otherwise,
+    #:   images that require no downscaling are re-encoded in the PNG format only once
+    #:   per size and the result is reused by subsequent renders.
+    #: * ``False``, images are always loaded and transmitted as raw pixel data.
+    #:
+    #: .. note:: This setting does not affect animations. Also, on Konsole, it only
+    #:   applies to the **WHOLE** render method.
+    READ_FROM_FILE: bool = True
+
     _FORMAT_SPEC: Tuple[re.Pattern] = tuple(
-        map(re.compile, r"[LW] z(-?\d+)? m[01] c[0-9]".split(" "))
+        map(re.compile, r"[LWN] z(-?\d+)? m[01] c[0-9] i[01]".split(" "))
     )
     _render_methods: Set[str] = {LINES, WHOLE}
     _default_render_method: str = LINES
@@ -160,11 +224,45 @@ class KittyImage(GraphicsImage):
                 "Compression level must be between 0 and 9, both inclusive",
             ),
         ),
+        "reuse": (
+            False,
+            (
+                lambda x: isinstance(x, bool),
+                "Image reuse policy must be a boolean",
+            ),
+            (lambda _: True, ""),
+        ),
+        "local": (
+            False,
+            (
+                lambda x: isinstance(x, bool),
+                "Local transmission policy must be a boolean",
+            ),
+            (lambda _: True, ""),
+        ),
+        "native": (
+            False,
+            (
+                lambda x: isinstance(x, bool),
+                "Native animation policy must be a boolean",
+            ),
+            (lambda _: True, ""),
+        ),
+        "stall_native": (
+            True,
+            (
+                lambda x: isinstance(x, bool),
+                "Native animation execution policy must be a boolean",
+            ),
+            (lambda _: True, ""),
+        ),
     }
 
     _TERM: str = ""
     _TERM_VERSION: str = ""
     _KITTY_VERSION: Tuple[int, int, int] = ()
+    _local_medium: Optional[str] = None
+    _png_cache: Optional[Tuple[Tuple[Any, ...], bytes]] = None
 
     @staticmethod
     def clear(all: bool = True) -> None:
@@ -184,6 +282,10 @@ class KittyImage(GraphicsImage):
         z_index: Optional[int] = 0,
         mix: bool = False,
         compress: int = 4,
+        reuse: bool = False,
+        local: bool = False,
+        native: bool = False,
+        stall_native: bool = True,
         **kwargs,
     ) -> None:
         """Draws an image to standard output.
@@ -221,11 +323,50 @@ class KittyImage(GraphicsImage):
               no compression. This results in a trade-off between render time and data
               size/draw speed.
 
+            reuse: Image reuse policy **for non-animations**. If ``True``, the image
+              is transmitted under an ID derived from its pixel data and
+              subsequent draws of the same image only place it, for as long as the
+              terminal holds the image (see :py:attr:`REUSE_MAXSIZE`).
+
+            local: Local transmission policy **for animations**. If ``True``, frames
+              are transmitted via POSIX shared memory or temporary files (without
+              compression), if supported by the active terminal.
+
+              * The terminal must be running on the same host.
+              * Frames are never cached i.e *cached* is ignored.
+
+            native: If ``True``, use native animation i.e all frames are transmitted
+              once and the animation is played by the terminal.
+
+              * Ignored for non-animations.
+              * *animate* must be ``True``.
+              * *cached* and *local* do not apply.
+              * Only the areas of each frame that differ from the previous frame are
+                transmitted.
+              * Frame durations are those of the image file, if specified.
+              * The limitations of the **WHOLE** render method also apply.
+              * Normal restrictions for rendered/padding height of animations do not
+                apply.
+
+            stall_native: Native animation execution control. If:
+
+              * ``True``, block until the animation is over (or ``SIGINT`` (Ctrl+C) is
+                recieved, for infinite repetition).
+              * ``False``, return as soon as the image is transmitted.
+
             kwargs: Keyword arguments passed up the inheritance chain.
 
+        Raises:
+            term_image.exceptions.KittyImageError: Native animation is not supported.
+
         See the ``draw()`` method of the parent classes for full details, including the
         description of other parameters.
         """
+        if not (self._is_animated and kwargs.get("animate", True)):
+            # Prevent the arguments from being passed on
+            native = False
+            stall_native = True
+
         arguments = locals()
         super().draw(
             *args,
@@ -242,21 +383,8 @@ class KittyImage(GraphicsImage):
         if cls._supported is None:
             cls._supported = False
 
-            # Kitty graphics query + terminal attribute query
-            # The second query is to speed up the query since most (if not all)
-            # terminals should support it and most terminals treat queries as FIFO
-            response = query_terminal(
-                (
-                    f"{START}a=q,t=d,i=31,f=24,s=1,v=1,C=1,c=1,r=1;AAAA{ST}{CSI}c"
-                ).encode(),
-                lambda s: not s.endswith(b"c"),
-            )
-
-            # Not supported if it doesn't respond to either query
-            # or responds to the second but not the first
-            if response and (
-                response.decode().rpartition(ESC)[0] == f"{START}i=31;OK{ST}"
-            ):
+            # Not supported if it doesn't respond to the graphics query
+            if _query_capability("kitty_graphics") == f"{START}i=31;OK{ST}".encode():
                 name, version = get_terminal_name_version()
                 # Only kitty >= 0.20.0 implement the protocol features utilized
                 if name == "kitty" and version:
@@ -278,13 +406,15 @@ class KittyImage(GraphicsImage):
 
     @classmethod
     def _check_style_format_spec(cls, spec: str, original: str) -> Dict[str, Any]:
-        parent, (method, (z, index), mix, compress) = cls._get_style_format_spec(
+        parent, (method, (z, index), mix, compress, reuse) = cls._get_style_format_spec(
             spec, original
         )
         args = {}
         if parent:
             args.update(super()._check_style_format_spec(parent, original))
-        if method:
+        if method == "N":
+            args["native"] = True
+        elif method:
             args["method"] = LINES if method == "L" else WHOLE
         if z:
             args["z_index"] = index and int(index)
@@ -292,6 +422,8 @@ class KittyImage(GraphicsImage):
             args["mix"] = bool(int(mix[-1]))
         if compress:
             args["compress"] = int(compress[-1])
+        if reuse:
+            args["reuse"] = bool(int(reuse[-1]))
 
         return cls._check_style_args(args)
 
@@ -311,16 +443,66 @@ class KittyImage(GraphicsImage):
             return True
         return False
 
-    def _display_animated(self, *args, **kwargs) -> None:
+    def _display_animated(
+        self,
+        img,
+        alpha,
+        fmt,
+        repeat,
+        cached,
+        *,
+        local: bool = False,
+        native: bool = False,
+        stall_native: bool = True,
+        **style_args,
+    ) -> None:
+        if native:
+            if self._TERM == "konsole":
+                raise _style_error(type(self))(
+                    "Native animation is not supported in the active terminal"
+                )
+            if not isinstance(repeat, int):
+                raise TypeError(
+                    f"Invalid type for 'repeat' (got: {type(repeat).__name__})"
+                )
+            if not repeat:
+                raise ValueError("'repeat' must be non-zero")
+
+            try:
+                render, duration = self._render_native(
+                    img, alpha, repeat=repeat, **style_args
+                )
+                print(self._format_render(render, *fmt), end="", flush=True)
+            except (KeyboardInterrupt, Exception):
+                self._handle_interrupted_draw()
+                raise
+            else:
+                stall_native and native_anim.wait(
+                    None if repeat < 0 else duration * repeat
+                )
+            return
+
         if self._KITTY_VERSION > (0, 25, 0):
-            kwargs["z_index"] = None
+            style_args["z_index"] = None
         else:
             try:
-                del kwargs["z_index"]
+                del style_args["z_index"]
             except KeyError:
                 pass
 
-        super()._display_animated(*args, **kwargs)
+        if local:
+            # Frames transmitted via a local medium can be drawn only once
+            cached = False
+
+        try:
+            super()._display_animated(
+                img, alpha, fmt, repeat, cached, local=local, **style_args
+            )
+        finally:
+            _local_objects.clear()
+
+    def _display_image(self, render: str) -> None:
+        super()._display_image(_stored_images.filter(render))
 
     @staticmethod
     def _handle_interrupted_draw():
@@ -341,6 +523,111 @@ class KittyImage(GraphicsImage):
         # Konsole sometimes requires ST to be written twice.
         print(f"{ST * 2}{START}q=1,m=0;{ST}", end="", flush=True)
 
+        # It's unknown which transmissions were completed
+        _stored_images.clear()
+
+        # The terminal removes these after reading, unless they were never written
+        _discard_local_objects()
+
+    @classmethod
+    def _get_local_medium(cls) -> str:
+        """Determines the transmission medium for local transmission.
+
+        Returns:
+            Shared memory or temporary file, whichever the :term:`active terminal`
+            accepts first, or direct transmission if it accepts neither.
+        """
+        if cls._local_medium is None:
+            cls._local_medium = t.DIRECT
+            for medium in (t.SHARED, t.TEMP):
+                try:
+                    name = _write_local_object(medium, bytes(3))
+                except OSError:
+                    continue
+                response = query_terminal(
+                    (
+                        f"{START}a=q,t={medium},i=31,f=24,s=1,v=1,S=3;"
+                        f"{standard_b64encode(name.encode()).decode()}{ST}{CSI}c"
+                    ).encode(),
+                    lambda s: not s.endswith(b"c"),
+                )
+                _discard_local_objects()  # In case the terminal did not read it
+                if response and (
+                    response.decode().rpartition(ESC)[0] == f"{START}i=31;OK{ST}"
+                ):
+                    cls._local_medium = medium
+                    break
+
+        return cls._local_medium
+
+    def _get_png(
+        self,
+        img: PIL.Image.Image,
+        alpha: Union[None, float, str],
+        size: Tuple[int, int],
+        compress: int,
+    ) -> Optional[bytes]:
+        """Returns PNG-encoded image data for a render of the given size.
+
+        Returns:
+            The image file data, if the file can be used as-is, or the image
+            re-encoded (once per size) in the PNG format, if the image requires no
+            downscaling. Otherwise, ``None``.
+
+        See :py:attr:`READ_FROM_FILE`.
+        """
+        if (
+            not self.READ_FROM_FILE
+            or self._is_animated
+            or mul(*self._get_render_size()) < mul(*self._original_size)
+        ):
+            return None
+
+        if (
+            size == self._original_size
+            and img.format == "PNG"
+            and (
+                # None of the *alpha* options can affect these
+                img.mode in {"1", "L", "RGB"}
+                # Alpha threshold is unused with graphics-based styles
+                or isinstance(alpha, float)
+            )
+        ):
+            try:
+                with open(img.filename, "rb") as file:
+                    return file.read()
+            except (AttributeError, OSError):
+                pass
+
+        key = (size, alpha, compress)
+        if not self._png_cache or self._png_cache[0] != key:
+            png_img = self._get_render_data(img, alpha, size=size, pixel_data=False)[0]
+            with io.BytesIO() as png:
+                png_img.save(png, "PNG", compress_level=compress)
+                self._png_cache = (key, png.getvalue())
+            if png_img is not img is not self._source:
+                png_img.close()
+
+        return self._png_cache[1]
+
+    def _get_tuning_candidates(
+        self, animated: bool
+    ) -> List[List[Tuple[Dict[str, Any], Dict[str, Any]]]]:
+        if not animated:
+            methods = (LINES, WHOLE)
+        else:
+            # Frames are drawn over one another; the method is as for non-tuned
+            # animations
+            methods = (LINES,) if self._KITTY_VERSION else (WHOLE,)
+
+        return [
+            [
+                ({"method": method, "compress": compress}, {})
+                for compress in (0, 1, 4, 9)
+            ]
+            for method in methods
+        ]
+
     def _render_image(
         self,
         img: PIL.Image.Image,
@@ -351,6 +638,10 @@ class KittyImage(GraphicsImage):
         z_index: Optional[int] = 0,
         mix: bool = False,
         compress: int = 4,
+        reuse: bool = False,
+        local: bool = False,
+        native: bool = False,
+        repeat: int = -1,
     ) -> str:
         # NOTE: It's more efficient to write separate strings to the buffer separately
         # than concatenate and write together.
@@ -360,65 +651,280 @@ class KittyImage(GraphicsImage):
         # Since we use `c` and `r` control data keys, there's no need upscaling the
         # image on this end; ensures minimal payload.
 
+        if native and self._is_animated and not frame:
+            return self._render_native(
+                img, alpha, z_index=z_index, mix=mix, compress=compress, repeat=repeat
+            )[0]
+
         render_method = (method or self._render_method).lower()
         r_width, r_height = self.rendered_size
         width, height = self._get_minimal_render_size(adjust=render_method == LINES)
 
-        frame_img = img if frame else None
-        img = self._get_render_data(
-            img, alpha, size=(width, height), pixel_data=False, frame=frame  # fmt: skip
-        )[0]
-        format = getattr(f, img.mode)
-        raw_image = img.tobytes()
+        # Konsole can't crop placements of a PNG image
+        png = (
+            not frame
+            and (render_method == WHOLE or self._TERM != "konsole")
+            and self._get_png(img, alpha, (width, height), compress)
+        )
+        if png:
+            format = f.PNG
+            raw_image = png
+            compress = 0  # Already compressed
+            if img is not self._source:
+                img.close()
+        else:
+            frame_img = img if frame else None
+            img = self._get_render_data(
+                img, alpha, size=(width, height), pixel_data=False, frame=frame
+            )[0]  # fmt: skip
+            format = getattr(f, img.mode)
+            raw_image = img.tobytes()
 
-        # clean up (ImageIterator uses one PIL image throughout)
-        if frame_img is not img is not self._source:
-            img.close()
+            # clean up (ImageIterator uses one PIL image throughout)
+            if frame_img is not img is not self._source:
+                img.close()
 
-        control_data = ControlData(f=format, s=width, c=r_width, z=z_index)
         erase = "" if mix else f"{CSI}{r_width}X"
         jump_right = f"{CSI}{r_width}C"
+        reuse = reuse and not frame
         if z_index is None:
-            delete = f"{START}a=d,d=C;{ST}"
+            # Images held for reuse must not be freed along with their placements
+            delete = f"{START}a=d,d={'c' if reuse else 'C'};{ST}"
+
+        # Only frames, since the objects are removed by the terminal after reading
+        medium = self._get_local_medium() if local and frame else t.DIRECT
+        if medium != t.DIRECT:
+            _local_objects.clear()  # The previous frame must've been written
+
+        # The entire image is transmitted once and each line is a placement of a
+        # region of it. With image reuse, the image is transmitted under an ID.
+        # Otherwise, it's transmitted under an image number; the terminal creates a
+        # new image for every such transmission and placements refer to the newest,
+        # such that previously drawn renders of the same image are unaffected.
+        if render_method == LINES and self._TERM != "konsole":
+            cell_height = height // r_height
+            control_data = ControlData(
+                a=a.TRANS, f=format, s=width, v=height, z=None, C=None
+            )
+            control_data.q = 2  # IDs and numbers get responses
+            key = "i" if reuse else "I"
+            image_id = _image_id(raw_image, width, height, format)
+            setattr(control_data, key, image_id)
+            if medium != t.DIRECT:
+                vars(control_data).update(t=medium, S=len(raw_image))
+                raw_image = _write_local_object(medium, raw_image).encode()
+            place = "".join(
+                (
+                    f"{START}a=p,{key}={image_id},x=0,y=%d,w={width},h={cell_height}",
+                    f",c={r_width},r=1",
+                    "" if z_index is None else f",z={z_index}",
+                    f",C=1,q=2;{ST}",
+                )
+            )
+
+            with io.StringIO() as buffer:
+                for line in range(r_height):
+                    z_index is None and buffer.write(delete)
+                    line or buffer.write(
+                        Transmission(control_data, raw_image, compress).get_chunked()
+                    )
+                    buffer.write(place % (line * cell_height))
+                    # Writing spaces clears any text under transparent areas of an image
+                    buffer.write(erase)
+                    buffer.write(jump_right)
+                    line < r_height - 1 and buffer.write("\n")
+
+                return buffer.getvalue()
+
+        # With image reuse, an image is only transmitted (under an ID) and then
+        # displayed by a separate placement, such that the transmission can be dropped
+        # when written, if the terminal already holds the image.
+        # See `_StoredImages`.
+        if reuse:
+            control_data = ControlData(a=a.TRANS, f=format, s=width, z=None, C=None)
+            control_data.q = 2  # IDs get responses
+            place = "".join(
+                (
+                    f"{START}a=p,i=%d,c={r_width}",
+                    f",r={1 if render_method == LINES else r_height}",
+                    "" if z_index is None else f",z={z_index}",
+                    f",C=1,q=2;{ST}",
+                )
+            )
+        else:
+            control_data = ControlData(f=format, s=width, c=r_width, z=z_index)
+        control_data.t = medium
 
+        # Konsole; Every line is a separate image
         if render_method == LINES:
             cell_height = height // r_height
             bytes_per_line = width * cell_height * (format // 8)
-            vars(control_data).update(dict(v=cell_height, r=1))
+            vars(control_data).update(v=cell_height, r=None if reuse else 1)
+
+            raw_image = memoryview(raw_image)
+            lines = []
+            for n in range(r_height):
+                line_control_data = replace(control_data)
+                data = raw_image[n * bytes_per_line : (n + 1) * bytes_per_line]
+                if reuse:
+                    line_control_data.i = _image_id(data, width, cell_height, format)
+                elif medium != t.DIRECT:
+                    line_control_data.S = len(data)
+                    data = _write_local_object(medium, data).encode()
+                lines.append((line_control_data, data))
+
+            # Compression is the bulk of the work
+            transmissions = self._encode_lines(
+                lambda line: Transmission(*line, compress).get_chunked(), lines
+            )
 
-            with io.StringIO() as buffer, io.BytesIO(raw_image) as raw_image:
-                trans = Transmission(
-                    control_data, raw_image.read(bytes_per_line), compress
-                )
-                z_index is None and buffer.write(delete)
-                for chunk in trans.get_chunks():
-                    buffer.write(chunk)
-                # Writing spaces clears any text under transparent areas of an image
-                for _ in range(r_height - 1):
+            with io.StringIO() as buffer:
+                for line, ((control_data, _), transmission) in enumerate(
+                    zip(lines, transmissions), 1
+                ):
+                    z_index is None and buffer.write(delete)
+                    buffer.write(transmission)
+                    reuse and buffer.write(place % control_data.i)
+                    # Writing spaces clears any text under transparent areas of an image
                     buffer.write(erase)
                     buffer.write(jump_right)
-                    buffer.write("\n")
-                    trans = Transmission(
-                        control_data, raw_image.read(bytes_per_line), compress
-                    )
-                    z_index is None and buffer.write(delete)
-                    for chunk in trans.get_chunks():
-                        buffer.write(chunk)
-                buffer.write(erase)
-                buffer.write(jump_right)
+                    line < r_height and buffer.write("\n")
 
                 return buffer.getvalue()
 
-        vars(control_data).update(v=height, r=r_height)
+        vars(control_data).update(
+            v=None if png else height, r=None if reuse else r_height
+        )
+        if reuse:
+            control_data.i = _image_id(raw_image, width, height, format)
+        elif medium != t.DIRECT:
+            control_data.S = len(raw_image)
+            raw_image = _write_local_object(medium, raw_image).encode()
         return "".join(
             (
                 z_index is None and delete or "",
                 Transmission(control_data, raw_image, compress).get_chunked(),
+                reuse and place % control_data.i or "",
                 f"{erase}{jump_right}\n" * (r_height - 1),
                 f"{erase}{jump_right}",
             )
         )
 
+    def _render_native(
+        self,
+        img: PIL.Image.Image,
+        alpha: Union[None, float, str],
+        *,
+        z_index: Optional[int] = 0,
+        mix: bool = False,
+        compress: int = 4,
+        repeat: int = -1,
+        **_: Any,
+    ) -> Tuple[str, float]:
+        """Renders a native animation.
+
+        All frames are transmitted under a single image ID. Each frame after the first
+        is composed on the previous, such that only the region which differs from the
+        previous frame is transmitted.
+
+        Returns:
+            The render and the duration (in seconds) of a single loop.
+        """
+        r_width, r_height = self.rendered_size
+        width, height = self._get_minimal_render_size(adjust=False)
+
+        # (control data, pixel data) of every frame
+        frames: List[Tuple[ControlData, bytes]] = []
+        gaps: List[int] = []
+        image_id = crc32(f"{width},{height}".encode())
+        prev_frame = None
+        prev_seek_pos = self._seek_position
+        try:
+            for n in range(self.n_frames):
+                self._seek_position = n
+                frame_img = self._get_render_data(
+                    img, alpha, size=(width, height), pixel_data=False, frame=True
+                )[0]  # fmt: skip
+                if frame_img is img:  # Would be altered by the next seek
+                    frame_img = img.copy()
+                gap = round(
+                    self._frame_index.durations[n] * 1000
+                    if self._frame_index
+                    else img.info.get("duration") or self._frame_duration * 1000
+                )
+
+                if prev_frame is None:
+                    box = (0, 0, width, height)
+                    control_data = ControlData(
+                        f=getattr(f, frame_img.mode),
+                        s=width,
+                        v=height,
+                        c=r_width,
+                        r=r_height,
+                        z=z_index,
+                    )
+                else:
+                    if prev_frame.mode == frame_img.mode:
+                        with ImageChops.difference(prev_frame, frame_img) as diff:
+                            box = _get_bbox(diff)
+                    else:
+                        box = (0, 0, width, height)
+                    prev_frame.close()
+                    if not box:  # Same as the previous frame
+                        gaps[-1] += gap
+                        prev_frame = frame_img
+                        continue
+                    left, top, right, bottom = box
+                    control_data = ControlData(
+                        a=a.TRANS_FRAMES,
+                        f=getattr(f, frame_img.mode),
+                        s=right - left,
+                        v=bottom - top,
+                        z=None,
+                        C=None,
+                        c=len(frames),  # base frame (1-based)
+                        x=left,
+                        y=top,
+                        X=1,  # replace, no alpha blending
+                    )
+
+                if box == (0, 0, *frame_img.size):
+                    data = frame_img.tobytes()
+                else:
+                    with frame_img.crop(box) as box_img:
+                        data = box_img.tobytes()
+                image_id = crc32(data, crc32(repr(box).encode(), image_id))
+                frames.append((control_data, data))
+                gaps.append(gap)
+                prev_frame = frame_img
+        finally:
+            self._seek_position = prev_seek_pos
+            if prev_frame:
+                prev_frame.close()
+            if img is not self._source:
+                img.close()
+
+        image_id = image_id or 1
+        with io.StringIO() as buffer:
+            z_index is None and buffer.write(f"{START}a=d,d=C;{ST}")
+            for n, (control_data, data) in enumerate(frames):
+                vars(control_data).update(i=image_id, q=2)
+                if n:  # Gap of the first frame is set below
+                    control_data.z = gaps[n]
+                buffer.write(Transmission(control_data, data, compress).get_chunked())
+            buffer.write(f"{START}a=a,i={image_id},r=1,z={gaps[0]},q=2;{ST}")
+            # Loop count: 1 -> infinite, n -> n - 1 loops
+            buffer.write(
+                f"{START}a=a,i={image_id},s=3,v={repeat + 1 if repeat > 0 else 1},q=2;"
+                f"{ST}"
+            )
+            erase = "" if mix else f"{CSI}{r_width}X"
+            jump_right = f"{CSI}{r_width}C"
+            buffer.write(f"{erase}{jump_right}\n" * (r_height - 1))
+            buffer.write(f"{erase}{jump_right}")
+
+            return buffer.getvalue(), sum(gaps) / 1000
+
 
 @dataclass
 class Transmission:
@@ -447,7 +953,7 @@ class Transmission:
 
     def compress(self):
         if self.control.t == t.DIRECT and not self._compressed and self.level:
-            self.payload = compress(self.payload, self.level)
+            self.payload = _compress(self.payload, self.level)
             self.control.o = o.ZLIB
             self._compressed = True
 
@@ -461,22 +967,41 @@ class Transmission:
         return standard_b64encode(self.payload)
 
     def get_chunked(self) -> str:
-        return "".join(self.get_chunks())
+        return b"".join(self.get_chunks()).decode("ascii")
 
-    def get_chunks(self, size: int = 4096) -> Generator[str, None, None]:
-        with self.get_payload() as payload:
-            chunk, next_chunk = payload.read(size), payload.read(size)
-            yield (
-                f"{START}{self.get_control_data()},m={bool(next_chunk):d};{chunk}{ST}"
-            )
+    def get_chunks(self, size: int = 4096) -> Generator[bytes, None, None]:
+        """Encodes the payload into escape sequences, one chunk at a time.
+
+        Args:
+            size: Maximum size of the encoded payload of a chunk; a multiple of 4.
 
-            chunk, next_chunk = next_chunk, payload.read(size)
-            while next_chunk:
-                yield f"{START}m=1;{chunk}{ST}"
-                chunk, next_chunk = next_chunk, payload.read(size)
+        Yields:
+            Escape sequences, each carrying a chunk of the base64-encoded payload.
 
-            if chunk:  # false if there was never a next chunk
-                yield f"{START}m=0;{chunk}{ST}"
+        The payload is encoded directly from a memory view, in slices of
+        ``size // 4 * 3`` bytes, such that no chunk of the encoded payload (but the
+        last) has padding and at no point is the entire encoded payload held in
+        memory, except by the consumer.
+        """
+        payload = memoryview(self.payload)
+        step = size // 4 * 3
+        end = len(payload)
+
+        yield b"".join(
+            (
+                f"{START}{self.get_control_data()},m={end > step:d};".encode(),
+                standard_b64encode(payload[:step]),
+                _ST_BYTES,
+            )
+        )
+        for start in range(step, end, step):
+            yield b"".join(
+                (
+                    _CHUNK_START if start + step < end else _LAST_CHUNK_START,
+                    standard_b64encode(payload[start : start + step]),
+                    _ST_BYTES,
+                )
+            )
 
     def get_control_data(self) -> str:
         return ",".join(
@@ -485,9 +1010,6 @@ class Transmission:
             if value is not None
         )
 
-    def get_payload(self) -> io.StringIO:
-        return io.StringIO(self.encode().decode("ascii"))
-
 
 # Values for control data keys with limited set of values
 
@@ -548,6 +1070,16 @@ class ControlData:
     c: Optional[int] = None  # columns
     r: Optional[int] = None  # rows
 
+    i: Optional[int] = None  # image ID
+    I: Optional[int] = None  # image number
+    q: Optional[int] = None  # response suppression
+    S: Optional[int] = None  # data size in bytes; with t=s or t=f
+
+    # # Frame origin (px), with a=f; Image crop origin (px), with a=p
+    x: Optional[int] = None
+    y: Optional[int] = None
+    X: Optional[int] = None  # Frame composition mode, with a=f
+
     def __post_init__(self):
         if self.f == f.PNG:
             self.s = self.v = None
@@ -555,28 +1087,232 @@ class ControlData:
 
 class _ControlData:  # Currently Unused
 
-    i: Optional[int] = None  # image ID
     d: Optional[str] = None  # delete images
     m: Optional[int] = None  # payload chunk
     O: Optional[int] = None  # data start offset; with t=s or t=f
-    S: Optional[int] = None  # data size in bytes; with f=100,o=z or t=s or t=f
 
     # Origin offset (px) within the current cell; Must be less than the cell size
     # (0, 0) == Top-left corner of the cell; Not used with `c` and `r`.
-    X: Optional[int] = None
+    # `X` is shared with the frame composition mode
     Y: Optional[int] = None
 
     # Image crop (px)
-    # # crop origin; (0, 0) == top-left corner of the image
-    x: Optional[int] = None
-    y: Optional[int] = None
+    # # crop origin (`x` and `y`); (0, 0) == top-left corner of the image
     # # crop rectangle size
     w: Optional[int] = None
     h: Optional[int] = None
 
 
+class _StoredImages:
+    """Tracks the images held by the terminal, as a result of renders with image
+    reuse.
+
+    Transmissions of images already held by the terminal are dropped from outputs
+    and the least recently used images are deleted from the terminal, as required to
+    keep the total size of their pixel data within :py:attr:`KittyImage.REUSE_MAXSIZE`.
+    """
+
+    def __init__(self):
+        self._images = OrderedDict()  # ID -> size
+        self._size = 0
+
+    def clear(self) -> None:
+        self._images.clear()
+        self._size = 0
+
+    def filter(self, output: AnyStr) -> AnyStr:
+        """Prepares an output for writing to the terminal.
+
+        Args:
+            output: A (formatted) render or a portion of one.
+
+        Returns:
+            *output*, with transmissions of images already held by the terminal
+            dropped and with commands to delete evicted images (if any) inserted.
+        """
+        if isinstance(output, str):
+            if _TRANS_START not in output:
+                return output
+
+            def transmit(match: re.Match) -> str:
+                deletes = self._transmit(match[1], match[2])
+                return "" if deletes is None else deletes + match[0]
+
+            return _TRANSMISSION.sub(transmit, output)
+
+        if _TRANS_START_BYTES not in output:
+            return output
+
+        def transmit(match: re.Match) -> bytes:
+            deletes = self._transmit(match[1].decode(), match[2])
+            return b"" if deletes is None else deletes.encode() + match[0]
+
+        return _TRANSMISSION_BYTES.sub(transmit, output)
+
+    def _transmit(self, control_data: str, payload: AnyStr) -> Optional[str]:
+        """Records an image transmission.
+
+        Args:
+            control_data: The control data of the transmission.
+            payload: The payload of the (first chunk of the) transmission.
+
+        Returns:
+            ``None``, if the image is already held by the terminal. Otherwise, commands
+            to delete any images evicted to make room for the image.
+        """
+        control = dict(item.split("=") for item in control_data.split(","))
+        image_id = int(control["i"])
+        if image_id in self._images:
+            self._images.move_to_end(image_id)
+            return None
+
+        if int(control["f"]) == f.PNG:
+            # The dimensions are only within the PNG header (IHDR chunk) and the
+            # terminal holds the decoded pixel data
+            width, height = unpack(">II", standard_b64decode(payload[:32])[16:24])
+            size = width * height * 4
+        else:
+            size = int(control["s"]) * int(control["v"]) * (int(control["f"]) // 8)
+        self._images[image_id] = size
+        self._size += size
+
+        deletes = []
+        while self._size > KittyImage.REUSE_MAXSIZE and len(self._images) > 1:
+            image_id, size = self._images.popitem(last=False)
+            self._size -= size
+            deletes.append(f"{START}a=d,d=I,i={image_id},q=2;{ST}")
+
+        return "".join(deletes)
+
+
+def _compress(data: bytes, level: int) -> bytes:
+    """Compresses data into a ZLIB stream.
+
+    Data larger than :py:data:`_COMPRESS_BLOCK_SIZE` is compressed in blocks (in
+    parallel, if enabled; see :py:attr:`GraphicsImage.ENCODER_THREADS`), each primed
+    with the data preceding it, such that the result is nearly the same size as if
+    compressed at once.
+    """
+    if len(data) <= _COMPRESS_BLOCK_SIZE:
+        return compress(data, level)
+
+    data = memoryview(data)
+    starts = range(0, len(data), _COMPRESS_BLOCK_SIZE)
+
+    def compress_block(start: int) -> bytes:
+        compressor = compressobj(
+            level,
+            DEFLATED,
+            -MAX_WBITS,  # raw deflate, no header or trailer
+            **(
+                {"zdict": data[max(0, start - 2**MAX_WBITS) : start]} if start else {}
+            ),
+        )
+        return compressor.compress(
+            data[start : start + _COMPRESS_BLOCK_SIZE]
+        ) + compressor.flush(Z_FINISH if start == starts[-1] else Z_SYNC_FLUSH)
+
+    return b"".join(
+        (
+            compress(b"", level)[:2],  # header
+            *GraphicsImage._encode_lines(compress_block, starts),
+            adler32(data).to_bytes(4, "big"),  # trailer
+        )
+    )
+
+
+def _discard_local_objects() -> None:
+    """Removes the shared memory objects and temporary files created for the last
+    local transmission, if they still exist.
+    """
+    while _local_objects:
+        medium, name = _local_objects.pop()
+        try:
+            if medium == t.SHARED:
+                shm = shared_memory.SharedMemory(name)
+                shm.close()
+                shm.unlink()
+            else:
+                os.remove(name)
+        except OSError:  # Already removed by the terminal
+            pass
+
+
+def _write_local_object(medium: str, data: bytes) -> str:
+    """Writes image data to a shared memory object or a temporary file.
+
+    Returns:
+        The name of the shared memory object or the path of the temporary file.
+
+    Raises:
+        OSError: The object or file could not be created.
+    """
+    if medium == t.SHARED:
+        if not shared_memory:
+            raise OSError("Shared memory is unavailable")
+        shm = shared_memory.SharedMemory(create=True, size=len(data))
+        try:
+            shm.buf[: len(data)] = data
+        finally:
+            shm.close()
+        # The terminal unlinks the object after reading
+        resource_tracker.unregister(shm._name, "shared_memory")
+        _local_objects.append((medium, shm.name))
+
+        return f"/{shm.name.lstrip('/')}"
+
+    # The terminal only reads (and deletes) temporary files with this in their path
+    fd, name = tempfile.mkstemp(prefix="tty-graphics-protocol-")
+    with open(fd, "wb") as file:
+        _local_objects.append((medium, name))
+        file.write(data)
+
+    return name
+
+
+def _image_id(data: bytes, width: int, height: int, format: int) -> int:
+    """Derives a (non-zero) image ID from pixel data"""
+    return crc32(data, crc32(f"{width},{height},{format}".encode())) or 1
+
+
 START = f"{ESC}_G"
+_COMPRESS_BLOCK_SIZE = 2**18  # 256 KiB
 FMT = f"{START}%(control)s;%(payload)s{ST}"
+_CHUNK_START = f"{START}m=1;".encode()
+_LAST_CHUNK_START = f"{START}m=0;".encode()
+_ST_BYTES = ST.encode()
 DELETE_ALL_IMAGES = f"{ESC}_Ga=d;{ST}".encode()
 DELETE_CURSOR_IMAGES = f"{ESC}_Ga=d,d=C;{ST}".encode()
+_TRANS_START = f"{START}a={a.TRANS},"
+_TRANS_START_BYTES = _TRANS_START.encode()
+_TRANSMISSION_FMT = "{start}({control});([^{esc}]*){st}(?:{chunk}m=[01];[^{esc}]*{st})*"
+# Only transmissions under an ID; Not those under an image number
+_TRANSMISSION = re.compile(
+    _TRANSMISSION_FMT.format(
+        start=re.escape(_TRANS_START),
+        control="[^;]*,i=[^;]*",
+        esc=re.escape(ESC),
+        st=re.escape(ST),
+        chunk=re.escape(START),
+    )
+)
+_TRANSMISSION_BYTES = re.compile(_TRANSMISSION.pattern.encode())
+_ANY_TRANSMISSION_BYTES = re.compile(
+    _TRANSMISSION_FMT.format(
+        start=re.escape(_TRANS_START),
+        control="[^;]*",
+        esc=re.escape(ESC),
+        st=re.escape(ST),
+        chunk=re.escape(START),
+    ).encode()
+)
+native_anim = Event()
+_stored_images = _StoredImages()
+_local_objects = deque()  # (medium, name) of objects created for local transmission
 _stdout_write = sys.stdout.buffer.write
+
+_register_capability_query(
+    "kitty_graphics",
+    f"{START}a=q,t=d,i=31,f=24,s=1,v=1,C=1,c=1,r=1;AAAA{ST}".encode(),
+    re.compile(rb"\033_Gi=31;[^\033]*\033\\"),
+)
@@ -7,7 +7,16 @@ import os
 from multiprocessing import JoinableQueue, Process
 from traceback import format_exception
 
-from . import AutoCellRatio, cli, logging, notify, set_cell_ratio, tui, utils
+from . import (
+    AutoCellRatio,
+    cli,
+    logging,
+    notify,
+    render_cache,
+    set_cell_ratio,
+    tui,
+    utils,
+)
 
 
 def process_multi_logs() -> None:
@@ -61,6 +70,8 @@ class Process(Process):
             self._cell_ratio = cli.args.cell_ratio
             self._query_timeout = utils.QUERY_TIMEOUT
             self._swap_win_size = utils.SWAP_WIN_SIZE
+            self._capabilities = utils._capabilities.copy()
+            self._render_cache = (render_cache.MAX_SIZE, render_cache.DIRECTORY)
             self._style_attrs = [
                 (attr, getattr(self._ImageClass, attr))
                 for attr in exported_style_attrs.get(self._ImageClass.style, ())
@@ -81,6 +92,8 @@ class Process(Process):
 
                 utils.QUERY_TIMEOUT = self._query_timeout
                 utils.SWAP_WIN_SIZE = self._swap_win_size
+                utils._capabilities.update(self._capabilities)
+                render_cache.init(*self._render_cache)
 
                 if not self._cell_ratio:
                     # Avoid an error in case the terminal wouldn`t respond on time
@@ -56,8 +56,8 @@ FOOTNOTES:
      (i.e navigation, etc) but the larger an image is, the more the time and memory
      it'll take to render it. Thus, a large image might delay the rendering of other
      images to be rendered immediately after it.
-  5. Frames will not be cached for any animation with more frames than this value.
-     Memory usage depends on the frame count per image, not this maximum count.
+  5. When exceeded, frames are cached up to this size and the rest of the frames are
+     re-rendered on every loop. Hence, long animations are partially cached.
   6. 0 -> worst quality; smallest data size, 95 -> best quality; largest data size.
      Reduces render time & image data size and increases drawing speed on the terminal's
      end but at the cost of image quality and color reproduction. Useful for animations
@@ -77,6 +77,51 @@ FOOTNOTES:
   9. Supports all image formats supported by `PIL.Image.open()`.
      See https://pillow.readthedocs.io/en/latest/handbook/image-file-formats.html for
      details.
+  10. Renders of image files are stored (compressed) in
+     `$XDG_CACHE_HOME/term_image/renders` and reused across sessions, as long as the
+     file, image size and render parameters are unchanged. Animation frames are not
+     cached. The least recently used renders are removed when the limit is exceeded.
+  11. Visible cells are always retained. When the limit is exceeded, the cells of the
+     least recently visited grids are discarded, then the least recently viewed cells
+     of the current grid.
+  12. Applies only to the TUI image views. Animated images and images exceeding the
+     maximum amount of pixels are not rendered ahead of time.
+  13. Images are decoded once and downscaled by powers of two. Subsequent renders
+     (e.g after changing the grid cell width) use the smallest downscaled version that
+     is large enough, instead of the original file.
+  14. Applies only to graphics-based render styles with the `lines` render method.
+     Zero or one disables parallel encoding. By default, the number is determined by
+     the amount of logical processors available.
+  15. By default, the data of PNG image files is transmitted as-is when no image
+     manipulation is required. Otherwise, images that need no downscaling are
+     re-encoded in PNG format once per size and reused for subsequent draws. With this
+     option, images are always transmitted as raw pixel data. Does not apply to
+     animations.
+  16. Frames are rendered on as many threads. Useful when rendering a frame takes
+     longer than its duration, such as with large renders. 0 (zero) disables
+     rendering ahead.
+  17. Applies only to the TUI. Frames are decoded once, when an animation is first
+     displayed, and every Nth frame is stored whole while the others are stored as only
+     the regions which differ from the previous frames. Restarting an animation (e.g
+     after a resize) then decodes at most N frames, instead of all the preceding
+     frames. 0 (zero) disables indexing.
+  18. Applies when frames are rendered or written slower than the frame duration.
+     drop -> frames behind schedule are skipped, to keep in sync with the clock;
+     catch-up -> every frame is displayed; late frames are displayed immediately until
+     back in sync; stretch -> every frame is displayed for at least the frame duration,
+     i.e the animation slows down.
+  19. Applies only to graphics-based render styles. Each candidate render method and
+     compression level (and JPEG quality, for iterm2) is timed by rendering the image
+     once and weighed, along with the size of its output, against the throughput of
+     the terminal. The fastest to display (or, for animations, the one with the highest
+     frame rate) is used. Overrides the render method and `--jpeg-quality`. Selections
+     are reused for subsequent images, per terminal emulator.
+  20. Responses are stored in `$XDG_CACHE_HOME/term_image/terminals.json` per
+     terminal session, identified by the terminal device, the session ID and the
+     `TERM`, `TERM_PROGRAM` and `TERM_PROGRAM_VERSION` environment variables.
+     Subsequent invocations within the same session (e.g previewers spawned by a file
+     manager) then need not query the terminal at startup. Either way, all startup
+     queries are sent at once.
 """,
     add_help=False,  # '-h' is used for HEIGHT
 )
@@ -197,20 +242,20 @@ anim_options.add_argument(
 
 anim_cache_options = anim_options.add_mutually_exclusive_group()
 anim_cache_options.add_argument(
-    "--anim-cache",
+    "--anim-cache-size",
     type=int,
     metavar="N",
     help=(
-        "Maximum frame count for animation frames to be cached (Better performance "
-        f"at the cost of memory) (default: {config_options.anim_cache}) [5]"
+        "Maximum size (in MiB) of cached frames, per animation (Better performance "
+        f"at the cost of memory) (default: {config_options.anim_cache_size}) [5]"
     ),
 )
 anim_cache_options.add_argument(
     "--cache-all-anim",
     action="store_true",
     help=(
-        "Cache frames for all animations (Beware, uses up a lot of memory for "
-        "animated images with very high frame count)"
+        "Cache all frames of every animation, regardless of size (Beware, uses up a "
+        "lot of memory for animated images with very high frame count)"
     ),
 )
 anim_cache_options.add_argument(
@@ -218,6 +263,32 @@ anim_cache_options.add_argument(
     action="store_true",
     help="Disable frame caching (Less memory usage but reduces performance)",
 )
+anim_options.add_argument(
+    "--anim-lookahead",
+    type=int,
+    metavar="N",
+    help=(
+        "Number of frames rendered ahead of the current frame, in parallel "
+        f"(default: {config_options.anim_lookahead}) [16]"
+    ),
+)
+anim_options.add_argument(
+    "--anim-sync",
+    choices=("drop", "catch-up", "stretch"),
+    help=(
+        "Animation playback policy, when behind schedule "
+        f"(default: {config_options.anim_sync}) [18]"
+    ),
+)
+anim_options.add_argument(
+    "--anim-index",
+    type=int,
+    metavar="N",
+    help=(
+        "Keyframe interval of the frame index of animations, for fast seeking "
+        f"(default: {config_options.anim_index}) [17]"
+    ),
+)
 
 anim_options.add_argument(
     "--no-anim",
@@ -461,7 +532,23 @@ perf_options.add_argument(
         f"(default: {config_options.max_pixels}) [4]"
     ),
 )
-
+perf_options.add_argument(
+    "--auto-tune",
+    action="store_true",
+    help=(
+        "Select the render method and encoding parameters by measuring render time "
+        "and output size [CLI-only] [19]"
+    ),
+)
+perf_options.add_argument(
+    "--capability-cache",
+    type=int,
+    metavar="N",
+    help=(
+        "Time (in hours) for which terminal query responses are cached on disk, "
+        f"0 (zero) to disable (default: {config_options.capability_cache}) [20]"
+    ),
+)
 perf_options.add_argument(
     "--checkers",
     type=int,
@@ -470,6 +557,15 @@ perf_options.add_argument(
         "Maximum number of sub-processes for checking directory sources (default: auto)"
     ),
 )
+perf_options.add_argument(
+    "--encoder-threads",
+    type=int,
+    metavar="N",
+    help=(
+        "Maximum number of threads for encoding image lines in parallel "
+        "(default: auto) [14]"
+    ),
+)
 perf_options.add_argument(
     "--getters",
     type=int,
@@ -479,6 +575,15 @@ perf_options.add_argument(
         f"(default: {config_options.getters})"
     ),
 )
+perf_options.add_argument(
+    "--grid-cache",
+    type=int,
+    metavar="N",
+    help=(
+        "Maximum size (in MiB) of rendered grid cells retained for previously "
+        f"visited grids (default: {config_options.grid_cache}) [11]"
+    ),
+)
 perf_options.add_argument(
     "--grid-renderers",
     type=int,
@@ -489,6 +594,36 @@ perf_options.add_argument(
     ),
 )
 
+perf_options.add_argument(
+    "--prefetch",
+    type=int,
+    metavar="N",
+    help=(
+        "Number of images before and after the one being viewed to render ahead of "
+        f"time, 0 (zero) to disable (default: {config_options.prefetch}) [12]"
+    ),
+)
+
+perf_options.add_argument(
+    "--render-cache",
+    type=int,
+    metavar="N",
+    help=(
+        "Maximum size (in MiB) of the on-disk render cache, 0 (zero) to disable "
+        f"(default: {config_options.render_cache}) [10]"
+    ),
+)
+
+perf_options.add_argument(
+    "--thumbnail-cache",
+    type=int,
+    metavar="N",
+    help=(
+        "Maximum size (in MiB) of downscaled images retained by each TUI renderer, "
+        f"0 (zero) to disable (default: {config_options.thumbnail_cache}) [13]"
+    ),
+)
+
 multi_options = perf_options.add_mutually_exclusive_group()
 multi_options.add_argument(
     "--multi",
@@ -605,6 +740,44 @@ kitty_options.add_argument(
         "9 -> best compression (default: 4)"
     ),
 )
+kitty_options.add_argument(
+    "--kr",
+    "--kitty-reuse",
+    action="store_true",
+    dest="reuse",
+    help=(
+        "Transmit each image only once (under an ID) and subsequently only place it, "
+        "while held by the terminal"
+    ),
+)
+kitty_options.add_argument(
+    "--kl",
+    "--kitty-local",
+    action="store_true",
+    dest="local",
+    help=(
+        "Transmit animation frames via shared memory or temporary files, if "
+        "supported by the terminal (which must be on the same host); frames are not "
+        "cached [CLI-only]"
+    ),
+)
+kitty_options.add_argument(
+    "--kn",
+    "--kitty-native",
+    action="store_true",
+    dest="native",
+    help=(
+        "Transmit all frames of an animation at once and let the terminal play it "
+        "natively (not supported by Konsole) [CLI-only]"
+    ),
+)
+kitty_options.add_argument(
+    "--knrff",
+    "--kitty-no-read-from-file",
+    action="store_false",
+    dest="read_from_file",
+    help="Never use image data directly from file; always re-encode images [15]",
+)
 
 iterm2_parser = argparse.ArgumentParser(add_help=False)
 iterm2_options = iterm2_parser.add_argument_group(
@@ -0,0 +1,207 @@
+"""Persistent on-disk cache of image renders"""
+
+from __future__ import annotations
+
+import logging as _logging
+import os
+import zlib
+from hashlib import sha256
+from os import path
+from typing import Any, Dict, Optional, Union
+
+from . import logging
+from .image import BaseImage, ImageSource, TextImage
+from .utils import get_fg_bg_colors
+
+
+def cache_renders(image: BaseImage) -> None:
+    """Enables render caching for *image*, if the render cache is enabled.
+
+    Args:
+        image: The image whose renders are to be cached.
+
+    Only renders of images derived from a file path are cached. Animation frames
+    are never cached.
+    """
+    if not MAX_SIZE or image._source_type is not ImageSource.FILE_PATH:
+        return
+
+    render_image = image._render_image
+
+    def cached_render_image(
+        img, alpha: Union[None, float, str], *, frame: bool = False, **style_args: Any
+    ) -> str:
+        if frame:
+            return render_image(img, alpha, frame=frame, **style_args)
+
+        try:
+            key = get_key(image, alpha, style_args)
+        except OSError:
+            logging.log_exception(f"Unable to stat {image._source!r}", logger)
+            return render_image(img, alpha, **style_args)
+
+        render = load(key)
+        if render is None:
+            render = render_image(img, alpha, **style_args)
+            store(key, render)
+
+        return render
+
+    image._render_image = cached_render_image
+
+
+def evict() -> None:
+    """Removes the least recently used entries until the cache size is within
+    ``MAX_SIZE``.
+    """
+    global _size
+
+    try:
+        entries = [entry for entry in os.scandir(DIRECTORY) if entry.is_file()]
+    except OSError:
+        logging.log_exception("Unable to scan the render cache", logger)
+        return
+
+    stats = []
+    for entry in entries:
+        try:
+            stats.append((entry.stat(), entry.path))
+        except OSError:  # Removed by another process
+            pass
+
+    _size = sum(stat.st_size for stat, _ in stats)
+    if _size <= MAX_SIZE:
+        return
+
+    stats.sort(key=lambda item: item[0].st_mtime_ns)
+    for stat, entry_path in stats:
+        try:
+            os.remove(entry_path)
+        except OSError:  # Removed by another process
+            pass
+        _size -= stat.st_size
+        if _size <= MAX_SIZE:
+            break
+
+    logger.debug(f"Evicted entries; Current size: {_size} bytes")
+
+
+def get_key(
+    image: BaseImage, alpha: Union[None, float, str], style_args: Dict[str, Any]
+) -> str:
+    """Returns the cache key for a render of *image*.
+
+    Raises:
+        OSError: The image file could not be stat'ed.
+    """
+    stat = os.stat(image._source)
+    text_based = isinstance(image, TextImage)
+    key = (
+        path.realpath(image._source),
+        stat.st_mtime_ns,
+        stat.st_size,
+        image._is_animated and image._seek_position,
+        image.rendered_size,
+        image._get_render_size(),
+        type(image).style,
+        alpha,
+        sorted(style_args.items()),
+        # Text-based styles blend transparent pixels with the terminal's BG colour
+        # and adjust certain colours on Kitty
+        (text_based or alpha == "#") and get_fg_bg_colors()[1],
+        text_based and image._is_on_kitty(),
+        # Graphics-based styles adapt their output to the terminal
+        *(
+            getattr(image, name, None)
+            for name in _TERMINAL_ATTRS + _STYLE_ATTRS.get(type(image).style, ())
+        ),
+    )
+
+    return sha256(repr(key).encode()).hexdigest()
+
+
+def init(max_size: int, directory: Optional[str] = None) -> None:
+    """Initializes the render cache.
+
+    Args:
+        max_size: The maximum total size (in bytes) of cached entries.
+          If zero, the cache is disabled.
+        directory: The directory in which entries are stored. If ``None``,
+          ``term_image/renders`` within the user cache directory is used.
+
+    If the directory can not be created, the cache is disabled.
+    """
+    global DIRECTORY, MAX_SIZE, _size
+
+    MAX_SIZE = max_size
+    DIRECTORY = directory or path.join(
+        os.environ.get("XDG_CACHE_HOME", path.join(path.expanduser("~"), ".cache")),
+        "term_image",
+        "renders",
+    )
+    _size = None
+
+    if MAX_SIZE:
+        try:
+            os.makedirs(DIRECTORY, exist_ok=True)
+        except OSError:
+            logging.log_exception(
+                f"Unable to create the render cache directory {DIRECTORY!r}", logger
+            )
+            MAX_SIZE = 0
+
+
+def load(key: str) -> Optional[str]:
+    """Returns the cached render for *key* or ``None`` if not in the cache."""
+    entry_path = path.join(DIRECTORY, key)
+    try:
+        with open(entry_path, "rb") as entry:
+            render = zlib.decompress(entry.read()).decode()
+        os.utime(entry_path)  # Mark as recently used
+    except FileNotFoundError:
+        return None
+    except (OSError, zlib.error, UnicodeDecodeError):
+        logging.log_exception(f"Unable to load render cache entry {key!r}", logger)
+        return None
+
+    return render
+
+
+def store(key: str, render: str) -> None:
+    """Adds *render* to the cache, under *key*."""
+    global _size
+
+    data = zlib.compress(render.encode())
+    entry_path = path.join(DIRECTORY, key)
+    # Written to a temporary file first to prevent other processes from ever
+    # reading an incomplete entry
+    temp_path = f"{entry_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as entry:
+            entry.write(data)
+        os.replace(temp_path, entry_path)
+    except OSError:
+        logging.log_exception(f"Unable to store render cache entry {key!r}", logger)
+        return
+
+    if _size is None:
+        evict()  # Also computes the current size
+    else:
+        _size += len(data)
+        if _size > MAX_SIZE:
+            evict()
+
+
+logger = _logging.getLogger(__name__)
+
+# Attributes (of instances or classes) which affect renders
+_TERMINAL_ATTRS = ("_TERM", "_TERM_VERSION")
+_STYLE_ATTRS = {
+    "iterm2": ("JPEG_QUALITY", "READ_FROM_FILE"),
+    "kitty": ("READ_FROM_FILE", "_KITTY_VERSION"),
+}
+
+# Set from `init()`
+DIRECTORY: Optional[str] = None
+MAX_SIZE: int = 0
+_size: Optional[int] = None  # Total size of entries, computed on the first store
@@ -11,7 +11,8 @@ from typing import Any, Dict, Iterable, Iterator, Tuple, Union
 import urwid
 
 from .. import logging
-from ..utils import CSI, lock_tty, write_tty
+from ..image.kitty import _stored_images
+from ..utils import CSI, lock_tty, monitor_terminal_resizes, write_tty
 from . import main, render
 from .main import process_input, scan_dir_grid, scan_dir_menu, sort_key_lexi
 from .widgets import Image, ImageCanvas, info_bar, main as main_widget
@@ -42,11 +43,16 @@ def init(
     main.loop = Loop(main_widget, palette, unhandled_input=process_input)
     main.update_pipe = main.loop.watch_pipe(lambda _: None)
 
-    render.ANIM_CACHED = not args.cache_no_anim and (
-        args.cache_all_anim or args.anim_cache
+    render.ANIM_CACHED = not args.cache_no_anim
+    render.ANIM_CACHE_MAXSIZE = (
+        None if args.cache_all_anim else args.anim_cache_size * 2**20
     )
+    render.ANIM_INDEX = args.anim_index
+    render.ANIM_LOOKAHEAD = args.anim_lookahead
     render.FRAME_DURATION = args.frame_duration
+    render.PREFETCH = args.prefetch
     render.REPEAT = args.repeat
+    render.THUMBNAIL_CACHE = args.thumbnail_cache * 2**20
 
     images.sort(
         key=lambda x: sort_key_lexi(
@@ -67,6 +73,8 @@ def init(
             # Would've been removed if it had the default value
             if "compress" in style_args:
                 specs["kitty"] += f"c{style_args['compress']}"
+            if "reuse" in style_args:
+                specs["kitty"] += "i1"
         elif ImageClass.style == "iterm2" and "compress" in style_args:
             specs["iterm2"] += f"c{style_args['compress']}"
 
@@ -80,6 +88,9 @@ def init(
         )
     )
     Image._ti_grid_style_spec = render.grid_style_specs.get(ImageClass.style, "")
+    Image._ti_grid_cache.max_size = args.grid_cache * 2**20
+    if style_args.get("reuse"):
+        ImageCanvas._ti_stored_images = _stored_images
 
     # daemon, to avoid having to check if the main process has been interrupted
     menu_scanner = logging.Thread(target=scan_dir_menu, name="MenuScanner", daemon=True)
@@ -146,7 +157,10 @@ class Loop(urwid.MainLoop):
     def start(self):
         # Properly set expand key visbility at initialization
         self.unhandled_input("resized")
-        return super().start()
+        stopping_context = super().start()
+        # The screen replaces the SIGWINCH handler
+        monitor_terminal_resizes()
+        return stopping_context
 
     def process_input(self, keys):
         if "window resize" in keys:
@@ -444,7 +444,7 @@ def cell_width_dec():
         image_grid.cell_width -= 2
         main.grid_render_queue.put(None)  # Mark the start of a new grid
         main.grid_change.set()
-        # Wait till GridRenderManager clears the cache
+        # Wait till GridRenderManager switches the cache
         while main.grid_change.is_set():
             pass
         getattr(main.ImageClass, "clear", lambda: True)()
@@ -456,7 +456,7 @@ def cell_width_inc():
         image_grid.cell_width += 2
         main.grid_render_queue.put(None)  # Mark the start of a new grid
         main.grid_change.set()
-        # Wait till GridRenderManager clears the cache
+        # Wait till GridRenderManager switches the cache
         while main.grid_change.is_set():
             pass
         getattr(main.ImageClass, "clear", lambda: True)()
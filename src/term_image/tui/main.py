@@ -261,7 +261,7 @@ def display_images(
                 if contents[entry].get("/") and grid_path != last_non_empty_grid_path:
                     grid_render_queue.put(None)  # Mark the start of a new grid
                     grid_change.set()
-                    # Wait till GridRenderManager clears the cache
+                    # Wait till GridRenderManager switches the cache
                     while grid_change.is_set():
                         pass
                     last_non_empty_grid_path = grid_path
@@ -3,27 +3,69 @@
 from __future__ import annotations
 
 import logging as _logging
-from multiprocessing import Event as mp_Event, Queue as mp_Queue
+import os
+from collections import OrderedDict
+from contextlib import suppress
+from functools import partial
+from math import ceil, floor, log2
+from multiprocessing import (
+    Array as mp_Array,
+    Condition as mp_Condition,
+    Event as mp_Event,
+    Queue as mp_Queue,
+    Value as mp_Value,
+)
+from operator import mul
 from os.path import split
 from queue import Empty, Queue
 from threading import Event
 from typing import Optional, Union
 
-from .. import logging, notify
-from ..image import Size
+import PIL.Image
+
+from .. import logging, notify, render_cache
+from ..image import BaseImage, Size
+from ..image.common import _FrameScheduler
 from ..logging_multi import Process
 from ..utils import clear_queue
 
+try:
+    from multiprocessing.shared_memory import SharedMemory
+except ImportError:  # Python < 3.8
+    SharedMemory = None
+
 
 def manage_anim_renders() -> None:
     from .main import ImageClass, update_screen
     from .widgets import ImageCanvas, image_box
 
-    def next_frame() -> bool:
-        frame, repeat, frame_no, size, rendered_size = frame_render_out.get()
+    def end_animation() -> None:
+        nonlocal frame_duration, scheduler
+
+        if scheduler:
+            logging.log(
+                f"Playback stats of {image_w._ti_image._source!r}: {scheduler.stats}",
+                logger,
+                _logging.DEBUG,
+                direct=False,
+            )
+        frame_duration = scheduler = None
+
+    def next_frame(dropped: int = 0) -> bool:
+        output = frame_render_out.get()
+        # Frames behind schedule are discarded, as long as the next is ready
+        while dropped and output[0]:
+            try:
+                output = frame_render_out.get(block=False)
+            except Empty:
+                scheduler.undrop(dropped)
+                break
+            dropped -= 1
+
+        frame, repeat, frame_no, size, rendered_size = output
         if not_skip() and (not forced or image_w._ti_force_render):
             if frame:
-                canv = ImageCanvas(frame.encode().split(b"\n"), size, rendered_size)
+                canv = ImageCanvas(frame.split(b"\n"), size, rendered_size)
                 image_w._ti_image._seek_position = frame_no
                 image_w._ti_frame = (canv, repeat, frame_no)
             else:
@@ -51,14 +93,27 @@ def manage_anim_renders() -> None:
             except AttributeError:
                 pass
 
-        update_screen()
+        if scheduler:
+            with scheduler.write():
+                update_screen()
+        else:
+            update_screen()
         return bool(frame)
 
+    def start_animation() -> None:
+        nonlocal dropped, scheduler
+
+        if not scheduler:
+            scheduler = _FrameScheduler(ImageClass.SYNC_POLICY)
+            scheduler.rendered += 1  # The first frame
+        scheduler.start()
+        dropped = scheduler.next(frame_duration)
+
     def not_skip():
         return image_w is image_box.original_widget and anim_render_queue.empty()
 
     frame_render_in = (mp_Queue if logging.MULTI else Queue)()
-    frame_render_out = (mp_Queue if logging.MULTI else Queue)(20)
+    frame_render_out = RenderQueue(0, maxsize=20) if logging.MULTI else Queue(20)
     ready = (mp_Event if logging.MULTI else Event)()
     renderer = (Process if logging.MULTI else logging.Thread)(
         target=render_frames,
@@ -70,22 +125,30 @@ def manage_anim_renders() -> None:
             anim_style_specs.get(ImageClass.style, ""),
             REPEAT,
             ANIM_CACHED,
+            ANIM_CACHE_MAXSIZE,
+            ANIM_LOOKAHEAD,
+            ANIM_INDEX,
         ),
         name="FrameRenderer",
         redirect_notifs=True,
     )
     renderer.start()
 
-    frame_duration = None
+    frame_duration = scheduler = None
+    dropped = 0
     image_w = None  # Silence flake8's F821
 
     try:
         while True:
             try:
-                data, size, forced = anim_render_queue.get(timeout=frame_duration)
+                data, size, forced = anim_render_queue.get(
+                    timeout=scheduler and scheduler.remaining()
+                )
             except Empty:
-                if not next_frame():
-                    frame_duration = None
+                if next_frame(dropped):
+                    dropped = scheduler.next(frame_duration)
+                else:
+                    end_animation()
             else:
                 if not data:
                     break
@@ -104,14 +167,17 @@ def manage_anim_renders() -> None:
                     if not_skip():
                         frame_render_in.put((data, size, image_w._ti_alpha))
                         if not next_frame():
-                            frame_duration = None
+                            end_animation()
+                        elif frame_duration:
+                            # The animation is resumed at the new size
+                            start_animation()
                     elif image_w is not image_box.original_widget:
                         # The next item in the queue is NOT a size change
-                        frame_duration = None
+                        end_animation()
                 else:
                     # Safe, since the next item in the queue cannot be a size change
                     # cos no animation is ongoing
-                    frame_duration = None
+                    end_animation()
 
                     image_w = data
                     if not_skip():
@@ -126,6 +192,7 @@ def manage_anim_renders() -> None:
                             frame_duration = (
                                 FRAME_DURATION or image_w._ti_image._frame_duration
                             )
+                            start_animation()
 
                 notify.stop_loading()
     finally:
@@ -133,12 +200,15 @@ def manage_anim_renders() -> None:
         frame_render_in.put((None,) * 3)
         clear_queue(frame_render_out)  # In case the renderer is blocking on `put()`
         renderer.join()
+        if logging.MULTI:
+            frame_render_out.close()
         clear_queue(anim_render_queue)
 
 
 def manage_image_renders():
+    from . import main
     from .main import ImageClass, update_screen
-    from .widgets import Image, ImageCanvas, image_box
+    from .widgets import Image, ImageCanvas, image_box, menu
 
     def not_skip():
         # If this image is the one currently displayed but the queue is non empty,
@@ -147,9 +217,59 @@ def manage_image_renders():
         # in the case where the image size has changed.
         return image_w is image_box.original_widget and image_render_queue.empty()
 
+    def prefetch(block: bool = False) -> None:
+        nonlocal prefetching
+
+        if prefetching:
+            try:
+                render, rendered_size = prefetch_render_out.get(block)
+            except Empty:
+                return
+            if render:
+                prefetched[prefetching] = (render, rendered_size)
+                if len(prefetched) > 2 * PREFETCH + 1:
+                    prefetched.popitem(last=False)
+            prefetching = None
+
+        # The view has changed since the neighbours were queued
+        if last_image_w is not image_box.original_widget:
+            prefetch_queue.clear()
+
+        while prefetch_queue:
+            image_w, size, alpha = prefetch_queue.pop(0)
+            key = (image_w._ti_image._source, size, alpha)
+            if key not in prefetched:
+                prefetch_render_in.put((*key, None))
+                prefetching = key
+                break
+
+    def queue_prefetch() -> None:
+        # Neighbours of the displayed image are queued, nearest first
+        prefetch_queue.clear()
+        menu_list = main.menu_list
+        index = menu.focus_position - 1
+        if not (0 <= index < len(menu_list) and menu_list[index][1] is image_w):
+            return
+
+        for offset in range(1, PREFETCH + 1):
+            for neighbour_index in (index + offset, index - offset):
+                if not 0 <= neighbour_index < len(menu_list):
+                    continue
+                neighbour_w = menu_list[neighbour_index][1]
+                if neighbour_w is ... or neighbour_w._ti_faulty:  # Directory or faulty
+                    continue
+                image = neighbour_w._ti_image
+                # Animated and large images are not rendered by ImageRenderer
+                # upon display
+                if (
+                    not (image._is_animated and not main.NO_ANIMATION)
+                    and mul(*image._original_size) <= main.MAX_PIXELS
+                ):
+                    prefetch_queue.append((neighbour_w, size, alpha))
+
     multi = logging.MULTI
     image_render_in = (mp_Queue if multi else Queue)()
-    image_render_out = (mp_Queue if multi else Queue)()
+    image_render_out = RenderQueue(0) if multi else Queue()
     renderer = (Process if multi else logging.Thread)(
         target=render_images,
         args=(
@@ -158,16 +278,44 @@ def manage_image_renders():
             ImageClass,
             image_style_specs.get(ImageClass.style, ""),
         ),
-        kwargs=dict(out_extras=False, log_faults=True),
+        kwargs=dict(out_extras=False, log_faults=True, thumbnail_cache=THUMBNAIL_CACHE),
         name="ImageRenderer",
         redirect_notifs=True,
     )
     renderer.start()
 
+    # Neighbouring images are rendered by a separate renderer (at a lower priority,
+    # in a subprocess), such that requests for displayed images never wait behind
+    # them
+    prefetch_render_in = (mp_Queue if multi else Queue)()
+    prefetch_render_out = RenderQueue(0) if multi else Queue()
+    prefetcher = (Process if multi else logging.Thread)(
+        target=render_images,
+        args=(
+            prefetch_render_in,
+            prefetch_render_out,
+            ImageClass,
+            image_style_specs.get(ImageClass.style, ""),
+        ),
+        kwargs=dict(
+            out_extras=False,
+            log_faults=True,
+            thumbnail_cache=THUMBNAIL_CACHE,
+            niceness=PREFETCH_NICENESS if multi else 0,
+        ),
+        name="ImagePrefetcher",
+        redirect_notifs=True,
+    )
+    if PREFETCH:
+        prefetcher.start()
+
     faulty_image = Image._ti_faulty_image
     last_image_w = image_box.original_widget
     # To prevent an `AttributeError` with the first deletion, while avoiding `hasattr()`
     last_image_w._ti_canv = None
+    prefetch_queue = []
+    prefetching = None  # Key of the ongoing prefetch render
+    prefetched = OrderedDict()
 
     try:
         while True:
@@ -177,7 +325,16 @@ def manage_image_renders():
             # Otherwise, the image will remain unrendered until a redraw.
             update_screen()
 
-            image_w, size, alpha = image_render_queue.get()
+            while True:
+                try:
+                    # Polled while a prefetch render is ongoing, to collect its output
+                    image_w, size, alpha = image_render_queue.get(
+                        timeout=prefetching and PREFETCH_POLL_INTERVAL
+                    )
+                except Empty:
+                    prefetch()
+                else:
+                    break
             if not image_w:
                 break
 
@@ -185,22 +342,25 @@ def manage_image_renders():
                 del image_w._ti_rendering
                 continue
 
-            image_render_in.put(
-                (
-                    image_w._ti_image._source,
-                    size,
-                    alpha,
-                    image_w._ti_faulty,
-                )
-            )
-            notify.start_loading()
-            render, rendered_size = image_render_out.get()
+            key = (image_w._ti_image._source, size, alpha)
+            if key == prefetching:  # Awaited, rather than started all over
+                notify.start_loading()
+                prefetch(block=True)
+                notify.stop_loading()
+            if key in prefetched:
+                prefetched.move_to_end(key)  # Mark as most recently used
+                render, rendered_size = prefetched[key]
+            else:
+                image_render_in.put((*key, image_w._ti_faulty))
+                notify.start_loading()
+                render, rendered_size = image_render_out.get()
+                notify.stop_loading()
 
             if not_skip():
                 del last_image_w._ti_canv
                 if render:
                     image_w._ti_canv = ImageCanvas(
-                        render.encode().split(b"\n"), size, rendered_size
+                        render.split(b"\n"), size, rendered_size
                     )
                 else:
                     image_w._ti_canv = faulty_image.render(size)
@@ -208,13 +368,23 @@ def manage_image_renders():
                     if not image_w._ti_faulty:
                         image_w._ti_faulty = True
                 last_image_w = image_w
+                if PREFETCH:
+                    queue_prefetch()
+                    prefetch()
 
             del image_w._ti_rendering
-            notify.stop_loading()
     finally:
-        clear_queue(image_render_in)
-        image_render_in.put((None,) * 4)
-        renderer.join()
+        for render_in, render_out, process in (
+            (image_render_in, image_render_out, renderer),
+            (prefetch_render_in, prefetch_render_out, prefetcher),
+        ):
+            if process.is_alive():
+                clear_queue(render_in)
+                render_in.put((None,) * 4)
+                clear_queue(render_out)  # In case the renderer is blocking on `put()`
+                process.join()
+            if multi:
+                render_out.close()
         clear_queue(image_render_queue)
 
 
@@ -226,14 +396,18 @@ def manage_grid_renders(n_renderers: int):
     If multiprocessing is enabled and *n_renderers* > 0, it spwans *n_renderers*
     subprocesses to render the cells and handles their proper termination.
     Otherwise, it starts a single new thread to render the cells.
+
+    Each file is always rendered by the same renderer, such that its thumbnail store
+    (which is specific to the renderer) is reused e.g after the cell width changes.
     """
     from . import main
     from .main import ImageClass, grid_active, grid_change, quitting, update_screen
     from .widgets import Image, ImageCanvas, image_grid
 
     multi = logging.MULTI and n_renderers > 0
-    grid_render_in = (mp_Queue if multi else Queue)()
-    grid_render_out = (mp_Queue if multi else Queue)()
+    n_renderers = n_renderers if multi else 1
+    grid_render_ins = [(mp_Queue if multi else Queue)() for _ in range(n_renderers)]
+    grid_render_out = RenderQueue(1, n_renderers) if multi else Queue()
     renderers = [
         (Process if multi else logging.Thread)(
             target=render_images,
@@ -243,11 +417,13 @@ def manage_grid_renders(n_renderers: int):
                 ImageClass,
                 grid_style_specs.get(ImageClass.style, ""),
             ),
-            kwargs=dict(out_extras=True, log_faults=False),
+            kwargs=dict(
+                out_extras=True, log_faults=False, thumbnail_cache=THUMBNAIL_CACHE
+            ),
             name="GridRenderer" + f"-{n}" * multi,
             redirect_notifs=True,
         )
-        for n in range(n_renderers if multi else 1)
+        for n, grid_render_in in enumerate(grid_render_ins)
     ]
     for renderer in renderers:
         renderer.start()
@@ -269,12 +445,14 @@ def manage_grid_renders(n_renderers: int):
                 break
 
             if new_grid or grid_change.is_set():  # New grid
-                grid_cache.clear()
-                grid_change.clear()  # Signal "cache cleared"
+                # Canvases of previously visited grids are retained (within the
+                # cache's budget) for when they're revisited
+                grid_cache.set_grid((main.grid_path, image_grid.cell_width))
+                grid_change.clear()  # Signal "cache switched"
                 if not new_grid:  # The starting `None` hasn't been gotten
                     while grid_render_queue.get():
                         pass
-                for q in (grid_render_in, grid_render_out):
+                for q in (*grid_render_ins, grid_render_out):
                     while True:
                         try:
                             q.get(timeout=0.005)
@@ -297,7 +475,7 @@ def manage_grid_renders(n_renderers: int):
                     if not image_info:  # Start of a new grid
                         new_grid = True
                         continue
-                    grid_render_in.put(image_info)
+                    grid_render_ins[hash(image_info[0]) % n_renderers].put(image_info)
                     notify.start_loading()
 
             if grid_change.is_set():
@@ -319,7 +497,7 @@ def manage_grid_renders(n_renderers: int):
                     and size[0] + 2 == cell_width
                 ):
                     grid_cache[entry] = (
-                        ImageCanvas(image.encode().split(b"\n"), size, rendered_size)
+                        ImageCanvas(image.split(b"\n"), size, rendered_size)
                         if image
                         else faulty_image.render(size)
                     )
@@ -327,29 +505,47 @@ def manage_grid_renders(n_renderers: int):
                         update_screen()
                 notify.stop_loading()
     finally:
-        clear_queue(grid_render_in)
-        for renderer in renderers:
+        for grid_render_in in grid_render_ins:
+            clear_queue(grid_render_in)
             grid_render_in.put((None,) * 3)
+        clear_queue(grid_render_out)  # In case a renderer is blocking on `put()`
         for renderer in renderers:
             renderer.join()
+        if multi:
+            grid_render_out.close()
         clear_queue(grid_render_queue)
 
 
 def render_frames(
     input: Union[Queue, mp_Queue],
-    output: Union[Queue, mp_Queue],
+    output: Union[Queue, RenderQueue],
     ready: Union[Event, mp_Event],
     ImageClass: type,
     style_spec: str,
     repeat: int,
-    cached: Union[bool, int],
+    cached: bool,
+    cache_maxsize: Optional[int],
+    lookahead: int,
+    index_interval: int,
 ):
     """Renders animation frames.
 
+    Args:
+        cache_maxsize: The maximum size (in bytes) of cached frames, per animation.
+          If ``None``, all frames are cached.
+        lookahead: The number of frames rendered ahead, in parallel.
+        index_interval: The keyframe interval of the frame index of each animation.
+          If zero, frames are not indexed.
+
+    Frames are passed out encoded (as ``bytes``).
+
     Intended to be executed in a subprocess or thread.
     """
     from ..image import ImageIterator
 
+    ImageIterator.CACHE_MAXSIZE = cache_maxsize
+    ImageIterator.LOOKAHEAD = lookahead
+
     image = animator = None  # Silence flake8's F821
     block = True
     while True:
@@ -359,7 +555,7 @@ def render_frames(
             try:
                 output.put(
                     (
-                        next(animator),
+                        next(animator).encode(),
                         animator._loop_no,
                         image.tell(),
                         size,
@@ -411,6 +607,9 @@ def render_frames(
                 #    grid wherein its cell is yet to be rendered, since GridRenderer
                 #    will continue rendering cells alongside the animation).
                 image = ImageClass.from_file(data)
+                if index_interval:
+                    # Makes restarting the animation (e.g after a resize) cheap
+                    image.index_frames(index_interval)
                 animator = ImageIterator(
                     image, repeat, f"1.1{alpha}{style_spec}", cached
                 )
@@ -422,20 +621,34 @@ def render_frames(
 
 def render_images(
     input: Union[Queue, mp_Queue],
-    output: Union[Queue, mp_Queue],
+    output: Union[Queue, RenderQueue],
     ImageClass: type,
     style_spec: str,
     *,
     out_extras: bool,
     log_faults: bool,
+    thumbnail_cache: int,
+    niceness: int = 0,
 ):
     """Renders images.
 
     Args:
         out_extras: If True, details other than the render output and it's size are
           also passed out.
+        thumbnail_cache: The maximum size (in bytes) of the thumbnail store.
+          If zero, images are always rendered from the original files.
+        niceness: The increment to the scheduling niceness of the renderer, which
+          should only be non-zero in a subprocess.
+
+    Render outputs are passed out encoded (as ``bytes``).
+
     Intended to be executed in a subprocess or thread.
     """
+    if niceness:
+        with suppress(AttributeError, OSError):  # Not supported on Windows
+            os.nice(niceness)
+    thumbnails = ThumbnailStore(thumbnail_cache)
+
     while True:
         if log_faults:
             image, size, alpha, faulty = input.get()
@@ -447,6 +660,10 @@ def render_images(
 
         image = ImageClass.from_file(image)
         image.set_size(Size.AUTO, maxsize=size)
+        render_cache.cache_renders(image)
+        if thumbnail_cache:
+            # Deferred, so that the file isn't decoded in case of a render cache hit
+            image._get_image = partial(thumbnails.open_image, image)
 
         # Using `BaseImage` for padding will use more memory since all the
         # spaces will be in the render output string, and theoretically more time
@@ -458,12 +675,12 @@ def render_images(
             output.put(
                 (
                     image._source,
-                    f"{image:1.1{alpha}{style_spec}}",
+                    f"{image:1.1{alpha}{style_spec}}".encode(),
                     size,
                     image.rendered_size,
                 )
                 if out_extras
-                else (f"{image:1.1{alpha}{style_spec}}", image.rendered_size)
+                else (f"{image:1.1{alpha}{style_spec}}".encode(), image.rendered_size)
             )
         except Exception as e:
             output.put(
@@ -471,8 +688,10 @@ def render_images(
                 if out_extras
                 else (None, image.rendered_size)
             )
-            # *faulty* ensures a fault is logged only once per `Image` instance
-            if log_faults:
+            # *faulty* ensures a fault is logged only once per `Image` instance.
+            # It's `None` for prefetch renders, whose faults are reported only
+            # if the image is displayed.
+            if log_faults and faulty is not None:
                 if not faulty:
                     logging.log_exception(
                         f"Failed to load or render {image._source!r}",
@@ -483,11 +702,186 @@ def render_images(
     clear_queue(output)
 
 
+class RenderQueue:
+    """A multiprocessing queue for passing render outputs from renderer subprocesses
+    to the main process.
+
+    Args:
+        field: The index of the render output (``bytes`` or ``None``) within each
+          queue item.
+        n_producers: The number of subprocesses putting items into the queue.
+        maxsize: Same as for :py:class:`multiprocessing.Queue`.
+
+    Each producer writes render outputs into its own shared memory ring buffer and
+    only their locations are passed through the underlying queue, avoiding the
+    pickling and piping of large outputs. Outputs larger than a ring buffer (or all,
+    if shared memory is unsupported) are passed through the queue directly.
+
+    NOTE:
+        - Items must be gotten in the order in which they were put, which holds as
+          long as each producer is a single thread.
+        - ``close()`` should be called by the creating process after all producers
+          have exited.
+    """
+
+    def __init__(self, field: int, n_producers: int = 1, maxsize: int = 0):
+        self._field = field
+        self._queue = mp_Queue(maxsize)
+        self._size = SHM_RING_SIZE
+        self._rings = []
+        if SharedMemory:
+            try:
+                for _ in range(n_producers):
+                    self._rings.append(SharedMemory(create=True, size=self._size))
+            except OSError:
+                logging.log_exception(
+                    "Unable to create shared memory for render outputs", logger
+                )
+                self.close()
+                self._rings = []
+        # Total number of bytes released by consumers, per ring
+        self._freed = mp_Array("Q", len(self._rings), lock=False)
+        self._space = mp_Condition()
+        self._n_claimed = mp_Value("i", 0)
+        # Specific to each producer
+        self._ring = None
+        self._written = 0  # Total number of bytes written (including skipped)
+
+    def close(self) -> None:
+        for ring in self._rings:
+            ring.close()
+            ring.unlink()
+
+    def empty(self) -> bool:
+        return self._queue.empty()
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> tuple:
+        item = self._queue.get(block, timeout)
+        location = item[self._field]
+        if isinstance(location, tuple):
+            ring, offset, length, end = location
+            output = bytes(self._rings[ring].buf[offset : offset + length])
+            with self._space:
+                self._freed[ring] = max(self._freed[ring], end)
+                self._space.notify_all()
+            item = (*item[: self._field], output, *item[self._field + 1 :])
+
+        return item
+
+    def put(self, item: tuple) -> None:
+        output = item[self._field]
+        if output and len(output) <= self._size and self._rings:
+            if self._ring is None:
+                with self._n_claimed.get_lock():
+                    self._ring = self._n_claimed.value
+                    self._n_claimed.value += 1
+
+            length = len(output)
+            offset = self._written % self._size
+            written = self._written
+            # Outputs are stored contiguously; skip the end of the buffer if required.
+            # The skipped bytes hold no output, so they needn't be freed by consumers
+            if offset + length > self._size:
+                self._written += self._size - offset
+                offset = 0
+            end = self._written + length
+            # Bytes up to `end - self._size` are reused, of which only those before
+            # the skip (if any) hold outputs
+            reused = min(end - self._size, written)
+
+            with self._space:
+                self._space.wait_for(lambda: self._freed[self._ring] >= reused)
+            self._rings[self._ring].buf[offset : offset + length] = output
+            self._written = end
+            item = (
+                *item[: self._field],
+                (self._ring, offset, length, end),
+                *item[self._field + 1 :],
+            )
+
+        self._queue.put(item)
+
+
+class ThumbnailStore:
+    """In-memory store of downscaled versions of image files.
+
+    Args:
+        max_size: The maximum total size (in bytes) of stored thumbnails.
+
+    Thumbnails are reduced by powers of two (levels) from the original size. An image
+    is rendered from the smallest stored level that is at least twice its render
+    size, such that each file is decoded only when no stored level is large enough.
+    The least recently used thumbnails are discarded when *max_size* is exceeded.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size = 0
+        self._thumbnails = OrderedDict()
+
+    def open_image(self, image: BaseImage) -> PIL.Image.Image:
+        """Returns a PIL image from which *image* (sourced from a file) can be
+        rendered at its current size.
+
+        The returned image is owned by the caller.
+        """
+        width, height = image._original_size
+        render_width, render_height = image._get_render_size()
+        # The largest reduction that leaves at least twice the render size, to limit
+        # the loss of downscaling in two steps
+        level = (
+            render_width
+            and render_height
+            and max(
+                0,
+                floor(log2(min(width / render_width, height / render_height))) - 1,
+            )
+        )
+        if not level:  # Also, if the render size is too small (handled elsewhere)
+            return PIL.Image.open(image._source)
+
+        stat = os.stat(image._source)
+        source = (image._source, stat.st_mtime_ns, stat.st_size)
+        for stored_level in range(level, 0, -1):
+            thumbnail = self._thumbnails.get((source, stored_level))
+            if thumbnail:
+                self._thumbnails.move_to_end((source, stored_level))
+                return thumbnail.copy()
+
+        img = PIL.Image.open(image._source)
+        try:
+            if image._is_animated:
+                img.seek(0)
+            # Reduced-size decoding for JPEG images
+            img.draft(None, (ceil(width / 2**level), ceil(height / 2**level)))
+            scale = 2**level // round(width / img.width)
+            thumbnail = img.convert(
+                "RGBA"
+                if img.mode in {"LA", "PA", "RGBA"} or "transparency" in img.info
+                else "RGB"
+            )
+        finally:
+            img.close()
+        if scale > 1:
+            thumbnail = thumbnail.reduce(scale)
+
+        self._thumbnails[(source, level)] = thumbnail
+        self.size += len(thumbnail.getbands()) * mul(*thumbnail.size)
+        while self.size > self.max_size:
+            _, evicted = self._thumbnails.popitem(last=False)
+            self.size -= len(evicted.getbands()) * mul(*evicted.size)
+
+        return thumbnail.copy()
+
+
 logger = _logging.getLogger(__name__)
 anim_render_queue = Queue()
 grid_render_queue = Queue()
 image_render_queue = Queue()
 
+# Size (in bytes) of each `RenderQueue` ring buffer
+SHM_RING_SIZE = 2**24
+
 # Updated from `.tui.init()`
 anim_style_specs = {"kitty": "+W", "iterm2": "+Wm1"}
 grid_style_specs = {"kitty": "+L", "iterm2": "+L"}
@@ -495,6 +889,14 @@ image_style_specs = {"kitty": "+W", "iterm2": "+W"}
 
 # Set from `.tui.init()`
 # # Corresponsing to command-line args
-ANIM_CACHED: Union[None, bool, int] = None
+ANIM_CACHED: Optional[bool] = None
+ANIM_CACHE_MAXSIZE: Optional[int] = None
+ANIM_INDEX: Optional[int] = None
+ANIM_LOOKAHEAD: Optional[int] = None
 FRAME_DURATION: Optional[float] = None
+PREFETCH: Optional[int] = None
 REPEAT: Optional[int] = None
+THUMBNAIL_CACHE: Optional[int] = None
+
+PREFETCH_NICENESS = 10
+PREFETCH_POLL_INTERVAL = 0.02  # seconds
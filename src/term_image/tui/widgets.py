@@ -3,10 +3,12 @@
 from __future__ import annotations
 
 import logging as _logging
+from collections import OrderedDict
 from math import ceil
 from operator import floordiv, mul, sub
 from os.path import basename
-from typing import List, Optional, Tuple
+from threading import Lock
+from typing import List, Optional, Tuple, Union
 
 import urwid
 
@@ -14,6 +16,7 @@ from .. import logging
 from ..config import config_options, expand_key, navi
 from ..image import BaseImage, Size
 from ..image.common import _ALPHA_THRESHOLD
+from ..image.kitty import _ANY_TRANSMISSION_BYTES, _TRANS_START_BYTES
 from ..utils import get_terminal_size
 from . import keys, main as tui_main
 from .render import anim_render_queue, grid_render_queue, image_render_queue
@@ -145,6 +148,7 @@ class GridListBox(urwid.ListBox):
             self._ti_ncell = ncell
             self._ti_cell_width = self._ti_grid.cell_width
 
+        Image._ti_grid_cache.new_frame()
         canv = super().render(size, focus)
 
         # For some reason, `GridListBox.render()` resets the focused column's
@@ -213,6 +217,92 @@ class GridListBox(urwid.ListBox):
         self._ti_next_index = next_index
 
 
+class GridCache:
+    """Cache of grid cell canvases, with a memory budget.
+
+    Cells are grouped per grid (i.e per directory and cell width). All item
+    operations act on the cells of the current grid. Whenever the total size (in
+    bytes) of rendered output exceeds *max_size*, the least recently visited grids
+    are discarded, followed by the least recently used cells of the current grid
+    that are not visible.
+
+    Cells retrieved since the last call to :py:meth:`new_frame` are considered
+    visible.
+    """
+
+    def __init__(self, max_size: int = 0):
+        self.max_size = max_size
+        self.size = 0
+        self._grids = OrderedDict()
+        self._sizes = {}
+        self._key = None
+        self._cells = self._grids[None] = OrderedDict()
+        self._sizes[None] = 0
+        self._visible = set()
+        # Items are set from the grid render manager thread
+        self._lock = Lock()
+
+    def __setitem__(self, entry: str, canv: Union[urwid.Canvas, type(...)]) -> None:
+        with self._lock:
+            old = self._cells.pop(entry, None)
+            self._cells[entry] = canv
+            size = self._canv_size(canv) - self._canv_size(old)
+            self._sizes[self._key] += size
+            self.size += size
+            if size > 0 and self.size > self.max_size:
+                self._evict()
+
+    def get(self, entry: str) -> Union[None, urwid.Canvas, type(...)]:
+        with self._lock:
+            self._visible.add(entry)
+            if entry in self._cells:
+                self._cells.move_to_end(entry)  # Mark as most recently used
+            return self._cells.get(entry)
+
+    def new_frame(self) -> None:
+        """Marks the start of a new render of the grid."""
+        self._visible = set()
+
+    def set_grid(self, key: Optional[Tuple[str, int]]) -> None:
+        """Switches to the grid identified by *key*.
+
+        Cells of the previous grid that were pending a render (i.e placeholders)
+        are removed, since their renders will be dropped.
+        """
+        with self._lock:
+            for entry, canv in tuple(self._cells.items()):
+                if canv is ...:
+                    del self._cells[entry]
+
+            self._key = key
+            self._cells = self._grids.setdefault(key, OrderedDict())
+            self._sizes.setdefault(key, 0)
+            self._grids.move_to_end(key)  # Mark as most recently used
+            self._visible = set()
+            self._evict()
+
+    @staticmethod
+    def _canv_size(canv: Union[None, urwid.Canvas, type(...)]) -> int:
+        # Placeholders and faulty-image canvases hold no rendered output
+        return sum(map(len, canv.lines)) if isinstance(canv, ImageCanvas) else 0
+
+    def _evict(self) -> None:
+        for key in tuple(self._grids):
+            if self.size <= self.max_size or key == self._key:
+                break
+            del self._grids[key]
+            self.size -= self._sizes.pop(key)
+
+        for entry, canv in tuple(self._cells.items()):
+            if self.size <= self.max_size:
+                break
+            size = self._canv_size(canv)
+            if size and entry not in self._visible:
+                del self._cells[entry]
+                self._sizes[self._key] -= size
+                self.size -= size
+
+
 class Image(urwid.Widget):
     _sizing = frozenset(["box"])
     _selectable = True
@@ -233,7 +323,7 @@ class Image(urwid.Widget):
     _ti_canv = None
     _ti_rendering = False
 
-    _ti_grid_cache = {}
+    _ti_grid_cache = GridCache()  # Budget updated from `.tui.init()`
 
     # Updated from `.tui.init()`
     _ti_alpha = f"{_ALPHA_THRESHOLD}"[1:]
@@ -381,6 +471,7 @@ class Image(urwid.Widget):
 class ImageCanvas(urwid.Canvas):
     cacheable = False
     _ti_change_state = 0
+    _ti_stored_images = None  # Set from `.tui.init()`, with kitty image reuse
 
     def __init__(
         self, lines: List[bytes], size: Tuple[int, int], image_size: Tuple[int, int]
@@ -409,6 +500,7 @@ class ImageCanvas(urwid.Canvas):
         fill = b" " * cols
         pad_left = b" " * pad_left
         pad_right = b" " * pad_right + b"\b " * self._ti_change_state
+        stored_images = self._ti_stored_images
 
         # Upper padding reduces when the top is trimmed
         for _ in range(pad_up - trim_top):
@@ -418,9 +510,21 @@ class ImageCanvas(urwid.Canvas):
         # If top is trimmed (_trim_top_ > 0),
         # - and _rows_ > _pad_down_, render the last (_rows_ - _pad_down_) lines
         # - and _rows_ <= _pad_down_, do not render any line (i.e lines[len:])
-        for line in self.lines[
-            trim_top and (-max(0, rows - pad_down) or len(self.lines)) :
-        ]:
+        start = trim_top and (-max(0, rows - pad_down) or len(self.lines))
+        # Kitty images may be transmitted on the first line and only placed on the
+        # others, so transmissions on trimmed lines are moved to the first line shown
+        transmissions = start and b"".join(
+            match[0]
+            for line in self.lines[:start]
+            if _TRANS_START_BYTES in line
+            for match in _ANY_TRANSMISSION_BYTES.finditer(line)
+        )
+        for line in self.lines[start:]:
+            if transmissions:
+                line, transmissions = transmissions + line, None
+            if stored_images:
+                # Transmissions of images already held by the terminal are dropped
+                line = stored_images.filter(line)
             yield [(None, "U", pad_left + line + pad_right)]
 
         # render full lower padding if _rows_ >= _pad_down_,
@@ -15,19 +15,27 @@ __all__ = (
     "color",
     "get_cell_size",
     "get_fg_bg_colors",
+    "get_terminal_resize_count",
     "get_terminal_size",
     "get_window_size",
+    "init_capability_cache",
+    "monitor_terminal_resizes",
+    "mute_tty",
+    "query_capabilities",
     "query_terminal",
     "read_tty",
     "set_query_timeout",
     "write_tty",
 )
 
+import json
 import os
 import re
+import signal
 import sys
 import warnings
 from array import array
+from contextlib import contextmanager, suppress
 from functools import wraps
 from multiprocessing import Array, Process, Queue as mp_Queue, RLock as mp_RLock
 from operator import floordiv
@@ -35,9 +43,9 @@ from pathlib import Path
 from queue import Empty, Queue
 from shutil import get_terminal_size as _get_terminal_size
 from threading import RLock
-from time import monotonic
+from time import monotonic, time
 from types import FunctionType
-from typing import Callable, Optional, Tuple, Union
+from typing import Callable, Dict, Generator, Optional, Pattern, Tuple, Union
 
 from .exceptions import TermImageWarning
 
@@ -297,20 +305,11 @@ def get_fg_bg_colors(
         * an RGB hex string if *hex* is ``True``
         * ``None`` if undetermined
     """
-    with _tty_lock:  # All of the terminal's reply isn't read in `query_terminal()`
-        response = query_terminal(
-            # Not all terminals (e.g VTE-based) support multiple queries in one escape
-            # sequence, hence the repetition of OSC ... ST
-            f"{OSC}10;?{ST}{OSC}11;?{ST}{CSI}c".encode(),
-            # The response might contain a "c"; can't stop reading at "c"
-            lambda s: not s.endswith(CSI.encode()),
-        )
-        if not DISABLE_QUERIES:
-            read_tty()  # The rest of the response to `CSI c`
+    response = _query_capability("fg_bg_colors")
 
     fg = bg = None
     if response:
-        for c, spec in RGB_SPEC.findall(response.decode().rpartition(ESC)[0]):
+        for c, spec in RGB_SPEC.findall(response.decode()):
             if c == "10":
                 fg = x_parse_color(spec)
             elif c == "11":
@@ -324,19 +323,9 @@ def get_fg_bg_colors(
 @cached
 def get_terminal_name_version() -> Tuple[Optional[str], Optional[str]]:
     """Queries the :term:`active terminal` for it's name and version"""
-    with _tty_lock:  # the terminal's response to the query is not read all at once
-        # Terminal name/version query + terminal attribute query
-        # The latter is to speed up the entire query since most (if not all)
-        # terminals should support it and most terminals treat queries as FIFO
-        response = query_terminal(
-            f"{CSI}>q{CSI}c".encode(),
-            # The response might contain a "c"; can't stop reading at "c"
-            lambda s: not s.endswith(CSI.encode()),
-        )
-        if not DISABLE_QUERIES:
-            read_tty()  # The rest of the response to `CSI c`
+    response = _query_capability("name_version")
 
-    match = response and NAME_VERSION.fullmatch(response.decode().rpartition(ESC)[0])
+    match = response and NAME_VERSION.fullmatch(response.decode())
     name, version = (
         match.groups()
         if match
@@ -346,6 +335,61 @@ def get_terminal_name_version() -> Tuple[Optional[str], Optional[str]]:
     return (name and name.lower(), version)
 
 
+def get_terminal_resize_count() -> Optional[int]:
+    """Returns a number which changes whenever the :term:`active terminal` is resized.
+
+    Returns:
+        The number of ``SIGWINCH`` signals received by the process (plus the number
+        of times monitoring was resumed), or ``None`` if terminal resizes are not
+        being monitored (see :py:func:`monitor_terminal_resizes`).
+
+    The returned number is meant to be compared to a previously returned one, to
+    determine whether anything derived from the terminal size is still valid.
+    """
+    if not OS_IS_UNIX or signal.getsignal(signal.SIGWINCH) is not _handle_sigwinch:
+        return None
+
+    return _resize_count
+
+
+def monitor_terminal_resizes() -> bool:
+    """Starts or resumes monitoring of terminal resizes.
+
+    Returns:
+        ``True``, if terminal resizes are being monitored. Otherwise, ``False``.
+
+    Installs a ``SIGWINCH`` handler, if not already installed. Any previously
+    installed handler is still called upon every signal.
+
+    Monitoring stops if the handler is replaced (e.g by a TUI framework), in which
+    case this function should be called again (after the replacement) to resume it.
+    While monitoring, :py:func:`get_terminal_size` and the rendered size of images
+    with a :term:`dynamic size` are memoized until the terminal is resized
+    (see :py:func:`get_terminal_resize_count`).
+
+    NOTE:
+        Currently works on UNIX only, returns ``False`` on any other platform.
+        Must be called from the main thread.
+    """
+    global _prev_sigwinch_handler, _resize_count
+
+    if not OS_IS_UNIX:
+        return False
+
+    handler = signal.getsignal(signal.SIGWINCH)
+    if handler is not _handle_sigwinch:
+        try:
+            signal.signal(signal.SIGWINCH, _handle_sigwinch)
+        except ValueError:  # Not the main thread
+            return False
+        # If the replaced handler calls its predecessor (i.e this handler), the
+        # resulting cycle is broken within this handler
+        _prev_sigwinch_handler = handler
+        _resize_count += 1  # Resizes might've been missed while not monitored
+
+    return True
+
+
 def get_terminal_size() -> os.terminal_size:
     """Returns the current size of the :term:`active terminal`.
 
@@ -357,7 +401,15 @@ def get_terminal_size() -> os.terminal_size:
 
     This implementation still gives the correct size of the process' controlling
     terminal when output is redirected (in most cases), unlike the fallback.
+
+    While terminal resizes are monitored (see :py:func:`monitor_terminal_resizes`),
+    the size is memoized until the terminal is resized.
     """
+    # Read before the size, so that a resize in-between invalidates the cache
+    resize_count = get_terminal_resize_count()
+    if resize_count is not None and resize_count == _terminal_size_cache[0]:
+        return _terminal_size_cache[1]
+
     if _tty:
         # faster and gives correct results when output is redirected
         try:
@@ -367,7 +419,10 @@ def get_terminal_size() -> os.terminal_size:
     else:
         size = None
 
-    return size or _get_terminal_size()
+    size = size or _get_terminal_size()
+    _terminal_size_cache[:] = (resize_count, size)
+
+    return size
 
 
 @unix_tty_only
@@ -402,12 +457,8 @@ def get_window_size() -> Optional[Tuple[int, int]]:
 
         if not size:
             # Then CSI 14 t
-            # The second sequence is to speed up the entire query since most (if not
-            # all) terminals should support it and most terminals treat queries as FIFO
-            response = query_terminal(
-                f"{CSI}14t{CSI}c".encode(), more=lambda s: not s.endswith(b"c")
-            )
-            size = (response or None) and WIN_SIZE.match(response.decode())
+            response = _query_capability("window_size")
+            size = response and WIN_SIZE.match(response.decode())
             if size:
                 # XTWINOPS specifies (height, width)
                 size = tuple(map(int, size.groups()))[::-1]
@@ -423,6 +474,52 @@ def get_window_size() -> Optional[Tuple[int, int]]:
         return None if 0 in size else size
 
 
+def init_capability_cache(ttl: float, path: Optional[str] = None) -> None:
+    """Enables or disables the on-disk cache of terminal capabilities.
+
+    Args:
+        ttl: The time (in seconds) for which a cached response remains valid.
+          If zero, the on-disk cache is disabled.
+        path: The file in which responses are stored. If ``None``,
+          ``term_image/terminals.json`` within the user cache directory is used.
+
+    The responses of the :term:`active terminal` to capability queries (such as its
+    name and version, default colors, window size and graphics protocol support)
+    are stored per terminal, identified by the ``TERM``, ``TERM_PROGRAM`` and
+    ``TERM_PROGRAM_VERSION`` environment variables, the terminal device and the
+    session ID of the process. Hence, subsequent processes within the same terminal
+    session (e.g previewers spawned by a file manager) need not query the terminal.
+
+    Valid responses already cached for the active terminal are loaded immediately.
+    Only complete responses (i.e received in time) are cached.
+
+    NOTE:
+        Responses are never cached when :py:data:`DISABLE_QUERIES` is true.
+    """
+    global _capability_cache_path, _capability_cache_ttl
+
+    _capability_cache_ttl = ttl
+    _capability_cache_path = ttl and (
+        path
+        or os.path.join(
+            os.environ.get(
+                "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")
+            ),
+            "term_image",
+            "terminals.json",
+        )
+    )
+    if not (_capability_cache_path and _tty):
+        return
+
+    now = time()
+    with _capability_lock:
+        entries = _load_capability_cache().get(_get_terminal_id(), {})
+        for key, (stored_at, response) in entries.items():
+            if now - stored_at < ttl:
+                _capabilities.setdefault(key, response.encode("latin-1"))
+
+
 def is_writable(path: Union[str, os.PathLike, Path]) -> bool:
     """Checks if a file path is writable or creatable.
 
@@ -451,6 +548,95 @@ def is_writable(path: Union[str, os.PathLike, Path]) -> bool:
     return writable
 
 
+@contextmanager
+def mute_tty() -> Generator[None, None, None]:
+    """Disables input echo and canonical mode on the :term:`active terminal`, within
+    the context.
+
+    Hence, responses of the terminal to requests written along with other output
+    (i.e not via :py:func:`query_terminal`) are not printed onto the screen, even
+    if they arrive while not being read.
+
+    Upon exit, the terminal is restored to the state in which it was met and any
+    unread input is discarded.
+
+    NOTE:
+        Currently works on UNIX only. Has no effect on any other platform or when
+        there is no :term:`active terminal`.
+    """
+    if not _tty:
+        yield
+        return
+
+    with _tty_lock:
+        old_attr = termios.tcgetattr(_tty)
+        new_attr = termios.tcgetattr(_tty)
+        new_attr[3] &= ~(termios.ECHO | termios.ICANON)
+        termios.tcsetattr(_tty, termios.TCSANOW, new_attr)
+    try:
+        yield
+    finally:
+        with _tty_lock:
+            termios.tcsetattr(_tty, termios.TCSANOW, old_attr)
+            termios.tcflush(_tty, termios.TCIFLUSH)
+
+
+@unix_tty_only
+def query_capabilities(*names: str) -> Optional[Dict[str, bytes]]:
+    """Queries the :term:`active terminal` for multiple capabilities at once.
+
+    Args:
+        names: Names of capability queries. If none is given, all known queries are
+          sent.
+
+    Returns:
+        ``None`` if :py:data:`DISABLE_QUERIES` is true, else the response to each
+        query (empty, if not supported by the terminal or not received in time).
+
+    All queries, followed by a primary device attributes request (which virtually
+    all terminals respond to, in order), are written at once and responses are read
+    until that of the latter is received. Hence, the terminal is queried in a single
+    round-trip, with at most one timeout.
+
+    Queries whose responses are in the capability cache (see
+    :py:func:`init_capability_cache`) are not sent.
+    """
+    if DISABLE_QUERIES:
+        return None
+
+    keys = {name: _get_capability_key(name) for name in names or _capability_queries}
+    with _capability_lock:
+        responses = {
+            name: _capabilities[key]
+            for name, key in keys.items()
+            if key in _capabilities
+        }
+    pending = [name for name in keys if name not in responses]
+    if not pending:
+        return responses
+
+    response = query_terminal(
+        b"".join(_capability_queries[name][0] for name in pending) + f"{CSI}c".encode(),
+        # Other responses might contain a "c"; can't stop reading at "c"
+        lambda s: not DA1.search(s),
+    )
+    end = DA1.search(response)
+    if end:
+        response = response[: end.start()]
+    new_responses = {
+        name: b"".join(
+            match.group() for match in _capability_queries[name][1].finditer(response)
+        )
+        for name in pending
+    }
+    if end:  # Otherwise, responses might be incomplete
+        _store_capabilities(
+            {keys[name]: value for name, value in new_responses.items()}
+        )
+
+    return {**responses, **new_responses}
+
+
 @unix_tty_only
 @lock_tty
 def query_terminal(
@@ -637,6 +823,53 @@ def x_parse_color(spec: str) -> Tuple[int, int, int]:
     return tuple(int(x, 16) * 255 // ((1 << (len(x) * 4)) - 1) for x in spec.split("/"))
 
 
+def _get_capability_key(name: str) -> str:
+    """Returns the key of a capability query's response in the capability cache."""
+    if _capability_queries[name][2]:  # Dependent on the terminal size
+        return "{} {}x{}".format(name, *get_terminal_size())
+    return name
+
+
+def _get_terminal_id() -> str:
+    """Returns the identity of the :term:`active terminal`, within the on-disk
+    capability cache.
+    """
+    return repr(
+        (
+            *map(os.environ.get, ("TERM", "TERM_PROGRAM", "TERM_PROGRAM_VERSION")),
+            os.fstat(_tty).st_rdev,
+            os.getsid(0),
+        )
+    )
+
+
+def _handle_sigwinch(signum, frame):
+    global _handling_sigwinch, _resize_count
+
+    _resize_count += 1
+    # The chain of previous handlers may lead back to this one e.g if the handler was
+    # replaced by one that calls its predecessor and then re-installed
+    if callable(_prev_sigwinch_handler) and not _handling_sigwinch:
+        _handling_sigwinch = True
+        try:
+            _prev_sigwinch_handler(signum, frame)
+        finally:
+            _handling_sigwinch = False
+
+
+def _load_capability_cache() -> Dict[str, Dict[str, Tuple[float, str]]]:
+    """Returns the contents of the on-disk capability cache, or an empty dictionary
+    if it can not be read.
+    """
+    try:
+        with open(_capability_cache_path) as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+    return cache if isinstance(cache, dict) else {}
+
+
 def _process_start_wrapper(self, *args, **kwargs):
     global _tty_lock, _win_size_cache, _win_size_lock
 
@@ -692,10 +925,72 @@ def _process_run_wrapper(self, *args, set_tty_lock: bool = True, **kwargs):
     return _process_run_wrapper.__wrapped__(self, *args, **kwargs)
 
 
+def _query_capability(name: str) -> Optional[bytes]:
+    """Returns the response of the :term:`active terminal` to a single capability
+    query, or ``None`` if :py:func:`query_capabilities` returns ``None``.
+    """
+    responses = query_capabilities(name)
+    return responses and responses[name]
+
+
+def _register_capability_query(
+    name: str, request: bytes, response: Pattern[bytes], size_dependent: bool = False
+) -> None:
+    """Registers a capability query.
+
+    Args:
+        name: The name of the query.
+        request: The query sequence.
+        response: A pattern matching the response of a terminal to the query, such
+          that it can be extracted from the responses to other queries.
+        size_dependent: Whether the response depends on the terminal size.
+    """
+    _capability_queries[name] = (request, response, size_dependent)
+
+
+def _store_capabilities(responses: Dict[str, bytes]) -> None:
+    """Adds capability query responses to the capability cache.
+
+    Args:
+        responses: A mapping from capability cache keys to responses.
+    """
+    with _capability_lock:
+        _capabilities.update(responses)
+        if not (_capability_cache_path and _tty):
+            return
+
+        now = time()
+        cache = {
+            terminal_id: entries
+            for terminal_id, entries in _load_capability_cache().items()
+            if any(
+                now - stored_at < _capability_cache_ttl
+                for stored_at, _ in entries.values()
+            )
+        }
+        entries = cache.setdefault(_get_terminal_id(), {})
+        for key, response in responses.items():
+            entries[key] = (now, response.decode("latin-1"))
+
+        # Written to a temporary file first to prevent other processes from ever
+        # reading an incomplete cache
+        temp_path = f"{_capability_cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(_capability_cache_path), exist_ok=True)
+            with open(temp_path, "w") as file:
+                json.dump(cache, file)
+            os.replace(temp_path, _capability_cache_path)
+        except OSError:
+            with suppress(OSError):
+                os.remove(temp_path)
+
+
 QUERY_TIMEOUT = 0.1
 RGB_SPEC = re.compile(r"\033](\d+);rgb:([\da-fA-F/]+)\033\\", re.ASCII)
 WIN_SIZE = re.compile(r"\033\[4;(\d+);(\d+)t", re.ASCII)
 NAME_VERSION = re.compile(r"\033P>\|(\w+)[( ]([^)\033]+)\)?\033\\", re.ASCII)
+# Primary device attributes
+DA1 = re.compile(rb"\033\[\?[\d;]*c")
 
 # Constants for escape sequences
 
@@ -711,6 +1006,34 @@ _tty: Optional[int] = None
 _tty_lock = RLock()
 _win_size_cache = [0] * 4
 _win_size_lock = RLock()
+_handling_sigwinch = False
+_prev_sigwinch_handler = None
+_resize_count = 0
+_terminal_size_cache = [None, None]  # [resize count, size]
+# name -> (request, response pattern, dependent on terminal size)
+_capability_queries: Dict[str, Tuple[bytes, Pattern[bytes], bool]] = {}
+# key -> response; see `_get_capability_key()`
+_capabilities: Dict[str, bytes] = {}
+_capability_cache_path: Optional[str] = None
+_capability_cache_ttl: float = 0.0
+_capability_lock = RLock()
+
+_register_capability_query(
+    "name_version", f"{CSI}>q".encode(), re.compile(rb"\033P>\|[^\033]*\033\\")
+)
+_register_capability_query(
+    "fg_bg_colors",
+    # Not all terminals (e.g VTE-based) support multiple queries in one escape
+    # sequence, hence the repetition of OSC ... ST
+    f"{OSC}10;?{ST}{OSC}11;?{ST}".encode(),
+    re.compile(rb"\033\]1[01];[^\033]*\033\\"),
+)
+_register_capability_query(
+    "window_size",
+    f"{CSI}14t".encode(),
+    re.compile(rb"\033\[4;\d+;\d+t"),
+    size_dependent=True,
+)
 
 if OS_IS_UNIX:
     for stream in ("out", "in", "err"):  # In order of priority
@@ -540,6 +540,27 @@ def test_render_clean_up_All():
         img.load()
 
 
+def test_encoder_threads_Graphics():
+    image = ImageClass.from_file("tests/images/vert.jpg", height=_size)
+    threads = GraphicsImage.ENCODER_THREADS
+    try:
+        GraphicsImage.ENCODER_THREADS = 1
+        renders = [
+            image._renderer(image._render_image, alpha, method="lines")
+            for alpha in (_ALPHA_THRESHOLD, None)
+        ]
+        for GraphicsImage.ENCODER_THREADS in (None, 2, 4):
+            assert [
+                image._renderer(image._render_image, alpha, method="lines")
+                for alpha in (_ALPHA_THRESHOLD, None)
+            ] == renders
+    finally:
+        GraphicsImage.ENCODER_THREADS = threads
+
+    assert GraphicsImage._encode_lines(str, []) == []
+    assert GraphicsImage._encode_lines(str, range(100)) == list(map(str, range(100)))
+
+
 def test_style_args_All():
     image = ImageClass(python_img)
     with pytest.raises(getattr(exceptions, f"{ImageClass.__name__}Error")):
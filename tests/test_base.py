@@ -2,6 +2,7 @@
 
 import io
 import os
+import signal
 import sys
 from operator import floordiv, mul
 from random import random
@@ -9,11 +10,11 @@ from random import random
 import pytest
 from PIL import Image, UnidentifiedImageError
 
-from term_image import set_cell_ratio
+from term_image import set_cell_ratio, utils
 from term_image.exceptions import InvalidSizeError, TermImageError
-from term_image.image import BlockImage, ImageIterator, ImageSource, Size
-from term_image.image.common import _ALPHA_THRESHOLD
-from term_image.utils import ESC
+from term_image.image import BlockImage, ImageIterator, ImageSource, Size, common
+from term_image.image.common import _ALPHA_THRESHOLD, _FrameScheduler, _OutputMonitor
+from term_image.utils import CSI, ESC
 
 from .common import _size, columns, lines, python_img, setup_common
 
@@ -477,6 +478,309 @@ def test_seek_tell():
     assert image.tell() == 0
 
 
+class TestIndexFrames:
+    def test_args(self):
+        image = BlockImage(anim_img)
+        for value in (1.0, "16", None):
+            with pytest.raises(TypeError, match="interval"):
+                image.index_frames(value)
+        for value in (0, -1):
+            with pytest.raises(ValueError, match="interval"):
+                image.index_frames(value)
+
+    def test_not_animated(self):
+        image = BlockImage(python_img)
+        image.index_frames()
+        assert not hasattr(image, "_frame_index")
+
+    @pytest.mark.parametrize("disk", (False, True))
+    @pytest.mark.parametrize("interval", (1, 3, 16))
+    @pytest.mark.parametrize(
+        "path", ("tests/images/lion.gif", "tests/images/anim.webp")
+    )
+    def test_frames(self, path, interval, disk):
+        image = BlockImage.from_file(path)
+        image.index_frames(interval, disk=disk)
+        index = image._frame_index
+        with Image.open(path) as img:
+            assert image.n_frames == index.n_frames == img.n_frames
+            frames = []
+            for n in range(img.n_frames):
+                img.seek(n)
+                frames.append(img.convert("RGBA").tobytes())
+                assert index.durations[n] == (img.info.get("duration") or 100) / 1000
+
+        # Sequential, backward and random access
+        order = [*range(len(frames)), *range(len(frames) - 1, -1, -1), 5, 2, 7, 7]
+        for n in order:
+            with index.get(n) as frame:
+                assert frame.convert("RGBA").tobytes() == frames[n]
+
+        with pytest.raises(EOFError):
+            index.get(len(frames))
+
+    def test_render(self):
+        image = BlockImage.from_file("tests/images/lion.gif")
+        image.set_size(width=20)
+        renders = []
+        for n in range(image.n_frames):
+            image.seek(n)
+            renders.append(str(image))
+
+        image.index_frames(4)
+        for n in (*range(image.n_frames), 9, 0, 6):
+            image.seek(n)
+            assert str(image) == renders[n]
+
+        image.seek(0)
+        assert [*ImageIterator(image, 1, "1.1", False)] == renders
+
+    def test_close(self):
+        image = BlockImage.from_file("tests/images/lion.gif")
+        image.index_frames()
+        assert image._frame_index
+        image.close()
+        assert image._frame_index is None
+
+
+class TestFrameScheduler:
+    @pytest.fixture(autouse=True)
+    def clock(self, monkeypatch):
+        self.now = 0.0
+
+        def sleep(secs):
+            self.now += secs
+
+        monkeypatch.setattr(common.time, "monotonic", lambda: self.now)
+        monkeypatch.setattr(common.time, "sleep", sleep)
+
+    def test_in_sync(self):
+        for policy in ("drop", "catch-up", "stretch"):
+            self.now = 0.0
+            scheduler = _FrameScheduler(policy)
+            scheduler.start()
+            for n in range(1, 6):
+                assert scheduler.next(0.1) == 0
+                self.now += 0.05  # Render time
+                scheduler.wait()
+                assert self.now == pytest.approx(n * 0.1)
+            assert scheduler.stats["dropped"] == scheduler.stats["late"] == 0
+
+    def test_drop(self):
+        scheduler = _FrameScheduler("drop")
+        scheduler.start()
+        self.now = 0.35
+        assert scheduler.next(0.1) == 2  # Frames due at 0.1 and 0.2
+        assert scheduler.remaining() == 0  # Frame due at 0.3
+        assert scheduler.stats["dropped"] == 2
+        assert scheduler.stats["late"] == 1
+
+        # Back in sync
+        assert scheduler.next(0.1) == 0
+        assert scheduler.remaining() == pytest.approx(0.05)
+        assert scheduler.stats["late"] == 1
+
+    def test_undrop(self):
+        scheduler = _FrameScheduler("drop")
+        scheduler.start()
+        self.now = 0.35
+        assert scheduler.next(0.1) == 2
+        scheduler.undrop(1)  # e.g the last frame of the loop
+        assert scheduler.stats["dropped"] == 1
+
+    def test_catch_up(self):
+        scheduler = _FrameScheduler("catch-up")
+        scheduler.start()
+        self.now = 0.35
+        for _ in range(3):
+            assert scheduler.next(0.1) == 0
+            assert scheduler.remaining() == 0
+        assert scheduler.next(0.1) == 0
+        assert scheduler.remaining() == pytest.approx(0.05)
+        assert scheduler.stats["dropped"] == 0
+        assert scheduler.stats["late"] == 3
+
+    def test_stretch(self):
+        scheduler = _FrameScheduler("stretch")
+        scheduler.start()
+        self.now = 0.35
+        assert scheduler.next(0.1) == 0
+        assert scheduler.remaining() == pytest.approx(0.1)
+        assert scheduler.stats["dropped"] == scheduler.stats["late"] == 0
+
+    def test_write(self):
+        scheduler = _FrameScheduler("drop")
+        for write_time in (0.02, 0.04):
+            with scheduler.write():
+                self.now += write_time
+        stats = scheduler.stats
+        assert stats["rendered"] == 2
+        assert stats["write_latency"] == pytest.approx(0.03)
+        assert stats["max_write_latency"] == pytest.approx(0.04)
+
+    def test_display_animated(self):
+        image = BlockImage.from_file("tests/images/lion.gif")
+        image.set_size(width=20)
+        assert image.anim_stats is None
+
+        image._display_animated(image._get_image(), None, (), 1, False)
+        assert image.anim_stats["rendered"] == image.n_frames
+        assert image.anim_stats["dropped"] == 0
+
+        # Writes slower than the frame duration
+        def clear_frame():
+            self.now += image._frame_duration * 2.5
+            return False
+
+        image._clear_frame = clear_frame
+        for policy in ("drop", "catch-up", "stretch"):
+            image.SYNC_POLICY = policy
+            self.now = 0.0
+            image._display_animated(image._get_image(), None, (), 1, False)
+            stats = image.anim_stats
+            assert stats["rendered"] + stats["dropped"] == image.n_frames
+            if policy == "drop":
+                assert stats["dropped"]
+                assert self.now < image.n_frames * image._frame_duration * 1.5
+            else:
+                assert not stats["dropped"]
+
+    def test_drop_unknown_n_frames(self):
+        image = BlockImage.from_file("tests/images/lion.gif")
+        image.set_size(width=20)
+        image.SYNC_POLICY = "drop"
+
+        def clear_frame():
+            self.now += image._frame_duration * 2.5
+            return False
+
+        image._clear_frame = clear_frame
+        image._display_animated(image._get_image(), None, (), 1, False)
+        assert image.anim_stats["dropped"]
+        # Not computed, since that requires decoding all frames
+        assert image._n_frames is None
+        assert self.now < anim_img.n_frames * image._frame_duration * 1.5
+
+
+class TestOutputMonitor:
+    @pytest.fixture(autouse=True)
+    def terminal(self, monkeypatch):
+        # A terminal which processes one frame per `read_tty()` call
+        self.now = 0.0
+        self.requests = 0
+
+        def query_terminal(request, more, timeout=None):
+            self.now += 0.01
+            return self.response
+
+        def read_tty(more=None, timeout=None):
+            self.now += 0.01
+            if self.requests and self.response:
+                self.requests -= 1
+                return self.response
+            return b""
+
+        def write(*args, **kwargs):
+            self.requests += 1
+
+        monkeypatch.setattr(common.time, "monotonic", lambda: self.now)
+        monkeypatch.setattr(common, "query_terminal", query_terminal)
+        monkeypatch.setattr(common, "read_tty", read_tty)
+        monkeypatch.setattr(common, "print", write, raising=False)
+        self.response = f"{CSI}0n".encode()
+
+    def test_unsupported(self):
+        self.response = b""
+        with _OutputMonitor(0.1) as monitor:
+            assert not monitor.supported
+
+    def test_drain(self):
+        with _OutputMonitor(0.1) as monitor:
+            assert monitor.supported
+            assert monitor._rtt == pytest.approx(0.01)
+            for _ in range(5):
+                monitor.written("x" * 1000)
+                self.now += 0.05
+            assert len(monitor._pending) == 5
+
+            # Only the frames lagging behind by more than the maximum lag are waited for
+            monitor.drain()
+            assert len(monitor._pending) == 1
+            assert self.now - monitor._pending[0][1] <= monitor._rtt + 0.1
+            assert monitor.bandwidth > 0
+
+        # Every response is awaited
+        assert not monitor._pending
+
+    def test_idle_terminal(self):
+        with _OutputMonitor(0.1) as monitor:
+            self.now += 1.0
+            start = self.now
+            self.now += 0.04  # Blocked writing
+            monitor.written("x" * 1000, start)
+            monitor.drain()
+            # Excludes the round-trip and the time the terminal was idle
+            assert monitor.bandwidth == pytest.approx(1000 / 0.04)
+
+    def test_timeout(self):
+        waits = []
+        for timeout in (None, 0.2):
+            with _OutputMonitor(0.1, timeout) as monitor:
+                monitor.written("x" * 1000)
+                self.response = b""  # Never answered
+                start = self.now
+            waits.append(self.now - start)
+            self.response = f"{CSI}0n".encode()
+        assert waits[0] > 1.1
+        assert 0.2 < waits[1] < 0.25
+
+    @pytest.fixture
+    def capabilities(self, monkeypatch):
+        monkeypatch.setattr(utils, "_capability_cache_path", None)
+        saved = utils._capabilities.copy()
+        utils._capabilities.clear()
+        yield
+        utils._capabilities.clear()
+        utils._capabilities.update(saved)
+
+    def test_still(self, monkeypatch, capabilities):
+        def write(output, *args, **kwargs):
+            self.requests += 1
+            if output != f"{CSI}5n":
+                self.now += 0.05
+
+        monkeypatch.setattr(common, "print", write, raising=False)
+        monkeypatch.setattr(sys.stdout, "isatty", lambda: True)
+        image = BlockImage(python_img)
+
+        # Disabled by default
+        image._display_image("x" * 2**16)
+        assert self.requests == 1
+        assert common._get_terminal_bandwidth() == common._DEFAULT_BANDWIDTH
+
+        self.requests = 0
+        image.MEASURE_STILLS = True
+        # Small renders are not measured
+        image._display_image("x" * 1000)
+        assert self.requests == 1
+        assert common._get_terminal_bandwidth() == common._DEFAULT_BANDWIDTH
+
+        image._display_image("x" * 2**16)
+        assert common._get_terminal_bandwidth() == pytest.approx(2**16 / 0.05)
+
+        # Smoothed across measurements
+        self.now += 1.0
+        image._display_image("x" * 2**17)
+        assert common._get_terminal_bandwidth() == pytest.approx(
+            0.75 * 2**16 / 0.05 + 0.25 * 2**17 / 0.05
+        )
+
+        monkeypatch.setattr(image, "OUTPUT_LAG", None)
+        self.requests = 0
+        image._display_image("x" * 2**16)
+        assert self.requests == 1
+
+
 class TestSetSize:
     image = BlockImage(python_img)  # Square
     h_image = BlockImage.from_file("tests/images/hori.jpg")  # Horizontally-oriented
@@ -534,6 +838,123 @@ class TestSetSize:
             self.v_image.set_size(width=100, maxsize=(100, 50))
 
 
+@pytest.mark.skipif(not hasattr(signal, "SIGWINCH"), reason="No SIGWINCH")
+class TestGeometry:
+    @pytest.fixture(autouse=True)
+    def monitor(self, monkeypatch):
+        handler = signal.getsignal(signal.SIGWINCH)
+        monkeypatch.setattr(utils, "_prev_sigwinch_handler", None)
+        assert utils.monitor_terminal_resizes()
+        yield
+        signal.signal(signal.SIGWINCH, handler)
+
+    def resize(self):
+        os.kill(os.getpid(), signal.SIGWINCH)
+
+    def test_resize_count(self):
+        count = utils.get_terminal_resize_count()
+        assert isinstance(count, int)
+        assert utils.get_terminal_resize_count() == count
+        self.resize()
+        assert utils.get_terminal_resize_count() == count + 1
+
+        # Installed once
+        prev_handler = utils._prev_sigwinch_handler
+        assert utils.monitor_terminal_resizes()
+        assert utils.get_terminal_resize_count() == count + 1
+        assert utils._prev_sigwinch_handler is prev_handler
+
+        # Not monitored
+        signal.signal(signal.SIGWINCH, signal.SIG_DFL)
+        assert utils.get_terminal_resize_count() is None
+
+    def test_chaining(self):
+        signals = []
+        signal.signal(signal.SIGWINCH, lambda *args: signals.append(args))
+        assert utils.get_terminal_resize_count() is None
+
+        # Previous handler is chained
+        assert utils.monitor_terminal_resizes()
+        count = utils.get_terminal_resize_count()
+        self.resize()
+        assert utils.get_terminal_resize_count() > count
+        assert len(signals) == 1
+
+    def test_chaining_cycle(self):
+        # A replacement which calls its predecessor (i.e the monitoring handler)
+        signals = []
+        prev_handler = signal.getsignal(signal.SIGWINCH)
+
+        def handler(*args):
+            signals.append(args)
+            prev_handler(*args)
+
+        signal.signal(signal.SIGWINCH, handler)
+        assert utils.monitor_terminal_resizes()  # Re-installed, chaining *handler*
+        count = utils.get_terminal_resize_count()
+        self.resize()  # Would recurse infinitely
+        assert utils.get_terminal_resize_count() > count
+        assert len(signals) == 1
+
+    def test_memoized(self, monkeypatch):
+        image = BlockImage(python_img)
+        calls = []
+        valid_size = image._valid_size
+
+        def _valid_size(*args, **kwargs):
+            calls.append(args)
+            return valid_size(*args, **kwargs)
+
+        monkeypatch.setattr(image, "_valid_size", _valid_size)
+        rendered_size = image.rendered_size
+        assert (image.rendered_width, image.rendered_height) == rendered_size
+        assert len(calls) == 1
+
+        # Invalidated by a resize
+        self.resize()
+        assert image.rendered_size == rendered_size
+        assert len(calls) == 2
+
+        # Scale
+        size = image._geometry[1][0]
+        image.scale = 0.5
+        assert image.rendered_size == tuple(round(x * 0.5) for x in size)
+        assert len(calls) == 3
+        image.scale = 1.0
+
+        # Size
+        image.size = Size.ORIGINAL
+        image.rendered_size
+        assert len(calls) == 4
+
+        # Cell ratio
+        try:
+            set_cell_ratio(0.25)
+            image.size = Size.FIT
+            calls.clear()
+            size = image.rendered_size
+            set_cell_ratio(0.5)
+            assert image.rendered_size != size
+            assert len(calls) == 2
+        finally:
+            set_cell_ratio(0.5)
+
+        # Fixed size
+        image.width = _size
+        calls.clear()
+        assert image.rendered_width == _size
+        assert not calls
+
+    def test_renderer(self):
+        image = BlockImage(python_img)
+        image.size = Size.FIT_TO_WIDTH
+        sizes = []
+        image._renderer(lambda img: sizes.append((image._size, image._v_allow)))
+        assert sizes == [(image._geometry[1][0], 0)]
+        assert image.size is Size.FIT_TO_WIDTH
+        assert image._v_allow == 2
+
+
 def test_renderer():
     def test(img, *args, **kwargs):
         return img, args, kwargs
@@ -660,6 +1081,91 @@ class TestRenderData:
 
         assert rgb != rounded_rgb  # Blends rounded rgb with terminal BG
 
+    def test_compact(self):
+        image = BlockImage(python_img, height=_size)
+        for alpha in (_ALPHA_THRESHOLD, "#", None):
+            for round_alpha in (False, True):
+                img, rgb, a = image._get_render_data(
+                    python_img, alpha, round_alpha=round_alpha
+                )
+                _, compact_rgb, compact_a = image._get_render_data(
+                    python_img, alpha, round_alpha=round_alpha, compact=True
+                )
+                assert isinstance(compact_rgb, memoryview)
+                assert bytes(compact_rgb) == bytes(val for px in rgb for val in px)
+                if img.mode == "RGBA":
+                    assert isinstance(compact_a, memoryview)
+                    assert bytes(compact_a) == bytes(a)
+                else:
+                    assert compact_a is None
+
+        # Opaque image with an alpha channel
+        img = python_img.convert("RGB").convert("RGBA")
+        for round_alpha in (False, True):
+            _, rgb, a = image._get_render_data(
+                img, _ALPHA_THRESHOLD, round_alpha=round_alpha, frame=True, compact=True
+            )
+            assert isinstance(rgb, memoryview)
+            assert a is None
+
+        _, rgb, a = image._get_render_data(
+            python_img, None, pixel_data=False, compact=True
+        )
+        assert rgb is None
+        assert a is None
+
+    def test_jpeg_draft(self):
+        jpeg_image = "tests/images/vert.jpg"
+        size = (50, 120)  # 1/5 of the original size
+
+        image = BlockImage.from_file(jpeg_image)
+        img = image._get_image()
+        render_img, *_ = image._get_render_data(img, None, size=size)
+        assert render_img.size == size
+        # Decoded at a reduced scale
+        assert size[0] <= img.size[0] < image._original_size[0]
+        assert size[1] <= img.size[1] < image._original_size[1]
+
+        # User-provided PIL image
+        img = Image.open(jpeg_image)
+        image = BlockImage(img)
+        render_img, *_ = image._get_render_data(img, None, size=size)
+        assert render_img.size == size
+        assert img.size == image._original_size
+
+        # Not small enough
+        image = BlockImage.from_file(jpeg_image)
+        img = image._get_image()
+        image._get_render_data(img, None, size=(200, 480))
+        assert img.size == image._original_size
+
+    def test_reduce(self, monkeypatch):
+        reduced = []
+        reduce = Image.Image.reduce
+
+        def _reduce(img, factor, *args):
+            reduced.append((img.size, factor))
+            return reduce(img, factor, *args)
+
+        monkeypatch.setattr(Image.Image, "reduce", _reduce)
+        img = Image.new("RGB", (480, 400), "red")
+        image = BlockImage(img)
+        render_img, *_ = image._get_render_data(img, None, size=(48, 40))
+        assert render_img.size == (48, 40)
+        assert render_img.getpixel((0, 0)) == (255, 0, 0)
+        assert reduced == [((480, 400), 5)]
+
+        # Not small enough
+        reduced.clear()
+        image._get_render_data(img, None, size=(200, 160))
+        assert not reduced
+
+        # Transparent
+        img = Image.new("RGBA", (480, 400), (255, 0, 0, 127))
+        image = BlockImage(img)
+        image._get_render_data(img, _ALPHA_THRESHOLD, size=(48, 40))
+        assert not reduced
+
     def test_cleanup(self):
         def test(img, *, frame, fail=False):
             ori_size = image._original_size
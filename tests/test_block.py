@@ -4,11 +4,11 @@ from random import random
 
 import pytest
 
-from term_image.image import BlockImage
+from term_image.image import BlockImage, block
 from term_image.image.common import _ALPHA_THRESHOLD
 from term_image.utils import BG_FMT, COLOR_RESET, CSI
 
-from . import common, set_fg_bg_colors
+from . import common, set_fg_bg_colors, toggle_is_on_kitty
 from .common import _size, setup_common
 
 for name, obj in vars(common).items():
@@ -122,3 +122,47 @@ class TestRender:
                 line == COLOR_RESET + " " * self.trans.rendered_width + COLOR_RESET
                 for line in render.splitlines()
             )
+
+
+@pytest.mark.skipif(not block.numpy, reason="NumPy is not installed")
+def test_render_runs(monkeypatch):
+    numpy = block.numpy
+    for file in ("python.png", "elephant.png", "trans.png", "vert.jpg"):
+        image = BlockImage.from_file(f"tests/images/{file}")
+        for on_kitty in (False, True):
+            for bg in ((0, 0, 0), (255, 255, 255), None):
+                set_fg_bg_colors(bg=bg)
+                for alpha in (_ALPHA_THRESHOLD, 0.0, 0.9, None, "#", "#ff0000"):
+                    render = image._renderer(image._render_image, alpha)
+                    monkeypatch.setattr(block, "numpy", None)
+                    assert render == image._renderer(image._render_image, alpha)
+                    monkeypatch.setattr(block, "numpy", numpy)
+            toggle_is_on_kitty()
+    set_fg_bg_colors((0, 0, 0), (0, 0, 0))
+
+
+def test_frame_delta():
+    get_frame_delta = BlockImage._get_frame_delta
+    frame = ["a0", "b0", "c0", "d0"]
+
+    # Unchanged
+    assert get_frame_delta(frame, frame) == ""
+
+    # Last line
+    assert get_frame_delta(frame, ["a0", "b0", "c0", "d1"]) == "\rd1"
+
+    # First line
+    assert get_frame_delta(frame, ["a1", "b0", "c0", "d0"]) == f"\r{CSI}3Aa1{CSI}3B"
+
+    # Non-consecutive lines
+    assert get_frame_delta(frame, ["a0", "b1", "c0", "d1"]) == f"\r{CSI}2Ab1\r{CSI}2Bd1"
+    assert (
+        get_frame_delta(frame, ["a1", "b0", "c1", "d0"])
+        == f"\r{CSI}3Aa1\r{CSI}2Bc1{CSI}1B"
+    )
+
+    # Different height
+    assert get_frame_delta(frame, ["a1", "b0"]) == f"\r{CSI}3Aa1\nb0"
+    assert get_frame_delta(frame[:2], frame) == f"\r{CSI}1A" + "\n".join(frame)
+    # From a single line
+    assert get_frame_delta(frame[:1], frame) == "\r" + "\n".join(frame)
@@ -1,3 +1,5 @@
+import sys
+from threading import current_thread
 from types import GeneratorType
 
 import pytest
@@ -210,6 +212,109 @@ def test_caching():
     assert next(image_it).count("\n") + 1 == 10
 
 
+class TestCacheMaxsize:
+    gif_image = BlockImage.from_file(gif_image._source.filename)
+    gif_image._size = _size
+    n_frames = gif_image.n_frames
+
+    def render(self, *args, **kwargs):
+        self.n_calls += 1
+        if self.gif_image.tell() == self.n_frames:
+            raise EOFError
+        return f"{self.gif_image.tell():04}" * 250
+
+    def iterate(self, maxsize, compress=0, policy="loop"):
+        self.n_calls = 0
+        self.gif_image._render_image = self.render
+        try:
+            ImageIterator.CACHE_MAXSIZE = maxsize
+            ImageIterator.CACHE_COMPRESS = compress
+            ImageIterator.CACHE_POLICY = policy
+            frames = [*ImageIterator(self.gif_image, 3, "1.1", cached=True)]
+        finally:
+            ImageIterator.CACHE_MAXSIZE = None
+            ImageIterator.CACHE_COMPRESS = 0
+            ImageIterator.CACHE_POLICY = "loop"
+            del self.gif_image._render_image
+
+        assert frames == [f"{n:04}" * 250 for n in range(self.n_frames)] * 3
+        return self.n_calls
+
+    def test_unlimited(self):
+        assert self.iterate(None) == self.n_frames + 1  # +1 for EOF call
+
+    def test_loop(self):
+        frame_size = sys.getsizeof("0000" * 250)
+        # The first 10 frames stay cached; The rest are re-rendered on every loop
+        assert (
+            self.iterate(frame_size * 10)
+            == self.n_frames + 1 + (self.n_frames - 10) * 2
+        )
+        # Nothing fits
+        assert self.iterate(frame_size - 1) == self.n_frames * 3 + 1
+
+    def test_lru(self):
+        frame_size = sys.getsizeof("0000" * 250)
+        # Every frame is evicted before it's required again
+        assert self.iterate(frame_size * 5, policy="lru") == self.n_frames * 3 + 1
+        assert self.iterate(frame_size * self.n_frames, policy="lru") == (
+            self.n_frames + 1
+        )
+
+    def test_compress(self):
+        frame_size = sys.getsizeof("0000" * 250)
+        # Compressed frames are much smaller
+        assert self.iterate(frame_size * 5, compress=1) == self.n_frames + 1
+
+
+def test_lookahead():
+    frames = [*ImageIterator(webp_image, 2, "1.1", cached=False)]
+    try:
+        ImageIterator.LOOKAHEAD = 3
+        for cached in (False, True):
+            image_it = ImageIterator(webp_image, 2, "1.1", cached=cached)
+            assert [*image_it] == frames
+            assert not hasattr(image_it, "_lookahead")  # Closed
+
+        # Rendered on worker threads
+        threads = set()
+        render_image = webp_image._render_image
+
+        def render(*args, **kwargs):
+            threads.add(current_thread().name)
+            return render_image(*args, **kwargs)
+
+        webp_image._render_image = render
+        try:
+            image_it = ImageIterator(webp_image, 1, "1.1", cached=False)
+            next(image_it)
+            next(image_it)
+            lookahead = image_it._lookahead
+            assert sorted(lookahead._pending) == [2, 3, 4]
+        finally:
+            del webp_image._render_image
+        assert any(name.startswith("term_image-lookahead") for name in threads)
+
+        # Seek
+        image_it.seek(10)
+        assert next(image_it) == frames[10]
+        assert sorted(lookahead._pending) == [11, 12, 13]
+        assert next(image_it) == frames[11]
+        image_it.seek(0)
+        assert next(image_it) == frames[0]
+        assert next(image_it) == frames[1]
+
+        # Change in size
+        webp_image._size = (20, 10)
+        resized_frame = next(image_it)
+        assert resized_frame != frames[2]
+        assert resized_frame.count("\n") + 1 == 10
+        image_it.close()
+    finally:
+        ImageIterator.LOOKAHEAD = 0
+        webp_image._size = _size
+
+
 def test_sizing():
     def test(image_it):
         for value in Size:
@@ -407,6 +512,6 @@ class TestSeek:
         next(image_it) and next(image_it)
         cache = image_it._animator.gi_frame.f_locals["cache"]
 
-        assert frame_1 == next(image_it) is cache[1][0]
+        assert frame_1 == next(image_it) is cache._frames[1][0]
         image_it.seek(6)
-        assert frame_6 == next(image_it) is cache[6][0]
+        assert frame_6 == next(image_it) is cache._frames[6][0]
@@ -10,6 +10,7 @@ from PIL import Image
 from PIL.GifImagePlugin import GifImageFile
 from PIL.PngImagePlugin import PngImageFile
 
+from term_image import utils
 from term_image.exceptions import ITerm2ImageError, TermImageWarning
 from term_image.image.iterm2 import LINES, START, WHOLE, ITerm2Image
 from term_image.utils import CSI, ST
@@ -905,3 +906,54 @@ supported_terminals = {"iterm2", "wezterm", "konsole"}
 erase = f"{CSI}{{cols}}X"
 jump_right = f"{CSI}{{cols}}C"
 fill_fmt = f"{CSI}{{cols}}X{jump_right}"
+
+
+@pytest.fixture
+def capabilities(monkeypatch):
+    monkeypatch.setattr(utils, "_capability_cache_path", None)
+    saved = utils._capabilities.copy()
+    utils._capabilities.clear()
+    yield
+    utils._capabilities.clear()
+    utils._capabilities.update(saved)
+
+
+def test_auto_tune(monkeypatch, capabilities):
+    image = ITerm2Image(python_img, width=_size)
+    series = image._get_tuning_candidates(False)
+    assert [candidates[0][0]["method"] for candidates in series] == [LINES, WHOLE]
+    for candidates in series:
+        # In order of increasing encoding effort
+        assert [
+            (style_args["compress"], attrs["JPEG_QUALITY"])
+            for style_args, attrs in candidates
+        ] == [(0, -1), (1, -1), (4, -1), (9, -1), (4, 90), (4, 75)]
+    assert [
+        candidates[0][0]["method"] for candidates in image._get_tuning_candidates(True)
+    ] == [WHOLE]
+
+    TERM = ITerm2Image._TERM
+    try:
+        ITerm2Image._TERM = "konsole"
+        assert [
+            candidates[0][0]["method"]
+            for candidates in image._get_tuning_candidates(False)
+        ] == [WHOLE]
+    finally:
+        ITerm2Image._TERM = TERM
+
+    # JPEG is selected when cheapest; applies to the instance only
+    def measure(img, alpha, attrs, *, frame, **style_args):
+        assert image.JPEG_QUALITY == ITerm2Image.JPEG_QUALITY
+        if img is not image._source:
+            img.close()
+        if attrs["JPEG_QUALITY"] == -1:
+            # Decreasing cost with compression
+            sizes = {0: 4 * 10**6, 1: 3 * 10**6, 4: 2 * 10**6, 9: 15 * 10**5}
+            return (0.1, sizes[style_args["compress"]])
+        return (0.01, 10**5) if attrs["JPEG_QUALITY"] == 75 else (0.05, 5 * 10**5)
+
+    monkeypatch.setattr(image, "_measure_render", measure)
+    assert image.auto_tune(None) == {"compress": 4}
+    assert image.JPEG_QUALITY == 75
+    assert ITerm2Image.JPEG_QUALITY == -1
@@ -1,18 +1,46 @@
 """KittyImage-specific tests"""
 
 import io
+import json
+import os
+import sys
 from base64 import standard_b64decode
+from operator import mul
 from random import random
-from zlib import decompress
+from zlib import compress, decompress
 
 import pytest
+from PIL import Image
 
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+from term_image import utils
 from term_image.exceptions import KittyImageError
-from term_image.image.kitty import LINES, START, WHOLE, KittyImage
-from term_image.utils import CSI, ST
+from term_image.image import GraphicsImage, common as image_common
+from term_image.image.kitty import (
+    _COMPRESS_BLOCK_SIZE,
+    LINES,
+    START,
+    WHOLE,
+    ControlData,
+    KittyImage,
+    Transmission,
+    _compress,
+    _discard_local_objects,
+    _local_objects,
+    _StoredImages,
+    t,
+)
+from term_image.utils import CSI, ST, get_terminal_name_version
 
 from . import common, set_fg_bg_colors
 from .common import _size, get_actual_render_size, python_img, setup_common
+from .test_base import clear_stdout, stdout
+
+KittyImage.READ_FROM_FILE = False
 
 for name, obj in vars(common).items():
     if name.endswith(("_All", "_Graphics")):
@@ -79,6 +107,8 @@ def test_style_format_spec():
         "c-1",
         "c10",
         "c4m1",
+        "i2",
+        "i1c1",
         " z1",
         "m0 ",
         "  z1c1  ",
@@ -101,7 +131,14 @@ def test_style_format_spec():
         ("c4", {}),
         ("c0", {"compress": 0}),
         ("c9", {"compress": 9}),
+        ("N", {"native": True}),
+        ("i0", {}),
+        ("i1", {"reuse": True}),
         ("Wz1m1c9", {"method": WHOLE, "z_index": 1, "mix": True, "compress": 9}),
+        (
+            "Wz1m1c9i1",
+            {"method": WHOLE, "z_index": 1, "mix": True, "compress": 9, "reuse": True},
+        ),
     ):
         assert KittyImage._check_style_format_spec(spec, spec) == args
 
@@ -162,6 +199,40 @@ class TestStyleArgs:
                     == {"compress": value}  # fmt: skip
                 )
 
+    def test_local(self):
+        for value in (0, 1.0, (), [], "2"):
+            with pytest.raises(TypeError):
+                KittyImage._check_style_args({"local": value})
+
+        assert KittyImage._check_style_args({"local": False}) == {}
+        assert KittyImage._check_style_args({"local": True}) == {"local": True}
+
+    def test_native(self):
+        for value in (0, 1.0, (), [], "2"):
+            with pytest.raises(TypeError):
+                KittyImage._check_style_args({"native": value})
+
+        assert KittyImage._check_style_args({"native": False}) == {}
+        assert KittyImage._check_style_args({"native": True}) == {"native": True}
+
+    def test_stall_native(self):
+        for value in (0, 1.0, (), [], "2"):
+            with pytest.raises(TypeError):
+                KittyImage._check_style_args({"stall_native": value})
+
+        assert KittyImage._check_style_args({"stall_native": True}) == {}
+        assert KittyImage._check_style_args({"stall_native": False}) == {
+            "stall_native": False
+        }
+
+    def test_reuse(self):
+        for value in (0, 1.0, (), [], "2"):
+            with pytest.raises(TypeError):
+                KittyImage._check_style_args({"reuse": value})
+
+        assert KittyImage._check_style_args({"reuse": False}) == {}
+        assert KittyImage._check_style_args({"reuse": True}) == {"reuse": True}
+
 
 def expand_control_data(control_data):
     control_data = control_data.split(",")
@@ -230,6 +301,75 @@ def decode_image(data):
     return control_codes, raw_image, fill
 
 
+class TestTransmission:
+    def test_chunks(self):
+        data = os.urandom(3072 * 3)
+        for size in (0, 1, 3071, 3072, 3073, 3072 * 2, 3072 * 3):
+            transmission = Transmission(ControlData(s=1, v=1), data[:size], 0)
+            chunks = list(transmission.get_chunks())
+            assert all(isinstance(chunk, bytes) for chunk in chunks)
+            assert len(chunks) == max(1, -(-size // 3072))
+            assert b"".join(chunks).decode() == transmission.get_chunked()
+
+            control_codes, raw_image, fill = decode_image(transmission.get_chunked())
+            assert ("s", "1") in control_codes and ("v", "1") in control_codes
+            assert raw_image == data[:size]
+            assert fill == ""
+
+    def test_size(self):
+        data = os.urandom(1000)
+        transmission = Transmission(ControlData(), data, 0)
+        chunks = list(transmission.get_chunks(size=400))
+        assert len(chunks) == 4  # 300 bytes per chunk
+        for chunk in chunks:
+            assert len(chunk.partition(b";")[2]) <= 400 + len(ST)
+
+        transmission = Transmission(ControlData(), data, 4)
+        assert decode_image(transmission.get_chunked())[1] == data
+
+    def test_compress_blocks(self):
+        # Compressible, larger than a block and not a multiple of the block size
+        data = bytes(range(256)) * 4000 + os.urandom(1000)
+        assert len(data) > _COMPRESS_BLOCK_SIZE * 3
+        threads = GraphicsImage.ENCODER_THREADS
+        try:
+            GraphicsImage.ENCODER_THREADS = 1
+            compressed = _compress(data, 4)
+            for GraphicsImage.ENCODER_THREADS in (2, 4):
+                assert _compress(data, 4) == compressed
+        finally:
+            GraphicsImage.ENCODER_THREADS = threads
+        assert decompress(compressed) == data
+        # Primed with the preceding data; Only a small overhead per block
+        n_blocks = -(-len(data) // _COMPRESS_BLOCK_SIZE)
+        assert len(compressed) < len(compress(data, 4)) + 32 * n_blocks
+
+        small = data[:1000]
+        assert _compress(small, 4) == compress(small, 4)
+
+
+def decode_lines(render, delete=""):
+    # Transmission control codes, image data and placement control codes and fill
+    # of every line
+    placements = []
+    for n, line in enumerate(render.split("\n")):
+        assert line.startswith(delete)
+        head, start, tail = line[len(delete) :].rpartition(START)
+        assert start == START
+        placement, end, fill = tail.partition(ST)
+        assert end == ST
+        control_data, payload = placement.split(";")
+        assert payload == ""
+        placements.append((expand_control_data(control_data), fill))
+        if n:
+            assert head == ""
+        else:
+            control_codes, raw_image, empty = decode_image(head)
+            assert empty == ""
+
+    return control_codes, raw_image, placements
+
+
 class TestRenderLines:
     # Fully transparent image
     # It's easy to predict it's pixel values
@@ -245,34 +385,49 @@ class TestRenderLines:
     def _test_image_size(self, image):
         w, h = get_actual_render_size(image)
         cols, lines = image.rendered_size
-        bytes_per_line = w * (h // lines) * 4
-        size_control_data = f"s={w},v={h // lines},c={cols},r=1"
+        cell_height = h // lines
         render = str(image)
 
         assert render.count("\n") + 1 == lines
-        for line in render.splitlines():
-            control_codes, raw_image, fill = decode_image(line)
-            assert (
-                code in control_codes for code in expand_control_data(size_control_data)
-            )
-            assert len(raw_image) == bytes_per_line
+        control_codes, raw_image, placements = decode_lines(render)
+        assert {("a", "t"), ("s", f"{w}"), ("v", f"{h}")} <= control_codes
+        assert len(raw_image) == w * h * 4
+        for line, (place_codes, fill) in enumerate(placements):
+            assert {
+                ("a", "p"),
+                ("x", "0"),
+                ("y", f"{line * cell_height}"),
+                ("w", f"{w}"),
+                ("h", f"{cell_height}"),
+                ("c", f"{cols}"),
+                ("r", "1"),
+            } <= place_codes
             assert fill == fill_fmt.format(cols=cols)
 
     def test_transmission(self):
         # Not chunked (image data is entirely contiguous, so it's highly compressed)
         # Size is tested in `test_size()`
         self.trans.scale = 1.0
-        for line in self.render_image().splitlines():
-            decode_image(line)
+        control_codes, _, placements = decode_lines(self.render_image())
+        assert {("q", "2"), ("C", "1")} <= placements[0][0]
+        assert not any(key in {"c", "r", "z", "C", "i"} for key, _ in control_codes)
+        # Transmitted under an image number; placements refer to the newest image
+        number = dict(control_codes)["I"]
+        assert int(number) > 0
+        assert all(("I", number) in place_codes for place_codes, _ in placements)
 
         # Chunked (image data is very sparse, so it's still large after compression)
         hori = KittyImage.from_file("tests/images/hori.jpg")
         hori.height = _size
         hori.set_render_method(LINES)
         w, h = get_actual_render_size(hori)
-        bytes_per_line = w * (h // self.trans.height) * 3
-        for line in str(hori).splitlines():
-            assert len(decode_image(line)[1]) == bytes_per_line
+        render = str(hori)
+        assert render.partition("\n")[0].count(START) > 2
+        assert len(decode_lines(render)[1]) == w * h * 3
+
+        # Derived from the image data; differs across images but not renders
+        assert render == str(hori)
+        assert dict(decode_lines(render)[0])["I"] != number
 
     def test_minimal_render_size(self):
         image = KittyImage.from_file("tests/images/trans.png")
@@ -303,29 +458,27 @@ class TestRenderLines:
     def test_image_data_and_transparency(self):
         self.trans.scale = 1.0
         w, h = get_actual_render_size(self.trans)
-        pixels_per_line = w * (h // _size)
+        pixels = w * h
 
         # Transparency enabled
         render = self.render_image()
         assert render == str(self.trans) == f"{self.trans:1.1}"
-        for line in render.splitlines():
-            control_codes, raw_image, _ = decode_image(line)
-            assert ("f", "32") in control_codes
-            assert len(raw_image) == pixels_per_line * 4
-            assert raw_image.count(b"\0" * 4) == pixels_per_line
+        control_codes, raw_image, _ = decode_lines(render)
+        assert ("f", "32") in control_codes
+        assert len(raw_image) == pixels * 4
+        assert raw_image.count(b"\0" * 4) == pixels
         # Transparency disabled
         render = self.render_image(None)
         assert render == f"{self.trans:1.1#}"
-        for line in render.splitlines():
-            control_codes, raw_image, _ = decode_image(line)
-            assert ("f", "24") in control_codes
-            assert len(raw_image) == pixels_per_line * 3
-            assert raw_image.count(b"\0\0\0") == pixels_per_line
+        control_codes, raw_image, _ = decode_lines(render)
+        assert ("f", "24") in control_codes
+        assert len(raw_image) == pixels * 3
+        assert raw_image.count(b"\0\0\0") == pixels
 
     def test_image_data_and_background_colour(self):
         self.trans.scale = 1.0
         w, h = get_actual_render_size(self.trans)
-        pixels_per_line = w * (h // _size)
+        pixels = w * h
 
         # Terminal BG
         for bg in ((0,) * 3, (100,) * 3, (255,) * 3, None):
@@ -333,44 +486,24 @@ class TestRenderLines:
             pixel_bytes = bytes(bg or (0, 0, 0))
             render = self.render_image("#")
             assert render == f"{self.trans:1.1##}"
-            for line in render.splitlines():
-                control_codes, raw_image, _ = decode_image(line)
-                assert ("f", "24") in control_codes
-                assert len(raw_image) == pixels_per_line * 3
-                assert raw_image.count(pixel_bytes) == pixels_per_line
-        set_fg_bg_colors((0, 0, 0), (0, 0, 0))
-        # red
-        render = self.render_image("#ff0000")
-        assert render == f"{self.trans:1.1#ff0000}"
-        for line in render.splitlines():
-            control_codes, raw_image, _ = decode_image(line)
-            assert ("f", "24") in control_codes
-            assert len(raw_image) == pixels_per_line * 3
-            assert raw_image.count(b"\xff\0\0") == pixels_per_line
-        # green
-        render = self.render_image("#00ff00")
-        assert render == f"{self.trans:1.1#00ff00}"
-        for line in render.splitlines():
-            control_codes, raw_image, _ = decode_image(line)
+            control_codes, raw_image, _ = decode_lines(render)
             assert ("f", "24") in control_codes
-            assert len(raw_image) == pixels_per_line * 3
-            assert raw_image.count(b"\0\xff\0") == pixels_per_line
-        # blue
-        render = self.render_image("#0000ff")
-        assert render == f"{self.trans:1.1#0000ff}"
-        for line in render.splitlines():
-            control_codes, raw_image, _ = decode_image(line)
-            assert ("f", "24") in control_codes
-            assert len(raw_image) == pixels_per_line * 3
-            assert raw_image.count(b"\0\0\xff") == pixels_per_line
-        # white
-        render = self.render_image("#ffffff")
-        assert render == f"{self.trans:1.1#ffffff}"
-        for line in render.splitlines():
-            control_codes, raw_image, _ = decode_image(line)
+            assert len(raw_image) == pixels * 3
+            assert raw_image.count(pixel_bytes) == pixels
+        set_fg_bg_colors((0, 0, 0), (0, 0, 0))
+
+        for colour, pixel_bytes in (
+            ("#ff0000", b"\xff\0\0"),
+            ("#00ff00", b"\0\xff\0"),
+            ("#0000ff", b"\0\0\xff"),
+            ("#ffffff", b"\xff" * 3),
+        ):
+            render = self.render_image(colour)
+            assert render == f"{self.trans:1.1{colour}}"
+            control_codes, raw_image, _ = decode_lines(render)
             assert ("f", "24") in control_codes
-            assert len(raw_image) == pixels_per_line * 3
-            assert raw_image.count(b"\xff" * 3) == pixels_per_line
+            assert len(raw_image) == pixels * 3
+            assert raw_image.count(pixel_bytes) == pixels
 
     def test_z_index(self):
         self.trans.scale = 1.0
@@ -378,23 +511,23 @@ class TestRenderLines:
         # z_index = 0  (default)
         render = self.render_image()
         assert render == str(self.trans) == f"{self.trans:1.1+z0}"
-        for line in render.splitlines():
-            assert ("z", "0") in decode_image(line)[0]
+        control_codes, _, placements = decode_lines(render)
+        assert all(key != "z" for key, _ in control_codes)
+        for place_codes, _ in placements:
+            assert ("z", "0") in place_codes
 
         # z_index = <int32_t>
         for value in (1, -1, -(2**31), 2**31 - 1):
             render = self.render_image(None, z=value)
             assert render == f"{self.trans:1.1#+z{value}}"
-            for line in render.splitlines():
-                assert ("z", f"{value}") in decode_image(line)[0]
+            for place_codes, _ in decode_lines(render)[2]:
+                assert ("z", f"{value}") in place_codes
 
         # z_index = None
         render = self.render_image(None, z=None)
         assert render == f"{self.trans:1.1#+z}"
-        for line in render.splitlines():
-            assert line.startswith(delete)
-            control_codes = decode_image(line.partition(delete)[2])[0]
-            assert all(key != "z" for key, value in control_codes)
+        for place_codes, _ in decode_lines(render, delete)[2]:
+            assert all(key != "z" for key, _ in place_codes)
 
     def test_mix(self):
         self.trans.scale = 1.0
@@ -402,15 +535,13 @@ class TestRenderLines:
         # mix = False (default)
         render = self.render_image()
         assert render == str(self.trans) == f"{self.trans:1.1+m0}"
-        for line in render.splitlines():
-            fill = decode_image(line)[2]
+        for _, fill in decode_lines(render)[2]:
             assert fill == fill_fmt.format(cols=self.trans.rendered_width)
 
         # mix = True
         render = self.render_image(None, m=True)
         assert render == f"{self.trans:1.1#+m1}"
-        for line in render.splitlines():
-            fill = decode_image(line)[2]
+        for _, fill in decode_lines(render)[2]:
             assert fill == jump_right.format(cols=self.trans.rendered_width)
 
     def test_compress(self):
@@ -419,21 +550,18 @@ class TestRenderLines:
         # compress = 4  (default)
         render = self.render_image()
         assert render == str(self.trans) == f"{self.trans:1.1+c4}"
-        for line in render.splitlines():
-            assert ("o", "z") in decode_image(line)[0]
+        assert ("o", "z") in decode_lines(render)[0]
 
         # compress = 0
         render = self.render_image(None, c=0)
         assert render == f"{self.trans:1.1#+c0}"
-        for line in render.splitlines():
-            assert all(key != "o" for key, value in decode_image(line)[0])
+        assert all(key != "o" for key, _ in decode_lines(render)[0])
 
         # compress = {1-9}
         for value in range(1, 10):
             render = self.render_image(None, c=value)
             assert render == f"{self.trans:1.1#+c{value}}"
-            for line in render.splitlines():
-                assert ("o", "z") in decode_image(line)[0]
+            assert ("o", "z") in decode_lines(render)[0]
 
         # Image data size relativity
         assert (
@@ -457,6 +585,31 @@ class TestRenderLines:
                 continue
             self._test_image_size(self.trans)
 
+    def test_konsole(self):
+        # Every line is a separate image
+        self.trans.scale = 1.0
+        w, h = get_actual_render_size(self.trans)
+        cols, lines = self.trans.rendered_size
+        TERM = KittyImage._TERM
+        KittyImage._TERM = "konsole"
+        try:
+            render = self.render_image()
+        finally:
+            KittyImage._TERM = TERM
+
+        assert render.count("\n") + 1 == lines
+        for line in render.splitlines():
+            control_codes, raw_image, fill = decode_image(line)
+            assert {
+                ("a", "T"),
+                ("s", f"{w}"),
+                ("v", f"{h // lines}"),
+                ("c", f"{cols}"),
+                ("r", "1"),
+            } <= control_codes
+            assert len(raw_image) == w * (h // lines) * 4
+            assert fill == fill_fmt.format(cols=cols)
+
 
 class TestRenderWhole:
     # Fully transparent image
@@ -664,6 +817,663 @@ class TestRenderWhole:
             self._test_image_size(self.trans)
 
 
+def test_read_from_file():
+    png_file = open("tests/images/trans.png", "rb").read()
+    png_image = KittyImage.from_file("tests/images/trans.png")
+    jpeg_image = KittyImage.from_file("tests/images/vert.jpg")
+    try:
+        KittyImage.READ_FROM_FILE = True
+        KittyImage._TERM = ""
+
+        for image in (png_image, jpeg_image):
+            lines_for_original_height = KittyImage._pixels_lines(
+                pixels=image.original_size[1]
+            )
+            image.set_render_method(WHOLE)
+
+            # Will be downscaled
+            image.height = lines_for_original_height // 2
+            control_codes, raw_image, _ = decode_image(str(image))
+            assert ("f", "100") not in control_codes
+            assert len(raw_image) == mul(*get_actual_render_size(image)) * (
+                3 + (image is png_image)
+            )
+
+            # Will not be downscaled
+            image.height = lines_for_original_height * 2
+            control_codes, raw_image, _ = decode_image(str(image))
+            assert ("f", "100") in control_codes
+            assert ("o", "z") not in control_codes
+            assert not {"s", "v"} & {key for key, _ in control_codes}
+            if image is png_image:
+                # manipulation is not required since the alpha threshold is unused
+                assert raw_image == png_file
+            else:
+                # Re-encoded once
+                assert raw_image == image._png_cache[1]
+                png_cache = image._png_cache
+                str(image)
+                assert image._png_cache is png_cache
+            with Image.open(io.BytesIO(raw_image)) as img:
+                assert img.size == image.original_size
+
+        # manipulation is required since the mode is RGBA
+        control_codes, raw_image, _ = decode_image(f"{png_image:1.1#}")
+        assert ("f", "100") in control_codes
+        assert raw_image != png_file
+        with Image.open(io.BytesIO(raw_image)) as img:
+            assert img.mode == "RGB"
+            assert img.size == png_image.original_size
+
+        # LINES; Re-encoded, since the height is adjusted
+        jpeg_image.set_render_method(LINES)
+        control_codes, raw_image, placements = decode_lines(str(jpeg_image))
+        assert ("f", "100") in control_codes
+        w, h = get_actual_render_size(jpeg_image)
+        with Image.open(io.BytesIO(raw_image)) as img:
+            assert img.size == (w, h)
+        cell_height = h // jpeg_image.rendered_height
+        for n, (control_codes, _) in enumerate(placements):
+            assert ("y", str(n * cell_height)) in control_codes
+            assert ("h", str(cell_height)) in control_codes
+
+        # Konsole can't crop placements of a PNG image
+        KittyImage._TERM = "konsole"
+        assert f"{START}a=T,f=100," not in str(jpeg_image)
+        jpeg_image.set_render_method(WHOLE)
+        assert decode_image(str(jpeg_image))[0] >= {("f", "100")}
+
+        # Disabled
+        KittyImage._TERM = ""
+        KittyImage.READ_FROM_FILE = False
+        control_codes, raw_image, _ = decode_image(str(png_image))
+        assert ("f", "100") not in control_codes
+        assert len(raw_image) == mul(*png_image.original_size) * 4
+    finally:
+        KittyImage.READ_FROM_FILE = False
+        KittyImage._TERM = ""
+
+
+class TestReuse:
+    image = KittyImage.from_file("tests/images/vert.jpg")
+    image.height = _size
+
+    def render_image(self, method, alpha=0.0, **style):
+        return self.image._renderer(
+            self.image._render_image, alpha, method=method, reuse=True, **style
+        )
+
+    def _split(self, line):
+        # transmission, placement, fill
+        transmission, _, place = line.rpartition(START)
+        place, end, fill = place.partition(ST)
+        assert end == ST
+
+        return transmission, expand_control_data(place.partition(";")[0]), fill
+
+    def _test_line(self, line, cols, rows):
+        transmission, place_codes, fill = self._split(line)
+        control_codes = decode_image(transmission)[0]
+        assert ("a", "t") in control_codes
+        assert ("q", "2") in control_codes
+        assert not any(key in {"c", "r", "z", "C"} for key, _ in control_codes)
+        image_id = dict(control_codes)["i"]
+        assert int(image_id) > 0
+        assert place_codes == expand_control_data(
+            f"a=p,i={image_id},c={cols},r={rows},z=0,C=1,q=2"
+        )
+        assert fill == fill_fmt.format(cols=cols)
+
+        return image_id
+
+    def test_lines(self):
+        w, h = get_actual_render_size(self.image)
+        cols, lines = self.image.rendered_size
+        render = self.render_image(LINES)
+        assert render == f"{self.image:1.1+Li1}"
+        assert render.count("\n") + 1 == lines
+        control_codes, _, placements = decode_lines(render)
+        assert {("a", "t"), ("q", "2"), ("s", f"{w}"), ("v", f"{h}")} <= control_codes
+        assert not any(key in {"c", "r", "z", "C", "I"} for key, _ in control_codes)
+        image_id = dict(control_codes)["i"]
+        assert int(image_id) > 0
+        for line, (place_codes, fill) in enumerate(placements):
+            assert place_codes == expand_control_data(
+                f"a=p,i={image_id},x=0,y={line * (h // lines)},w={w},h={h // lines},"
+                f"c={cols},r=1,z=0,C=1,q=2"
+            )
+            assert fill == fill_fmt.format(cols=cols)
+
+        # Derived from the image data; differs across images but not renders
+        assert render == self.render_image(LINES)
+        hori = KittyImage.from_file("tests/images/hori.jpg", height=_size)
+        assert f"i={image_id}," not in f"{hori:1.1+Li1}"
+
+    def test_whole(self):
+        cols, lines = self.image.rendered_size
+        render = self.render_image(WHOLE)
+        assert render == f"{self.image:1.1+Wi1}"
+        assert render.count("\n") + 1 == lines
+        image_id = self._test_line(render.partition("\n")[0], cols, lines)
+
+        # Same image data, regardless of other style args
+        assert f"a=p,i={image_id}," in self.render_image(WHOLE, z_index=1, compress=9)
+        assert f"a=p,i={image_id}," in self.render_image(LINES)
+
+    def test_z_index(self):
+        # Held images are not freed along with their placements
+        delete = f"{START}a=d,d=c;{ST}"
+        render = self.render_image(WHOLE, z_index=None)
+        assert render.startswith(delete)
+        place_codes = self._split(render.partition("\n")[0])[1]
+        assert not any(key == "z" for key, _ in place_codes)
+        for place_codes, _ in decode_lines(
+            self.render_image(LINES, z_index=None), delete
+        )[2]:
+            assert not any(key == "z" for key, _ in place_codes)
+
+    def test_frame(self):
+        anim = KittyImage.from_file("tests/images/anim.webp")
+        anim.height = _size
+        render = anim._renderer(
+            lambda img: anim._render_image(img, 0.0, frame=True, reuse=True)
+        )
+        # Transmitted under an image number, not an ID
+        control_codes, _, placements = decode_lines(render)
+        assert "I" in dict(control_codes)
+        assert not any(key == "i" for key, _ in control_codes)
+        assert not any(key == "i" for codes, _ in placements for key, _ in codes)
+
+        render = anim._renderer(
+            lambda img: anim._render_image(
+                img, 0.0, frame=True, method=WHOLE, reuse=True
+            )
+        )
+        assert "a=p" not in render
+        assert ("a", "T") in decode_image(render.partition("\n")[0])[0]
+
+    def test_stored_images(self):
+        stored_images = _StoredImages()
+        lines = self.render_image(LINES)
+        whole = self.render_image(WHOLE)
+
+        # Not held
+        assert stored_images.filter(lines) == lines
+        assert _StoredImages().filter(whole.encode()) == whole.encode()
+
+        # Held
+        for render in (lines, whole):
+            output = stored_images.filter(render)
+            assert "a=t" not in output
+            assert output.count("a=p") == render.count("a=p")
+            assert output == "".join(
+                line[line.find(f"{START}a=p") :] if START in line else line
+                for line in render.splitlines(keepends=True)
+            )
+        assert (
+            stored_images.filter(lines.encode()) == stored_images.filter(lines).encode()
+        )
+
+        # Non-reuse renders
+        render = str(self.image)
+        assert stored_images.filter(render) is render
+
+    def test_eviction(self):
+        stored_images = _StoredImages()
+        renders = []
+        ids = []
+        sizes = []
+        for height in (_size, _size - 2, _size - 4):  # decreasing data size
+            self.image.height = height
+            renders.append(self.render_image(WHOLE))
+            ids.append(dict(decode_image(self._split(renders[-1])[0])[0])["i"])
+            w, h = get_actual_render_size(self.image)
+            sizes.append(w * h * 3)
+        self.image.height = _size
+
+        REUSE_MAXSIZE = KittyImage.REUSE_MAXSIZE
+        KittyImage.REUSE_MAXSIZE = sizes[0] + sizes[1]
+        try:
+            for render in renders[:2]:
+                assert "a=d" not in stored_images.filter(render)
+            stored_images.filter(renders[0])  # Used more recently than the second
+            output = stored_images.filter(renders[2])
+            assert output.startswith(f"{START}a=d,d=I,i={ids[1]},q=2;{ST}")
+            assert "a=t" not in stored_images.filter(renders[0])
+            assert "a=t" in stored_images.filter(renders[1])  # Re-transmitted
+        finally:
+            KittyImage.REUSE_MAXSIZE = REUSE_MAXSIZE
+
+    @pytest.mark.parametrize("method", [LINES, WHOLE])
+    def test_png(self, method):
+        image = KittyImage.from_file("tests/images/trans.png")
+        image.height = KittyImage._pixels_lines(pixels=image.original_size[1]) * 2
+        stored_images = _StoredImages()
+        KittyImage.READ_FROM_FILE = True
+        try:
+            render = image._renderer(
+                image._render_image, 0.0, method=method, reuse=True
+            )
+            assert f"{START}a=t,f=100," in render
+            output = stored_images.filter(render)
+            assert "a=t" in output
+            assert "a=t" not in stored_images.filter(render)
+            assert "a=t" not in stored_images.filter(render.encode()).decode()
+            # Sized by the decoded pixel data
+            transmission = render[: render.index(f"{START}a=p")]
+            raw_image = decode_image(transmission)[1]
+            with Image.open(io.BytesIO(raw_image)) as img:
+                assert stored_images._size == mul(*img.size) * 4
+        finally:
+            KittyImage.READ_FROM_FILE = False
+
+
+class TestLocal:
+    anim = KittyImage.from_file("tests/images/anim.webp")
+    anim.height = _size
+
+    def render_frame(self, medium, method, local=True):
+        local_medium = KittyImage._local_medium
+        KittyImage._local_medium = medium
+        try:
+            return self.anim._renderer(
+                lambda img: self.anim._render_image(
+                    img, 0.0, frame=True, method=method, local=local
+                )
+            )
+        finally:
+            KittyImage._local_medium = local_medium
+
+    def _test_frame(self, medium, method):
+        w, h = get_actual_render_size(self.anim)
+        lines = self.anim.rendered_height
+        render = self.render_frame(medium, method)
+        try:
+            transmissions = [
+                line.partition(START)[2].partition(ST)[0]
+                for line in render.splitlines()
+                if line.startswith((f"{START}a=T", f"{START}a=t"))
+            ]
+            # Every line is a separate image on Konsole
+            assert len(transmissions) == (
+                lines if method == LINES and KittyImage._TERM == "konsole" else 1
+            )
+            assert len(_local_objects) == len(transmissions)
+
+            size = w * h * 4 // len(transmissions)
+            names = []
+            for transmission in transmissions:
+                control_data, payload = transmission.split(";")
+                control_codes = expand_control_data(control_data)
+                assert ("t", medium) in control_codes
+                assert ("S", f"{size}") in control_codes
+                assert all(key != "o" for key, _ in control_codes)
+                name = standard_b64decode(payload).decode()
+                names.append(name)
+                if medium == t.SHARED:
+                    shm = shared_memory.SharedMemory(name.lstrip("/"))
+                    try:
+                        assert shm.size >= size
+                    finally:
+                        shm.close()
+                else:
+                    assert "tty-graphics-protocol" in name
+                    assert os.path.getsize(name) == size
+        finally:
+            _discard_local_objects()
+
+        assert not _local_objects
+        for name in names:
+            if medium == t.SHARED:
+                with pytest.raises(FileNotFoundError):
+                    shared_memory.SharedMemory(name.lstrip("/"))
+            else:
+                assert not os.path.exists(name)
+
+    def _test_medium(self, medium):
+        TERM = KittyImage._TERM
+        try:
+            for KittyImage._TERM in ("kitty", "konsole"):
+                for method in (LINES, WHOLE):
+                    self._test_frame(medium, method)
+        finally:
+            KittyImage._TERM = TERM
+
+    @pytest.mark.skipif(not shared_memory, reason="Shared memory is unavailable")
+    def test_shared(self):
+        self._test_medium(t.SHARED)
+
+    def test_temp(self):
+        self._test_medium(t.TEMP)
+
+    def test_direct(self):
+        # Unsupported by the terminal
+        render = self.render_frame(t.DIRECT, WHOLE)
+        assert ("t", "d") in decode_image(render)[0]
+        assert not _local_objects
+
+        # Not a frame
+        local_medium = KittyImage._local_medium
+        KittyImage._local_medium = t.TEMP
+        try:
+            render = self.anim._renderer(
+                lambda img: self.anim._render_image(img, 0.0, local=True)
+            )
+        finally:
+            KittyImage._local_medium = local_medium
+        assert ("t", "d") in decode_lines(render)[0]
+        assert not _local_objects
+
+
+class TestNativeAnim:
+    images = [
+        KittyImage.from_file(f"tests/images/{name}", height=_size)
+        for name in ("lion.gif", "anim.webp", "elephant.png")
+    ]
+
+    def render_native(self, image, alpha=0.0, **style):
+        return image._renderer(image._render_image, alpha, native=True, **style)
+
+    def get_commands(self, render):
+        # Transmissions (with chunks joined) and other commands
+        commands = []
+        for command in render.split(START)[1:]:
+            command, end, _ = command.partition(ST)
+            assert end == ST
+            control_data, payload = command.split(";")
+            control_codes = dict(expand_control_data(control_data))
+            if "a" in control_codes or not commands:
+                commands.append((control_codes, payload))
+            else:
+                commands[-1] = (commands[-1][0], commands[-1][1] + payload)
+
+        return [
+            (
+                control_codes,
+                payload
+                and (
+                    decompress(standard_b64decode(payload))
+                    if "o" in control_codes
+                    else standard_b64decode(payload)
+                ),
+            )
+            for control_codes, payload in commands
+        ]
+
+    def get_frames(self, image, alpha=0.0):
+        size = get_actual_render_size(image)
+        frames = []
+        img = image._get_image()
+        try:
+            for n in range(image.n_frames):
+                image._seek_position = n
+                frame = image._get_render_data(
+                    img, alpha, size=size, pixel_data=False, frame=True
+                )[0]
+                data = (frame.mode, frame.tobytes())
+                if frame is not img:
+                    frame.close()
+                if not frames or data != frames[-1]:
+                    frames.append(data)
+        finally:
+            image._seek_position = 0
+            img.close()
+
+        return frames
+
+    def test_frames(self):
+        for image in self.images:
+            w, h = get_actual_render_size(image)
+            cols, lines = image.rendered_size
+            commands = self.get_commands(self.render_native(image))
+            (first_codes, first_data), *frame_commands = commands[:-2]
+
+            assert first_codes["a"] == "T"
+            assert (first_codes["s"], first_codes["v"]) == (f"{w}", f"{h}")
+            assert (first_codes["c"], first_codes["r"]) == (f"{cols}", f"{lines}")
+            assert first_codes["q"] == "2"
+            image_id = first_codes["i"]
+            mode = "RGBA" if first_codes["f"] == "32" else "RGB"
+            composed = [Image.frombytes(mode, (w, h), first_data)]
+
+            for n, (control_codes, data) in enumerate(frame_commands, 2):
+                assert control_codes["a"] == "f"
+                assert control_codes["i"] == image_id
+                assert control_codes["X"] == "1"
+                assert int(control_codes["z"]) > 0
+                assert int(control_codes["c"]) == n - 1
+                mode = "RGBA" if control_codes["f"] == "32" else "RGB"
+                box_size = (int(control_codes["s"]), int(control_codes["v"]))
+                # Only changed regions are transmitted
+                assert box_size != (w, h) or mode != composed[-1].mode
+                frame = composed[-1].convert(mode)
+                frame.paste(
+                    Image.frombytes(mode, box_size, data),
+                    (int(control_codes["x"]), int(control_codes["y"])),
+                )
+                composed.append(frame)
+
+            assert [
+                (frame.mode, frame.tobytes()) for frame in composed
+            ] == self.get_frames(image)
+
+    def test_control(self):
+        image = self.images[0]
+        for repeat, loops in ((-1, 1), (1, 2), (5, 6)):
+            commands = self.get_commands(self.render_native(image, repeat=repeat))
+            image_id = commands[0][0]["i"]
+            first_gap, start = (codes for codes, _ in commands[-2:])
+            assert first_gap == {
+                "a": "a",
+                "i": image_id,
+                "r": "1",
+                "z": "100",
+                "q": "2",
+            }
+            assert start == {
+                "a": "a",
+                "i": image_id,
+                "s": "3",
+                "v": f"{loops}",
+                "q": "2",
+            }
+
+        # Durations
+        render, duration = image._render_native(image._get_image(), 0.0)
+        assert duration == image.n_frames * 0.1
+        assert render == self.render_native(image)
+
+        # Same animation, same ID
+        assert (
+            self.get_commands(self.render_native(image))[0][0]["i"]
+            == self.get_commands(f"{image:1.1+N}")[0][0]["i"]
+            != self.get_commands(self.render_native(self.images[1]))[0][0]["i"]
+        )
+
+    def test_z_index_mix(self):
+        image = self.images[0]
+        cols = image.rendered_width
+
+        render = self.render_native(image, z_index=None)
+        assert render.startswith(delete)
+        assert "z" not in self.get_commands(render.partition(delete)[2])[0][0]
+        assert render.endswith(fill_fmt.format(cols=cols))
+
+        render = self.render_native(image, z_index=1, mix=True)
+        assert self.get_commands(render)[0][0]["z"] == "1"
+        assert render.endswith(jump_right.format(cols=cols))
+
+    def test_draw(self):
+        image = self.images[0]
+        TERM = KittyImage._TERM
+        try:
+            for KittyImage._TERM in ("kitty", "konsole"):
+                try:
+                    sys.stdout = stdout
+                    if KittyImage._TERM == "konsole":
+                        with pytest.raises(
+                            KittyImageError, match="Native animation .* active terminal"
+                        ):
+                            image.draw(native=True, stall_native=False)
+                    else:
+                        image.draw(native=True, stall_native=False)
+                        assert stdout.getvalue().count("a=f") == (
+                            len(self.get_frames(image)) - 1
+                        )
+                finally:
+                    clear_stdout()
+                    sys.stdout = sys.__stdout__
+        finally:
+            KittyImage._TERM = TERM
+
+
+class TestAutoTune:
+    image = KittyImage(python_img, width=_size)
+    anim_image = KittyImage.from_file("tests/images/lion.gif", width=_size)
+
+    @pytest.fixture(autouse=True)
+    def capabilities(self, monkeypatch):
+        monkeypatch.setattr(utils, "_capability_cache_path", None)
+        saved = utils._capabilities.copy()
+        utils._capabilities.clear()
+        yield
+        utils._capabilities.clear()
+        utils._capabilities.update(saved)
+
+    def fake_measure(self, costs, measured=None):
+        # candidate style args -> (duration, size); unlisted ones are costly
+        def measure(img, alpha, attrs, *, frame, **style_args):
+            if img is not self.image._source:
+                img.close()
+            key = (style_args["method"], style_args["compress"])
+            if measured is not None:
+                measured.append(key)
+            return costs.get(key, (1.0, 10**9))
+
+        return measure
+
+    def test_candidates(self):
+        for animated in (False, True):
+            series = self.image._get_tuning_candidates(animated)
+            for candidates in series:
+                assert len({style_args["method"] for style_args, _ in candidates}) == 1
+                assert [style_args["compress"] for style_args, _ in candidates] == [
+                    0,
+                    1,
+                    4,
+                    9,
+                ]
+                assert all(attrs == {} for _, attrs in candidates)
+        assert [
+            candidates[0][0]["method"]
+            for candidates in self.image._get_tuning_candidates(False)
+        ] == [LINES, WHOLE]
+
+        KITTY_VERSION = KittyImage._KITTY_VERSION
+        try:
+            KittyImage._KITTY_VERSION = (0, 26, 0)
+            series = self.image._get_tuning_candidates(True)
+            assert [candidates[0][0]["method"] for candidates in series] == [LINES]
+            KittyImage._KITTY_VERSION = ()
+            series = self.image._get_tuning_candidates(True)
+            assert [candidates[0][0]["method"] for candidates in series] == [WHOLE]
+        finally:
+            KittyImage._KITTY_VERSION = KITTY_VERSION
+
+    def test_still(self, monkeypatch):
+        image = KittyImage(python_img, width=_size)
+        # Encoding plus transmission (at 100 MiB/s)
+        costs = {
+            (LINES, 0): (0.01, 10**8),
+            (LINES, 1): (0.02, 10**7),
+            (LINES, 4): (0.05, 10**6),
+            (LINES, 9): (0.2, 10**5),
+            (WHOLE, 4): (0.04, 10**6),
+        }
+        measured = []
+        monkeypatch.setattr(
+            image, "_measure_render", self.fake_measure(costs, measured)
+        )
+        assert image.auto_tune() == {"compress": 4}
+        assert image._render_method == WHOLE
+        assert image.MEASURE_STILLS and not KittyImage.MEASURE_STILLS
+        # Compression levels are tried only until the cost stops decreasing and the
+        # other method, only at the best level
+        assert measured == [(LINES, 0), (LINES, 1), (LINES, 4), (LINES, 9), (WHOLE, 4)]
+
+        costs[(LINES, 0)] = (0.0, 10**6)
+        utils._capabilities.clear()
+        image = KittyImage(python_img, width=_size)
+        measured.clear()
+        monkeypatch.setattr(
+            image, "_measure_render", self.fake_measure(costs, measured)
+        )
+        assert image.auto_tune() == {"compress": 0}
+        assert image._render_method == LINES
+        assert measured == [(LINES, 0), (LINES, 1), (WHOLE, 0)]
+
+    def test_animated(self, monkeypatch):
+        image = self.anim_image
+        costs = {
+            (method, compress): cost
+            for method in (LINES, WHOLE)
+            for compress, cost in (
+                (0, (0.01, 10**8)),
+                # Greater of encoding and transmission
+                (1, (0.04, 4 * 10**6)),
+                (4, (0.06, 10**6)),
+                (9, (0.2, 10**5)),
+            )
+        }
+        monkeypatch.setattr(image, "_measure_render", self.fake_measure(costs))
+        assert image.auto_tune() == {"compress": 1}
+        # Displayed as a still; encoding plus transmission
+        assert image.auto_tune(animate=False) == {"compress": 4}
+
+    def test_cache(self, monkeypatch):
+        image = KittyImage(python_img, width=_size)
+        image.auto_tune()
+        key = "tuning %s %s kitty 0" % get_terminal_name_version()
+        style_args, attrs, bandwidth = json.loads(utils._capabilities[key])
+        assert attrs == {}
+        assert bandwidth == image_common._DEFAULT_BANDWIDTH
+
+        def measure(*args, **kwargs):
+            raise AssertionError("Measured despite a cached selection")
+
+        image = KittyImage(python_img, width=_size)
+        monkeypatch.setattr(image, "_measure_render", measure)
+        assert image.auto_tune() == {"compress": style_args["compress"]}
+        assert image._render_method == style_args["method"]
+
+        # Not a candidate
+        utils._capabilities[key] = json.dumps(
+            [{"method": LINES, "compress": 5}, {}, bandwidth]
+        ).encode()
+        with pytest.raises(AssertionError, match="Measured"):
+            image.auto_tune()
+
+        # Significant change in terminal throughput
+        utils._capabilities[key] = json.dumps([style_args, {}, bandwidth]).encode()
+        image_common._store_terminal_bandwidth(2**20)
+        with pytest.raises(AssertionError, match="Measured"):
+            image.auto_tune()
+
+    def test_bandwidth(self):
+        assert image_common._get_terminal_bandwidth() == image_common._DEFAULT_BANDWIDTH
+        image_common._store_terminal_bandwidth(2**20)
+        assert image_common._get_terminal_bandwidth() == 2**20
+        # Smoothed across measurements
+        image_common._store_terminal_bandwidth(2**21)
+        assert image_common._get_terminal_bandwidth() == 0.75 * 2**20 + 0.25 * 2**21
+
+    def test_render(self):
+        image = KittyImage(python_img, width=_size)
+        style_args = image.auto_tune()
+        assert image._render_method in {LINES, WHOLE}
+        assert image._renderer(image._render_image, 0.0, **style_args)
+
+
 delete = f"{START}a=d,d=C;{ST}"
 jump_right = f"{CSI}{{cols}}C"
 fill_fmt = f"{CSI}{{cols}}X{jump_right}"
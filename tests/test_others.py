@@ -1,9 +1,11 @@
+import os
 from operator import truediv
 from random import randint, random
+from time import time
 
 import pytest
 
-from term_image import AutoCellRatio, get_cell_ratio, set_cell_ratio
+from term_image import AutoCellRatio, get_cell_ratio, set_cell_ratio, utils
 from term_image.exceptions import TermImageError
 from term_image.image import AutoImage, BaseImage, ImageSource, from_file
 
@@ -100,3 +102,112 @@ def test_style():
 
     assert MyImage.style is None
     assert str(MyImage) == repr(MyImage)
+
+
+class TestCapabilities:
+    @pytest.fixture(autouse=True)
+    def terminal(self, monkeypatch, tmp_path):
+        tty = os.open(os.devnull, os.O_RDWR)
+        monkeypatch.setattr(utils, "_tty", tty)
+        monkeypatch.setattr(utils, "_capabilities", {})
+        monkeypatch.setattr(utils, "_capability_cache_path", None)
+        monkeypatch.setattr(utils, "_win_size_cache", [0] * 4)
+        monkeypatch.setattr(utils, "query_terminal", self.query_terminal)
+        self.responses = {
+            "name_version": b"\033P>|kitty(0.26.5)\033\\",
+            "fg_bg_colors": (
+                b"\033]10;rgb:ffff/ffff/ffff\033\\\033]11;rgb:0000/0000/0000\033\\"
+            ),
+            "window_size": b"\033[4;540;720t",
+            "kitty_graphics": b"\033_Gi=31;OK\033\\",
+        }
+        self.requests = []
+        self.da1 = b"\033[?62;c"
+        self.path = str(tmp_path / "terminals.json")
+        yield
+        os.close(tty)
+
+    def query_terminal(self, request, more):
+        self.requests.append(request)
+        response = b"".join(
+            response
+            for name, response in self.responses.items()
+            if utils._capability_queries[name][0] in request
+        )
+        assert more(bytearray(response))
+        return response + self.da1
+
+    def test_batch(self):
+        responses = utils.query_capabilities()
+        assert responses == self.responses
+        assert len(self.requests) == 1
+        assert self.requests[0].endswith(f"{utils.CSI}c".encode())
+
+        # Cached
+        assert utils.query_capabilities() == self.responses
+        assert utils.query_capabilities("name_version") == {
+            "name_version": self.responses["name_version"]
+        }
+        assert len(self.requests) == 1
+
+        # Parsed
+        assert utils.get_terminal_name_version.__wrapped__() == ("kitty", "0.26.5")
+        assert utils.get_window_size() == (720, 540)
+        assert len(self.requests) == 1
+
+    def test_unsupported(self):
+        del self.responses["kitty_graphics"]
+        assert utils.query_capabilities("kitty_graphics") == {"kitty_graphics": b""}
+        assert utils.query_capabilities("kitty_graphics") == {"kitty_graphics": b""}
+        assert len(self.requests) == 1
+
+    def test_timeout(self):
+        self.da1 = b""
+        assert utils.query_capabilities() == self.responses
+        assert utils.query_capabilities() == self.responses
+        assert len(self.requests) == 2  # Not cached
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setattr(utils, "DISABLE_QUERIES", True)
+        assert utils.query_capabilities() is None
+        assert not self.requests
+
+    def test_size_dependent(self, monkeypatch):
+        utils.query_capabilities()
+        monkeypatch.setattr(utils, "get_terminal_size", lambda: (100, 50))
+        assert utils.query_capabilities() == self.responses
+        assert len(self.requests) == 2
+        assert utils._capability_queries["window_size"][0] in self.requests[1]
+        assert utils._capability_queries["name_version"][0] not in self.requests[1]
+
+    def test_disk(self, monkeypatch):
+        utils.init_capability_cache(3600, self.path)
+        utils.query_capabilities()
+        assert len(self.requests) == 1
+
+        # Another process in the same terminal session
+        monkeypatch.setattr(utils, "_capabilities", {})
+        utils.init_capability_cache(3600, self.path)
+        assert utils.query_capabilities() == self.responses
+        assert len(self.requests) == 1
+
+        # Another terminal
+        monkeypatch.setattr(utils, "_capabilities", {})
+        monkeypatch.setenv("TERM_PROGRAM", "other")
+        utils.init_capability_cache(3600, self.path)
+        assert utils.query_capabilities() == self.responses
+        assert len(self.requests) == 2
+        monkeypatch.delenv("TERM_PROGRAM")
+
+        # Expired
+        monkeypatch.setattr(utils, "_capabilities", {})
+        monkeypatch.setattr(utils, "time", lambda: time() + 3600)
+        utils.init_capability_cache(3600, self.path)
+        utils.query_capabilities()
+        assert len(self.requests) == 3
+
+        # Disabled
+        monkeypatch.setattr(utils, "_capabilities", {})
+        utils.init_capability_cache(0, self.path)
+        utils.query_capabilities()
+        assert len(self.requests) == 4
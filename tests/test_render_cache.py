@@ -0,0 +1,173 @@
+"""Render cache tests"""
+
+import os
+
+import pytest
+
+from term_image import cli  # noqa: F401 ; `render_cache` is imported via `cli`
+from term_image import render_cache
+from term_image.image import BlockImage, ITerm2Image, KittyImage
+
+from .common import _size, python_img
+
+python_image = "tests/images/python.png"
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path):
+    render_cache.init(2**20, str(tmp_path))
+    yield
+    render_cache.init(0)
+
+
+def get_key(image, alpha=0.0, **style_args):
+    return render_cache.get_key(image, alpha, style_args)
+
+
+class TestCacheRenders:
+    def count_renders(self, image):
+        renders = []
+        render_image = image._render_image
+
+        def _render_image(*args, **kwargs):
+            renders.append(args)
+            return render_image(*args, **kwargs)
+
+        image._render_image = _render_image
+        render_cache.cache_renders(image)
+
+        return renders
+
+    def test_reuse(self):
+        image = BlockImage.from_file(python_image, width=_size)
+        renders = self.count_renders(image)
+        render = str(image)
+        assert str(image) == render
+        assert len(renders) == 1
+
+        # Another image of the same file, e.g in another session
+        image = BlockImage.from_file(python_image, width=_size)
+        renders = self.count_renders(image)
+        assert str(image) == render
+        assert not renders
+
+        # Different render parameters
+        image.width = _size // 2
+        assert str(image) != render
+        assert len(renders) == 1
+
+    def test_not_file(self):
+        image = BlockImage(python_img, width=_size)
+        renders = self.count_renders(image)
+        str(image)
+        str(image)
+        assert len(renders) == 2
+
+    def test_disabled(self):
+        render_cache.init(0)
+        image = BlockImage.from_file(python_image, width=_size)
+        renders = self.count_renders(image)
+        str(image)
+        str(image)
+        assert len(renders) == 2
+
+
+class TestKey:
+    @pytest.fixture(autouse=True)
+    def terminal(self, monkeypatch):
+        # Other tests may leave these set for a specific terminal
+        for ImageClass, attrs in (
+            (
+                KittyImage,
+                {
+                    "_TERM": "",
+                    "_TERM_VERSION": "",
+                    "READ_FROM_FILE": True,
+                    "_KITTY_VERSION": (),
+                },
+            ),
+            (
+                ITerm2Image,
+                {
+                    "_TERM": "",
+                    "_TERM_VERSION": "",
+                    "READ_FROM_FILE": True,
+                    "JPEG_QUALITY": -1,
+                },
+            ),
+        ):
+            for name, value in attrs.items():
+                monkeypatch.setattr(ImageClass, name, value)
+
+    def test_file(self, tmp_path):
+        file = tmp_path / "python.png"
+        file.write_bytes(open(python_image, "rb").read())
+        image = BlockImage.from_file(str(file), width=_size)
+        key = get_key(image)
+        assert get_key(image) == key
+
+        os.utime(file, ns=(0, 0))
+        assert get_key(image) != key
+
+    def test_render_parameters(self):
+        image = KittyImage.from_file(python_image, width=_size)
+        key = get_key(image)
+        assert get_key(image, None) != key
+        assert get_key(image, compress=1) != key
+        image.width = _size // 2
+        assert get_key(image) != key
+
+    @pytest.mark.parametrize("ImageClass", [KittyImage, ITerm2Image])
+    def test_terminal(self, ImageClass, monkeypatch):
+        image = ImageClass.from_file(python_image, width=_size)
+        key = get_key(image)
+        for TERM in ("konsole", "wezterm", "kitty"):
+            monkeypatch.setattr(ImageClass, "_TERM", TERM)
+            assert get_key(image) != key
+        monkeypatch.setattr(ImageClass, "_TERM", "")
+        assert get_key(image) == key
+        monkeypatch.setattr(ImageClass, "_TERM_VERSION", "0.1.0")
+        assert get_key(image) != key
+
+    @pytest.mark.parametrize(
+        "ImageClass, name, value",
+        [
+            (KittyImage, "READ_FROM_FILE", True),
+            (KittyImage, "READ_FROM_FILE", False),
+            (ITerm2Image, "READ_FROM_FILE", True),
+            (ITerm2Image, "READ_FROM_FILE", False),
+            (ITerm2Image, "JPEG_QUALITY", 50),
+        ],
+    )
+    def test_style_attrs(self, ImageClass, name, value, monkeypatch):
+        image = ImageClass.from_file(python_image, width=_size)
+        other = not value if isinstance(value, bool) else -1
+        monkeypatch.setattr(ImageClass, name, other)
+        key = get_key(image)
+        monkeypatch.setattr(ImageClass, name, value)
+        assert get_key(image) != key
+
+        # Per-instance (e.g set by `GraphicsImage.auto_tune()`)
+        setattr(image, name, other)
+        assert get_key(image) == key
+
+
+class TestStore:
+    def test_load_store(self):
+        assert render_cache.load("key") is None
+        render_cache.store("key", "render")
+        assert render_cache.load("key") == "render"
+
+    def test_corrupt(self):
+        with open(os.path.join(render_cache.DIRECTORY, "key"), "wb") as entry:
+            entry.write(b"not compressed")
+        assert render_cache.load("key") is None
+
+    def test_evict(self):
+        render_cache.init(200, render_cache.DIRECTORY)
+        for n in range(10):
+            render_cache.store(str(n), os.urandom(40).hex())
+            assert render_cache._size <= render_cache.MAX_SIZE
+        # The least recently stored entries are evicted first
+        assert render_cache.load("0") is None
+        assert render_cache.load("9") is not None
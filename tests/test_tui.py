@@ -0,0 +1,408 @@
+"""TUI tests"""
+
+import os
+from queue import Empty
+from threading import Event, Thread
+from time import sleep
+
+import PIL.Image
+import pytest
+import urwid
+
+import term_image
+from term_image import cli  # noqa: F401 ; `tui` is imported via `cli`
+from term_image import logging
+from term_image.image import BlockImage
+from term_image.tui import main, render
+from term_image.tui.render import RenderQueue, ThumbnailStore
+from term_image.tui.widgets import (
+    GridCache,
+    Image,
+    ImageCanvas,
+    image_box,
+    menu,
+    placeholder,
+)
+
+from .common import setup_common
+
+setup_common(BlockImage)
+
+elephant = "tests/images/elephant.png"
+
+
+def canvas(size):
+    return ImageCanvas([b"x" * size], (size, 1), (size, 1))
+
+
+class TestGridCache:
+    def test_items(self):
+        cache = GridCache(100)
+        cache.set_grid(("dir", 30))
+        assert cache.get("a") is None
+        cache["a"] = ...
+        assert cache.get("a") is ...
+        assert cache.size == 0
+        cache["a"] = canv = canvas(10)
+        assert cache.get("a") is canv
+        assert cache.size == 10
+        cache["a"] = canvas(20)
+        assert cache.size == 20
+
+    def test_revisit(self):
+        cache = GridCache(100)
+        cache.set_grid(("dir1", 30))
+        cache["a"] = canv = canvas(10)
+        cache["b"] = ...
+        cache.set_grid(("dir2", 30))
+        assert cache.get("a") is None
+        cache.set_grid(("dir1", 30))
+        assert cache.get("a") is canv
+        # Pending renders are dropped on switching grids
+        assert cache.get("b") is None
+
+    def test_evict_grids(self):
+        cache = GridCache(100)
+        for n in range(3):
+            cache.set_grid((f"dir{n}", 30))
+            cache["a"] = canvas(30)
+        assert cache.size == 90
+
+        # Least recently visited grid first
+        cache.set_grid(("dir0", 30))
+        cache.set_grid(("dir3", 30))
+        cache["a"] = canvas(30)
+        assert cache.size == 90
+        for key, evicted in (("dir1", True), ("dir0", False), ("dir2", False)):
+            cache.set_grid((key, 30))
+            assert (cache.get("a") is None) is evicted
+
+    def test_evict_current_grid(self):
+        cache = GridCache(100)
+        cache.set_grid(("dir", 30))
+        for entry in "abcd":
+            cache[entry] = canvas(20)
+        assert cache.size == 80
+
+        cache.new_frame()
+        for entry in "cb":
+            cache.get(entry)
+        cache.get("a")  # Most recently used but not visible after the next frame
+        cache.new_frame()
+        for entry in "bc":
+            cache.get(entry)
+
+        # Not visible, least recently used first
+        cache["e"] = canvas(20)
+        assert cache.size == 100
+        cache["f"] = canvas(30)
+        assert cache.size == 90
+        assert cache.get("d") is None
+        assert cache.get("a") is None
+        assert all(cache.get(entry) for entry in "bcef")
+
+    def test_visible_not_evicted(self):
+        cache = GridCache(50)
+        cache.set_grid(("dir", 30))
+        cache.new_frame()
+        for entry in "abc":
+            cache.get(entry)
+            cache[entry] = canvas(20)
+        # Over budget but all visible
+        assert cache.size == 60
+        assert all(cache.get(entry) for entry in "abc")
+
+        cache.new_frame()
+        cache.get("c")
+        cache["d"] = ...
+        assert cache.size == 60
+        cache["d"] = canvas(20)
+        assert cache.size == 40
+        assert cache.get("a") is cache.get("b") is None
+
+    def test_evict_other_grids_first(self):
+        cache = GridCache(100)
+        cache.set_grid(("dir1", 30))
+        cache["a"] = canvas(40)
+        cache.set_grid(("dir2", 30))
+        cache["a"] = canvas(40)
+        cache["b"] = canvas(40)
+        assert cache.size == 80
+        assert cache.get("a") and cache.get("b")
+        cache.set_grid(("dir1", 30))
+        assert cache.get("a") is None
+
+
+class TestRenderQueue:
+    @pytest.fixture
+    def queue(self, monkeypatch):
+        monkeypatch.setattr(render, "SHM_RING_SIZE", 1000)
+        queue = RenderQueue(1)
+        yield queue
+        queue.close()
+
+    def put_all(self, queue, items):
+        producer = Thread(target=lambda: [*map(queue.put, items)], daemon=True)
+        producer.start()
+        return producer
+
+    def get_all(self, queue, n):
+        try:
+            return [queue.get(timeout=5) for _ in range(n)]
+        except Empty:
+            pytest.fail("The producer is blocked")
+
+    def test_passthrough(self, queue):
+        items = [("a", None), ("b", b""), ("c", b"x" * 1001)]
+        for item in items:
+            queue.put(item)
+        assert self.get_all(queue, len(items)) == items
+
+    @pytest.mark.parametrize(
+        "lengths",
+        [
+            [1000] * 5,
+            [400] * 10,
+            [600, 600, 300, 900, 100, 1000],
+            [865, 395, 777],  # Skipped bytes wrap around the end of the ring
+            [999, 2, 999, 2, 500, 501, 500],
+        ],
+    )
+    def test_wrap_around(self, queue, lengths):
+        items = [(n, bytes([n]) * length) for n, length in enumerate(lengths)]
+        producer = self.put_all(queue, items)
+        assert self.get_all(queue, len(items)) == items
+        producer.join(5)
+        assert not producer.is_alive()
+
+    def test_blocks_until_freed(self, queue):
+        producer = self.put_all(queue, [(0, b"0" * 600), (1, b"1" * 600)])
+        producer.join(0.5)
+        # The second output doesn't fit until the first is gotten
+        assert producer.is_alive()
+        assert queue.get(timeout=5) == (0, b"0" * 600)
+        producer.join(5)
+        assert not producer.is_alive()
+        assert queue.get(timeout=5) == (1, b"1" * 600)
+
+
+class TestThumbnailStore:
+    @pytest.fixture(autouse=True)
+    def cell_ratio(self, monkeypatch):
+        # Other tests may leave any cell ratio set
+        monkeypatch.setattr(term_image, "_cell_ratio", 0.5)
+
+    @pytest.fixture
+    def opened(self):
+        self.opened = []
+        return self.opened
+
+    def open_image(self, store, file, width):
+        image = BlockImage.from_file(file, width=width)
+        open_image = PIL.Image.open
+
+        def _open(fp, *args, **kwargs):
+            self.opened.append(fp)
+            return open_image(fp, *args, **kwargs)
+
+        PIL.Image.open = _open
+        try:
+            img = store.open_image(image)
+        finally:
+            PIL.Image.open = open_image
+        render_width, render_height = image._get_render_size()
+        # Either reduced to no less than twice the render size or not at all
+        assert img.size == image.original_size or (
+            img.width >= render_width * 2 and img.height >= render_height * 2
+        )
+        return img
+
+    def test_reduced(self, opened):
+        store = ThumbnailStore(2**20)
+        img = self.open_image(store, elephant, 20)
+        assert img.size < PIL.Image.open(elephant).size
+        assert store.size == len(img.getbands()) * img.width * img.height
+
+    def test_original(self, opened):
+        store = ThumbnailStore(2**20)
+        # The render size is too large for any reduction
+        img = self.open_image(store, elephant, 200)
+        assert img.size == (480, 400)
+        assert store.size == 0
+
+    def test_reuse(self, opened):
+        store = ThumbnailStore(2**20)
+        img = self.open_image(store, elephant, 20)
+        assert len(opened) == 1
+
+        # Same level
+        assert self.open_image(store, elephant, 20).size == img.size
+        # Smaller render size; rendered from the larger stored level
+        assert self.open_image(store, elephant, 10).size == img.size
+        assert len(opened) == 1
+
+        # Larger render size
+        assert self.open_image(store, elephant, 40).size > img.size
+        assert len(opened) == 2
+        # Stored levels are reused per file
+        self.open_image(store, "tests/images/lion.gif", 20)
+        assert len(opened) == 3
+
+    def test_copy(self, opened):
+        store = ThumbnailStore(2**20)
+        img = self.open_image(store, elephant, 20)
+        img.paste((0, 0, 0), (0, 0, *img.size))
+        assert self.open_image(store, elephant, 20).getextrema() != img.getextrema()
+
+    def test_modified(self, opened, tmp_path):
+        store = ThumbnailStore(2**20)
+        file = tmp_path / "elephant.png"
+        file.write_bytes(open(elephant, "rb").read())
+        self.open_image(store, str(file), 20)
+        os.utime(file, ns=(0, 0))
+        self.open_image(store, str(file), 20)
+        assert len(opened) == 2
+
+    def test_evict(self, opened, tmp_path):
+        files = []
+        for n in range(3):
+            files.append(str(tmp_path / f"{n}.png"))
+            with open(files[-1], "wb") as file:
+                file.write(open(elephant, "rb").read())
+        store = ThumbnailStore(2**20)
+        self.open_image(store, files[0], 20)
+        store = ThumbnailStore(store.size * 2)  # Two thumbnails
+        for file in files:
+            self.open_image(store, file, 20)
+            assert store.size <= store.max_size
+        opened.clear()
+
+        # Least recently used first
+        self.open_image(store, files[2], 20)
+        self.open_image(store, files[1], 20)
+        assert not opened
+        self.open_image(store, files[0], 20)
+        assert opened == [files[0]]
+        self.open_image(store, files[1], 20)
+        assert opened == [files[0]]
+        self.open_image(store, files[2], 20)
+        assert opened == [files[0], files[2]]
+
+
+class TestPrefetch:
+    size = (20, 10)
+
+    @pytest.fixture(autouse=True)
+    def manager(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(logging, "MULTI", False)
+        monkeypatch.setattr(logging, "QUIET", True)
+        monkeypatch.setattr(main, "ImageClass", BlockImage)
+        monkeypatch.setattr(main, "NO_ANIMATION", True)
+        monkeypatch.setattr(main, "MAX_PIXELS", 2**30)
+        monkeypatch.setattr(render, "PREFETCH", 2)
+        monkeypatch.setattr(render, "THUMBNAIL_CACHE", 0)
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(read_fd, False)
+        monkeypatch.setattr(main, "update_pipe", write_fd)
+
+        self.images = []
+        for n in range(5):
+            file = tmp_path / f"{n}.png"
+            file.write_bytes(open(elephant, "rb").read())
+            self.images.append(Image(BlockImage.from_file(str(file))))
+        monkeypatch.setattr(main, "menu_list", [(None, w) for w in self.images])
+        menu.body[:] = [urwid.Text(str(n)) for n in range(len(self.images) + 1)]
+
+        # Renderer inputs, as (path, faulty); *faulty* is `None` for prefetch renders
+        self.inputs = []
+        self.gate = Event()
+        self.gate.set()
+        render_images = render.render_images
+
+        def _render_images(input, *args, **kwargs):
+            class Input:
+                def get(_):
+                    item = input.get()
+                    if item[0]:
+                        self.inputs.append((item[0], item[3]))
+                        if item[3] is None:
+                            self.gate.wait(5)
+                    return item
+
+            render_images(Input(), *args, **kwargs)
+
+        monkeypatch.setattr(render, "render_images", _render_images)
+
+        manager = Thread(target=render.manage_image_renders)
+        manager.start()
+        yield
+        self.gate.set()
+        render.image_render_queue.put((None,) * 3)
+        manager.join()
+        image_box.original_widget = placeholder
+        menu.body.clear()
+        os.close(read_fd)
+        os.close(write_fd)
+
+    def wait(self, condition):
+        for _ in range(500):
+            if condition():
+                return
+            sleep(0.01)
+        pytest.fail("Timed out")
+
+    def display(self, index):
+        image_w = self.images[index]
+        image_box.original_widget = image_w
+        menu.focus_position = index + 1
+        image_w._ti_rendering = True
+        render.image_render_queue.put((image_w, self.size, "#.5"))
+        self.wait(lambda: image_w._ti_canv)
+
+    def prefetched(self):
+        sources = [*map(self.source, self.images)]
+        return [sources.index(path) for path, faulty in self.inputs if faulty is None]
+
+    @staticmethod
+    def source(image_w):
+        return image_w._ti_image._source
+
+    def test_prefetch(self):
+        self.display(1)
+        # Nearest first
+        self.wait(lambda: len(self.inputs) == 4)
+        assert self.prefetched() == [2, 0, 3]
+
+        self.inputs.clear()
+        self.display(2)
+        assert isinstance(self.images[2]._ti_canv, ImageCanvas)
+        # Reused
+        self.wait(lambda: self.prefetched() == [1, 4])
+        assert all(faulty is None for _, faulty in self.inputs)
+
+    def test_cancel(self):
+        self.gate.clear()
+        self.display(1)
+        self.wait(lambda: self.prefetched() == [2])
+
+        # The view changes (e.g to a grid) while a prefetch render is ongoing
+        image_box.original_widget = placeholder
+        self.gate.set()
+        sleep(0.2)
+        assert self.prefetched() == [2]
+
+        # Rendering resumes with the next displayed image
+        self.inputs.clear()
+        self.display(3)
+        self.wait(lambda: self.prefetched() == [4, 1])
+        assert self.inputs[0] == (self.source(self.images[3]), False)
+
+    def test_not_blocking(self):
+        self.gate.clear()
+        self.display(1)
+        self.wait(lambda: self.prefetched() == [2])
+
+        # Displayed images are rendered while a prefetch render is ongoing
+        self.display(3)
+        assert (self.source(self.images[3]), False) in self.inputs
+        assert self.prefetched() == [2]